@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+测试插件的纹理索引 (demo/addon_new.py)
+需要在 Blender 自带的 Python 中运行，例如：
+    blender --background --factory-startup --python-expr "import pytest; pytest.main(['-q', 'test/test_addon_textures.py'])"
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+import addon_new  # noqa: E402
+
+
+def save_test_image(directory, name):
+    image = bpy.data.images.new(name, width=4, height=4)
+    image.filepath_raw = os.path.join(directory, f"{name}.png")
+    image.file_format = 'PNG'
+    image.save()
+    path = image.filepath_raw
+    bpy.data.images.remove(image)
+    return path
+
+
+def test_downloaded_normal_map_is_connected():
+    """下载后（同一会话）set_texture 生成的材质要连接法线贴图，map 类型与按名称发现的一致"""
+    addon_new._texture_index.reset()
+    texture_id = "test_planks"
+    server = addon_new.BlenderMCPServer()
+
+    with tempfile.TemporaryDirectory() as directory:
+        map_paths = {
+            map_type: save_test_image(directory, f"source_{map_type}")
+            for map_type in ("diffuse", "rough", "nor_gl")
+        }
+        server._import_polyhaven_textures(texture_id, map_paths, "png")
+        assert set(addon_new._texture_index.lookup(texture_id)) == {"diffuse", "rough", "gl"}
+
+        bpy.ops.mesh.primitive_cube_add()
+        obj = bpy.context.active_object
+        result = server.set_texture(obj.name, texture_id)
+        assert "error" not in result, result
+
+    nodes = obj.active_material.node_tree.nodes
+    normal_maps = [node for node in nodes if node.bl_idname == 'ShaderNodeNormalMap']
+    assert normal_maps
+    principled = next(node for node in nodes if node.type == 'BSDF_PRINCIPLED')
+    assert any(link.from_node in normal_maps for link in principled.inputs['Normal'].links)
+
+    # 按名称重新发现时得到相同的 map 类型
+    addon_new._texture_index.reset()
+    assert set(addon_new._texture_index.discover(texture_id)) == {"diffuse", "rough", "gl"}
+
+
+if __name__ == "__main__":
+    test_downloaded_normal_map_is_connected()
+    print("所有测试通过")
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+测试 Blender 多实例工作池 (demo/blender_pool.py)
+用本地假 worker 服务器代替无界面 Blender，不需要安装 Blender
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+
+from blender_pool import BlenderPool, JsonStream  # noqa: E402
+
+
+class ChunkReader:
+    """按给定分块返回数据的假 StreamReader"""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    async def read(self, n):
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+def read_all(chunks):
+    async def run():
+        stream = JsonStream(ChunkReader(chunks))
+        results = []
+        while True:
+            obj = await stream.read()
+            if obj is None:
+                return results
+            results.append(obj)
+    return asyncio.run(run())
+
+
+def split_every(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_json_stream_split_multibyte():
+    """多字节字符被拆在两次 read 之间时也能正确解析"""
+    command = {"type": "execute_code", "params": {"code": "# 创建一个立方体\nprint('完成')"}}
+    data = json.dumps(command, ensure_ascii=False).encode("utf-8")
+    # 每次 1 字节，必然把每个中文字符拆开
+    assert read_all(split_every(data, 1)) == [command]
+
+
+def test_json_stream_multiple_and_tricky_strings():
+    """同一分块中的多个对象、字符串内的括号和转义引号"""
+    first = {"code": 'print("}{ ][")', "path": "C:\\temp\\"}
+    second = [1, {"nested": "\\\""}]
+    data = (json.dumps(first) + "\n  " + json.dumps(second) + " ").encode("utf-8")
+    for size in (1, 3, 7, len(data)):
+        assert read_all(split_every(data, size)) == [first, second]
+
+
+def test_json_stream_invalid_json_is_dropped():
+    """括号闭合但格式错误的对象抛出 ValueError，之后的对象仍能读取"""
+    async def run():
+        stream = JsonStream(ChunkReader([b'{"a": nope}{"b": 1}']))
+        try:
+            await stream.read()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("invalid JSON should raise ValueError")
+        return await stream.read()
+    assert asyncio.run(run()) == {"b": 1}
+
+
+def test_json_stream_large_payload_is_linear():
+    """大响应（例如内联截图）按 64 KiB 分块到达时耗时随大小线性增长"""
+    payload = {"status": "success", "result": {"image": "A" * (20 * 1024 * 1024)}}
+    chunks = split_every(json.dumps(payload).encode("utf-8"), 65536)
+    start = time.perf_counter()
+    assert read_all(chunks) == [payload]
+    assert time.perf_counter() - start < 2.0
+
+
+async def start_fake_worker():
+    """像插件一样逐条回复命令；"crash" 命令直接断开连接"""
+    async def handle(reader, writer):
+        stream = JsonStream(reader)
+        try:
+            while True:
+                command = await stream.read()
+                if command is None or command.get("type") == "crash":
+                    break
+                response = {"status": "success", "result": {"type": command.get("type")}}
+                writer.write(json.dumps(response).encode("utf-8"))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1]
+
+
+async def make_pool(workers=2, recycle_after=0):
+    args = SimpleNamespace(workers=workers, base_port=0, recycle_after=recycle_after)
+    pool = BlenderPool(args)
+    servers = []
+    for worker in pool.workers:
+        server, port = await start_fake_worker()
+        servers.append(server)
+        worker.port = port
+        worker.state = "ready"
+    return pool, servers
+
+
+async def close_pool(pool, servers):
+    for key in list(pool.sessions):
+        pool.release(key)
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+
+
+def test_session_for_least_loaded_and_release():
+    """新会话分配给负载最低的实例，释放后计数随之减少"""
+    async def run():
+        pool, servers = await make_pool(workers=2)
+        first, second = pool.workers
+        try:
+            assert pool.session_for("a").worker is first
+            assert pool.session_for("b").worker is second
+            assert pool.session_for("a").worker is first  # 亲和
+            assert pool.session_for("c").worker is first
+            assert first.sessions == {"a", "c"}
+
+            pool.release("a")
+            pool.release("c")
+            assert not first.sessions and "a" not in pool.sessions
+            assert pool.session_for("d").worker is first
+
+            response = await pool.execute("d", {"type": "get_scene_info", "session": "d"})
+            assert response == {"status": "success", "result": {"type": "get_scene_info"}}
+            assert first.total_commands == 1 and first.in_flight == 0
+        finally:
+            await close_pool(pool, servers)
+    asyncio.run(run())
+
+
+def test_recycle_after_drains_worker():
+    """执行满 recycle_after 条命令后实例不再接新会话，但已有会话继续路由到它"""
+    async def run():
+        pool, servers = await make_pool(workers=2, recycle_after=2)
+        first, second = pool.workers
+        try:
+            for _ in range(2):
+                response = await pool.execute("a", {"type": "ping"})
+                assert response["status"] == "success"
+            assert first.state == "draining"
+            assert second.state == "ready"
+
+            assert pool.session_for("b").worker is second
+            assert pool.session_for("a").worker is first
+            response = await pool.execute("a", {"type": "ping"})
+            assert response["status"] == "success"
+        finally:
+            await close_pool(pool, servers)
+    asyncio.run(run())
+
+
+def test_execute_releases_session_on_error():
+    """worker 断开连接时返回错误并释放会话，下一条命令重新建立连接"""
+    async def run():
+        pool, servers = await make_pool(workers=1)
+        worker = pool.workers[0]
+        try:
+            response = await pool.execute("a", {"type": "crash"})
+            assert response["status"] == "error"
+            assert "a" not in pool.sessions and not worker.sessions
+            assert worker.errors == 1 and worker.in_flight == 0
+
+            response = await pool.execute("a", {"type": "ping"})
+            assert response["status"] == "success"
+        finally:
+            await close_pool(pool, servers)
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_json_stream_split_multibyte()
+    test_json_stream_multiple_and_tricky_strings()
+    test_json_stream_invalid_json_is_dropped()
+    test_json_stream_large_payload_is_linear()
+    test_session_for_least_loaded_and_release()
+    test_recycle_after_drains_worker()
+    test_execute_releases_session_on_error()
+    print("所有测试通过")
@@ -1,7 +1,10 @@
 # Code created by Siddharth Ahuja: www.github.com/ahujasid © 2025
 
 import bpy
+import bmesh
+import gpu
 import mathutils
+import math
 import json
 import threading
 import socket
@@ -12,15 +15,34 @@ import traceback
 import os
 import shutil
 import zipfile
+import urllib.parse
+import numpy as np
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
-from contextlib import redirect_stdout, suppress
+import ast
+import heapq
+import random
+import inspect
+import uuid
+import base64
+import hashlib
+import fnmatch
+import itertools
+import struct
+import sys
+import argparse
+import zlib
+import colorsys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout, suppress
+from bpy.app.handlers import persistent
 
 bl_info = {
     "name": "Blender MCP",
     "author": "BlenderMCP",
     "version": (1, 2),
-    "blender": (3, 0, 0),
+    "blender": (3, 2, 0),  # bpy.context.temp_override
     "location": "View3D > Sidebar > BlenderMCP",
     "description": "Connect Blender to Claude via MCP",
     "category": "Interface",
@@ -28,6 +50,2721 @@ bl_info = {
 
 RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhofby80NJez"
 
+# Paginated scene queries (get_scene_info)
+SCENE_QUERY_DEFAULT_LIMIT = 100
+SCENE_QUERY_MAX_LIMIT = 5000
+SCENE_QUERY_TIME_BUDGET_MS = 50
+# bbox is [min_x, min_y, min_z, max_x, max_y, max_z]; mesh is [vertices, edges, polygons]
+SCENE_QUERY_FIELDS = (
+    "location", "rotation", "scale", "dimensions", "bbox",
+    "materials", "mesh", "collections", "parent", "visible",
+)
+
+# Geometry export (get_object_info include_geometry=True)
+GEOMETRY_FIELDS = ("positions", "normals", "indices", "uvs")
+
+# Inline viewport screenshots (get_viewport_screenshot without filepath) and render previews
+SCREENSHOT_CACHE_SIZE = 4
+SCREENSHOT_PNG_LEVEL = 6
+PREVIEW_CACHE_SIZE = 8
+PREVIEW_MAX_RESOLUTION = 4096
+PREVIEW_ENGINES = {
+    "WORKBENCH": ("BLENDER_WORKBENCH",),
+    "EEVEE": ("BLENDER_EEVEE_NEXT", "BLENDER_EEVEE"),
+}
+# Camera directions for auto-framed previews (Blender's front view looks along +Y)
+PREVIEW_VIEWS = {
+    "iso": (1.0, -1.0, 0.8),
+    "front": (0.0, -1.0, 0.0),
+    "back": (0.0, 1.0, 0.0),
+    "left": (-1.0, 0.0, 0.0),
+    "right": (1.0, 0.0, 0.0),
+    "top": (0.0, 0.0, 1.0),
+}
+
+
+class ResultCache:
+    """Small thread-safe LRU of command results, keyed by everything that affects them"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+_screenshot_cache = ResultCache(SCREENSHOT_CACHE_SIZE)
+_preview_cache = ResultCache(PREVIEW_CACHE_SIZE)
+
+
+def _downscale_pixels(pixels, max_size):
+    """Box-filter an (H, W, C) uint8 image by an integer factor so its largest side fits max_size"""
+    height, width = pixels.shape[:2]
+    factor = -(-max(height, width) // max(1, int(max_size)))
+    if factor <= 1:
+        return pixels
+    height, width = height // factor * factor, width // factor * factor
+    blocks = pixels[:height, :width].reshape(height // factor, factor, width // factor, factor, -1)
+    return blocks.mean(axis=(1, 3), dtype=np.float32).round().astype(np.uint8)
+
+
+def _encode_png(rgb, level=SCREENSHOT_PNG_LEVEL):
+    """Encode a top-down (H, W, 3) uint8 array as PNG bytes using only zlib"""
+    height, width = rgb.shape[:2]
+    # Every scanline starts with filter type 0 (None)
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), rgb.reshape(height, -1)]).tobytes()
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw, level)),
+        chunk(b"IEND", b""),
+    ))
+
+# execute_code compile cache and persistent namespaces
+CODE_CACHE_SIZE = 64
+MAX_NAMESPACES = 16
+EXECUTE_CODE_MAX_OUTPUT = 64 * 1024  # characters of captured stdout returned per execution
+
+
+class CompiledCodeCache:
+    """LRU cache of compile()d code objects keyed by a hash of the source"""
+
+    def __init__(self, max_entries=CODE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source, cooperative=False):
+        """Return (code_object, cache_hit) for a source string"""
+        digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        key = (digest, cooperative)
+        code_obj = self.entries.get(key)
+        if code_obj is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return code_obj, True
+
+        filename = f"<execute_code:{digest[:12]}>"
+        if cooperative:
+            code_obj = compile(_wrap_as_generator(ast.parse(source, filename)), filename, "exec")
+        else:
+            code_obj = compile(source, filename, "exec")
+        self.entries[key] = code_obj
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.misses += 1
+        return code_obj, False
+
+
+class CappedOutput(io.TextIOBase):
+    """stdout replacement that keeps only the first max_chars characters written to it"""
+
+    def __init__(self, max_chars=EXECUTE_CODE_MAX_OUTPUT):
+        self.max_chars = max_chars
+        self.parts = []
+        self.kept = 0
+        self.total = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self.total += len(text)
+        if self.kept < self.max_chars:
+            text = text[:self.max_chars - self.kept]
+            self.parts.append(text)
+            self.kept += len(text)
+        return len(text)
+
+    @property
+    def truncated(self):
+        return self.total > self.kept
+
+    def getvalue(self):
+        return "".join(self.parts)
+
+
+def _has_toplevel_yield(tree):
+    """True if the module body itself (not a nested def/class/lambda) contains a yield"""
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.Yield, ast.YieldFrom)):
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        pending.extend(ast.iter_child_nodes(node))
+    return False
+
+
+def _toplevel_names(tree):
+    """Names bound by the module body, so they stay globals once wrapped in a function"""
+    names = set()
+    pending = list(tree.body)
+    while pending:
+        node = pending.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names.add(node.name)
+            continue
+        if isinstance(node, ast.Lambda):
+            continue
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split('.')[0] for alias in node.names if alias.name != '*')
+        pending.extend(ast.iter_child_nodes(node))
+    return sorted(names)
+
+
+class _ToplevelAnnotationStripper(ast.NodeTransformer):
+    """
+    Rewrite module-level `x: T = v` to `x = v` and drop bare `x: T`.
+
+    Annotated names can't be declared global, so they must go before the body is wrapped.
+    """
+
+    def visit_FunctionDef(self, node):
+        return node
+
+    visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = visit_FunctionDef
+
+    def visit_AnnAssign(self, node):
+        if node.value is None:
+            return ast.copy_location(ast.Pass(), node)
+        return ast.copy_location(ast.Assign(targets=[node.target], value=node.value), node)
+
+
+def _wrap_as_generator(tree):
+    """Turn a script with top-level yields into `def __mcp_script__(): <script>` that can be resumed"""
+    if not _has_toplevel_yield(tree):
+        return tree
+    tree = _ToplevelAnnotationStripper().visit(tree)
+    body = list(tree.body)
+    names = _toplevel_names(tree)
+    if names:
+        body.insert(0, ast.Global(names=names))
+    function = ast.FunctionDef(
+        name="__mcp_script__",
+        args=ast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[],
+                           kw_defaults=[], kwarg=None, defaults=[]),
+        body=body,
+        decorator_list=[],
+        returns=None,
+    )
+    module = ast.Module(body=[function], type_ignores=[])
+    return ast.fix_missing_locations(module)
+
+
+_code_cache = CompiledCodeCache()
+_code_namespaces = OrderedDict()  # name -> globals dict reused across execute_code calls
+
+# Main-thread timers. Under `blender --background` bpy.app.timers never fire, so
+# serve_headless() drives an equivalent loop on the main thread instead.
+HEADLESS_POLL_INTERVAL = 0.1
+# Pending connections the server socket queues (blender_pool.py health checks and sessions)
+LISTEN_BACKLOG = 16
+
+
+class HeadlessMainLoop:
+    """Minimal stand-in for bpy.app.timers, run by serve_headless() in background mode"""
+
+    def __init__(self):
+        self.timers = []  # heap of (due, sequence, function)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+
+    def register(self, function, first_interval=0.0):
+        with self.condition:
+            heapq.heappush(self.timers, (time.monotonic() + first_interval, next(self.sequence), function))
+            self.condition.notify()
+
+    def is_registered(self, function):
+        with self.condition:
+            return any(entry[2] is function for entry in self.timers)
+
+    def run_pending(self, timeout=HEADLESS_POLL_INTERVAL):
+        """Run due timers one at a time, waiting up to timeout for the first one"""
+        with self.condition:
+            if not self.timers or self.timers[0][0] > time.monotonic():
+                wait = timeout if not self.timers else min(timeout, self.timers[0][0] - time.monotonic())
+                self.condition.wait(max(0.0, wait))
+        while True:
+            with self.condition:
+                if not self.timers or self.timers[0][0] > time.monotonic():
+                    return
+                _, _, function = heapq.heappop(self.timers)
+            try:
+                interval = function()
+            except Exception:
+                traceback.print_exc()
+                interval = None
+            # The GUI event loop evaluates the depsgraph between timers; nothing does in
+            # background mode, so flush here to run the depsgraph update handlers
+            _flush_depsgraph_updates()
+            if interval is not None:
+                self.register(function, interval)
+
+
+_headless_loop = HeadlessMainLoop()
+
+
+def _flush_depsgraph_updates():
+    """Evaluate pending edits so the depsgraph update handlers (scene change log) see them"""
+    try:
+        bpy.context.view_layer.update()
+    except Exception:
+        traceback.print_exc()
+
+
+def _register_timer(function, first_interval=0.0):
+    """bpy.app.timers.register that also works in background mode"""
+    if bpy.app.background:
+        _headless_loop.register(function, first_interval)
+    else:
+        bpy.app.timers.register(function, first_interval=first_interval)
+
+
+def _is_timer_registered(function):
+    if bpy.app.background:
+        return _headless_loop.is_registered(function)
+    return bpy.app.timers.is_registered(function)
+
+# Cooperative (time-sliced) execute_code scripts
+COOPERATIVE_TICK_BUDGET_MS = 20
+COOPERATIVE_TICK_INTERVAL = 0.01
+MAX_FINISHED_SCRIPTS = 50
+
+
+def yield_now(progress=None, message=None):
+    """Progress marker for cooperative scripts: `yield yield_now(0.5, "half way")`"""
+    return {"progress": progress, "message": message}
+
+
+class CooperativeScript:
+    """A generator-based execute_code script resumed across timer ticks"""
+
+    def __init__(self, generator, namespace=None, tick_budget_ms=COOPERATIVE_TICK_BUDGET_MS,
+                 max_output=EXECUTE_CODE_MAX_OUTPUT):
+        self.id = uuid.uuid4().hex[:12]
+        self.generator = generator
+        self.namespace = namespace
+        self.tick_budget_ms = tick_budget_ms
+        self.output = CappedOutput(max_output)
+        self.state = "running"
+        self.progress = None
+        self.message = None
+        self.error = None
+        self.steps = 0
+        self.ticks = 0
+        self.busy_ms = 0.0
+        self.started_at = time.time()
+        self.finished_at = None
+        # Keep running in the session scene the script was started from
+        self.scene_name = _session_scenes.current
+
+    def step(self):
+        """Resume the script until it finishes or the tick budget is spent"""
+        tick_start = time.perf_counter()
+        deadline = tick_start + self.tick_budget_ms / 1000.0
+        self.ticks += 1
+        try:
+            with _session_scenes.scope(self.scene_name), redirect_stdout(self.output):
+                while time.perf_counter() < deadline:
+                    value = next(self.generator)
+                    self.steps += 1
+                    if isinstance(value, dict):
+                        self.progress = value.get("progress", self.progress)
+                        self.message = value.get("message", self.message)
+                    elif isinstance(value, (int, float)):
+                        self.progress = value
+        except StopIteration:
+            self._finish("finished")
+        except Exception as e:
+            traceback.print_exc()
+            self.error = str(e)
+            self._finish("failed")
+        finally:
+            self.busy_ms += (time.perf_counter() - tick_start) * 1000.0
+
+    def cancel(self):
+        if self.state == "running":
+            with suppress(Exception), redirect_stdout(self.output):
+                self.generator.close()
+            self._finish("cancelled")
+
+    def _finish(self, state):
+        self.state = state
+        self.finished_at = time.time()
+        if state == "finished":
+            self.progress = 1.0
+
+    def status(self):
+        status = {
+            "job_id": self.id,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "steps": self.steps,
+            "ticks": self.ticks,
+            "busy_ms": round(self.busy_ms, 3),
+            "elapsed_s": round((self.finished_at or time.time()) - self.started_at, 3),
+            "result": self.output.getvalue(),
+        }
+        if self.output.truncated:
+            status["output_truncated"] = True
+        if self.error:
+            status["error"] = self.error
+        if self.namespace:
+            status["namespace"] = self.namespace
+        return status
+
+
+_cooperative_scripts = OrderedDict()  # job id -> CooperativeScript
+
+
+def _drive_cooperative_scripts():
+    """Timer callback giving every running cooperative script one time slice"""
+    running = [script for script in _cooperative_scripts.values() if script.state == "running"]
+    for script in running:
+        script.step()
+
+    finished = [job_id for job_id, script in _cooperative_scripts.items() if script.state != "running"]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_SCRIPTS)]:
+        del _cooperative_scripts[job_id]
+
+    if any(script.state == "running" for script in _cooperative_scripts.values()):
+        return COOPERATIVE_TICK_INTERVAL
+    return None
+
+# Shared HTTP client for every integration (PolyHaven, Sketchfab, Hyper3D)
+HTTP_TIMEOUT = (10, 60)  # (connect, read) seconds
+HTTP_MAX_RETRIES = 3
+HTTP_BACKOFF_BASE = 0.5
+HTTP_BACKOFF_MAX = 8.0
+HTTP_POOL_SIZE = 16
+
+
+class HttpClient:
+    """Keep-alive, connection-pooled HTTP session with uniform timeouts and retries.
+
+    Retries connection errors, timeouts, 429 and 5xx responses with full-jitter
+    exponential backoff, and keeps request/latency counters per integration.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=HTTP_TIMEOUT, max_retries=HTTP_MAX_RETRIES, pool_size=HTTP_POOL_SIZE):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def _record(self, integration, elapsed_ms=None, error=None, retry=False):
+        with self.lock:
+            stats = self.stats.setdefault(integration, {
+                "requests": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0, "last_error": None,
+            })
+            if retry:
+                stats["retries"] += 1
+                return
+            stats["requests"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            if error:
+                stats["errors"] += 1
+                stats["last_error"] = error
+
+    @staticmethod
+    def _backoff(attempt):
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * 2 ** (attempt - 1)))
+
+    def request(self, integration, method, url, retries=None, **kwargs):
+        """Send a request, retrying transient failures; pass retries=0 for non-idempotent calls"""
+        retries = self.max_retries if retries is None else retries
+        kwargs.setdefault("timeout", self.timeout)
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                self._record(integration, (time.perf_counter() - start) * 1000.0, error=str(e))
+                if attempt >= retries:
+                    raise
+            else:
+                error = f"HTTP {response.status_code}" if response.status_code >= 400 else None
+                self._record(integration, (time.perf_counter() - start) * 1000.0, error=error)
+                if response.status_code not in self.RETRY_STATUSES or attempt >= retries:
+                    return response
+                response.close()
+            attempt += 1
+            self._record(integration, retry=True)
+            time.sleep(self._backoff(attempt))
+
+    def get(self, integration, url, **kwargs):
+        return self.request(integration, "GET", url, **kwargs)
+
+    def post(self, integration, url, **kwargs):
+        return self.request(integration, "POST", url, **kwargs)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                integration: {
+                    **stats,
+                    "total_ms": round(stats["total_ms"], 1),
+                    "max_ms": round(stats["max_ms"], 1),
+                    "avg_ms": round(stats["total_ms"] / stats["requests"], 1) if stats["requests"] else None,
+                }
+                for integration, stats in self.stats.items()
+            }
+
+
+_http = HttpClient()
+
+# On-disk asset cache (PolyHaven downloads)
+ASSET_CACHE_DIR = os.environ.get(
+    "BLENDERMCP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "blendermcp_asset_cache")
+)
+ASSET_CACHE_MAX_BYTES = 4 * 1024 ** 3
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+POLYHAVEN_FILES_TTL = 24 * 3600
+PARALLEL_FETCH_WORKERS = 8
+PER_HOST_CONNECTIONS = 6
+PATH_LOCK_STRIPES = 64
+
+
+class AssetCache:
+    """Content-addressed on-disk cache of downloaded files, evicted least-recently-used by size.
+
+    Every entry is a directory named after a hash of its key (e.g. asset id, type, resolution
+    and format), so multi-file assets such as glTF models keep their relative layout.
+    """
+
+    def __init__(self, root=ASSET_CACHE_DIR, max_bytes=ASSET_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        # A fixed set of locks striped by path hash, so the server never accumulates one per file
+        self.path_locks = [threading.Lock() for _ in range(PATH_LOCK_STRIPES)]
+        self.host_slots = {}
+        self.hits = 0
+        self.misses = 0
+
+    def entry_dir(self, *key):
+        """Return (and create) the directory of a cache entry, marking it as recently used"""
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        path = os.path.join(self.root, digest[:2], digest)
+        os.makedirs(path, exist_ok=True)
+        with suppress(OSError):
+            os.utime(path)
+        return path
+
+    @staticmethod
+    def resolve(entry_dir, relpath):
+        """Join a relative path onto an entry, refusing paths that escape it"""
+        base = os.path.abspath(entry_dir)
+        target = os.path.abspath(os.path.join(base, os.path.normpath(relpath)))
+        if os.path.commonpath([base, target]) != base:
+            raise ValueError(f"Path escapes the cache entry: {relpath}")
+        return target
+
+    def fetch(self, entry_dir, relpath, file_info, evict=True, integration="polyhaven", progress=None):
+        """
+        Return the local path of a file, streaming it from file_info["url"] on a miss.
+
+        file_info may carry the expected "size" and "md5" (as the PolyHaven API does),
+        which are checked before the download is committed to the cache. progress, if
+        given, is called with (bytes_done, bytes_total or None) as chunks arrive.
+        """
+        path = self.resolve(entry_dir, relpath)
+        expected_size = file_info.get("size")
+        if self._is_cached(path, expected_size):
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._download(file_info["url"], path, file_info.get("md5"), expected_size, integration, progress)
+        if evict:
+            self.evict(keep=entry_dir)
+        return path
+
+    def fetch_many(self, entry_dir, files, max_workers=PARALLEL_FETCH_WORKERS, integration="polyhaven"):
+        """
+        Fetch several (relpath, file_info) pairs concurrently over the shared HTTP session.
+
+        Returns {relpath: local path}, with the exception as value for files that failed.
+        """
+        files = list(files)
+        results = {}
+        if not files:
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(files)))) as pool:
+            futures = {
+                pool.submit(self.fetch, entry_dir, relpath, info, False, integration): relpath
+                for relpath, info in files
+            }
+            for future, relpath in futures.items():
+                try:
+                    results[relpath] = future.result()
+                except Exception as e:
+                    results[relpath] = e
+        self.evict(keep=entry_dir)
+        return results
+
+    @staticmethod
+    def _is_cached(path, expected_size):
+        return os.path.isfile(path) and (expected_size is None or os.path.getsize(path) == expected_size)
+
+    def _path_lock(self, path):
+        digest = hashlib.sha1(path.encode('utf-8')).digest()
+        return self.path_locks[int.from_bytes(digest[:4], "little") % PATH_LOCK_STRIPES]
+
+    def _host_slot(self, url):
+        host = urllib.parse.urlsplit(url).netloc
+        with self.lock:
+            return self.host_slots.setdefault(host, threading.BoundedSemaphore(PER_HOST_CONNECTIONS))
+
+    def _download(self, url, path, md5=None, size=None, integration="polyhaven", progress=None):
+        """
+        Stream a URL to disk in chunks, verifying size and md5 before moving it in place.
+
+        An interrupted download leaves its .part file behind and the next attempt resumes
+        it with an HTTP Range request.
+        """
+        part_path = f"{path}.part"
+        with self._path_lock(path):
+            if self._is_cached(path, size):
+                # Another worker finished it while we were waiting
+                return
+
+            offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+            if size is not None and offset > size:
+                offset = 0
+            checksum = hashlib.md5()
+            if offset and md5:
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                        checksum.update(chunk)
+
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            with self._host_slot(url), _http.get(integration, url, stream=True, headers=headers) as response:
+                if offset and response.status_code == 416:
+                    # The partial file already holds the whole body
+                    pass
+                else:
+                    response.raise_for_status()
+                    if offset and response.status_code != 206:
+                        # Server ignored the range: start over
+                        offset = 0
+                        checksum = hashlib.md5()
+                    content_length = response.headers.get("Content-Length")
+                    total = offset + int(content_length) if content_length else size
+                    done = offset
+                    with open(part_path, "ab" if offset else "wb") as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                            checksum.update(chunk)
+                            done += len(chunk)
+                            if progress:
+                                progress(done, total)
+
+            try:
+                if size is not None and os.path.getsize(part_path) != size:
+                    raise IOError(f"Size mismatch for {url}: expected {size}, got {os.path.getsize(part_path)}")
+                if md5 and checksum.hexdigest() != md5.lower():
+                    raise IOError(f"Checksum mismatch for {url}")
+            except IOError:
+                with suppress(OSError):
+                    os.unlink(part_path)
+                raise
+            os.replace(part_path, path)
+
+    def write_atomic(self, path, data):
+        part_path = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        with open(part_path, "wb") as f:
+            f.write(data)
+        os.replace(part_path, path)
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                with suppress(OSError):
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+        return total
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        with self.lock:
+            entries = []
+            for shard in os.scandir(self.root):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if entry.is_dir():
+                        with suppress(OSError):
+                            entries.append((entry.stat().st_mtime, entry.path, self._dir_size(entry.path)))
+            total = sum(size for _, _, size in entries)
+            for _, path, size in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if keep and os.path.abspath(path) == os.path.abspath(keep):
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+                print(f"Evicted asset cache entry: {path}")
+
+
+_asset_cache = AssetCache()
+
+
+# Local PolyHaven catalog (get_polyhaven_categories / search_polyhaven_assets)
+POLYHAVEN_CATALOG_TTL = 6 * 3600
+POLYHAVEN_ASSET_TYPES = {"hdris": 0, "textures": 1, "models": 2}
+
+
+class PolyHavenCatalog:
+    """The whole PolyHaven asset list, persisted on disk and indexed in memory.
+
+    Refreshed with a conditional (ETag) request once older than POLYHAVEN_CATALOG_TTL;
+    a stale copy keeps answering queries while offline.
+    """
+
+    # Relevance weight of a query token found in each field
+    FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "categories": 1.0}
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(ASSET_CACHE_DIR, "polyhaven_catalog.json")
+        self.assets = None
+        self.etag = None
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.by_type = {}
+        self.by_category = {}
+        self.by_tag = {}
+        self.tokens = {}  # token -> {asset_id: weight}
+
+    @staticmethod
+    def _tokenize(text):
+        return [token for token in "".join(c if c.isalnum() else " " for c in str(text).lower()).split() if token]
+
+    @property
+    def is_fresh(self):
+        return self.assets is not None and time.time() - self.fetched_at < POLYHAVEN_CATALOG_TTL
+
+    def _load(self):
+        with suppress(OSError, ValueError):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.assets = data["assets"]
+            self.etag = data.get("etag")
+            self.fetched_at = data.get("fetched_at", 0.0)
+            self._build_index()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"assets": self.assets, "etag": self.etag, "fetched_at": self.fetched_at}
+        _asset_cache.write_atomic(self.path, json.dumps(data).encode('utf-8'))
+
+    def _build_index(self):
+        by_type, by_category, by_tag, tokens = {}, {}, {}, {}
+        for asset_id, asset in self.assets.items():
+            by_type.setdefault(asset.get("type"), set()).add(asset_id)
+            for category in asset.get("categories", []):
+                by_category.setdefault(category.lower(), set()).add(asset_id)
+            for tag in asset.get("tags", []):
+                by_tag.setdefault(tag.lower(), set()).add(asset_id)
+
+            fields = {
+                "name": self._tokenize(asset_id) + self._tokenize(asset.get("name", "")),
+                "tags": [t for tag in asset.get("tags", []) for t in self._tokenize(tag)],
+                "categories": [t for category in asset.get("categories", []) for t in self._tokenize(category)],
+            }
+            for field, field_tokens in fields.items():
+                for token in set(field_tokens):
+                    weights = tokens.setdefault(token, {})
+                    weights[asset_id] = max(weights.get(asset_id, 0.0), self.FIELD_WEIGHTS[field])
+        self.by_type, self.by_category, self.by_tag, self.tokens = by_type, by_category, by_tag, tokens
+
+    def refresh(self, force=False):
+        """Make sure the catalog is loaded and not older than the TTL"""
+        with self.lock:
+            if self.assets is None:
+                self._load()
+            if self.is_fresh and not force:
+                return
+            headers = {"If-None-Match": self.etag} if self.etag and self.assets is not None else {}
+            try:
+                response = _http.get("polyhaven", "https://api.polyhaven.com/assets", headers=headers)
+            except requests.exceptions.RequestException as e:
+                if self.assets is None:
+                    raise
+                print(f"PolyHaven catalog refresh failed, serving cached copy: {str(e)}")
+                return
+            if response.status_code == 304:
+                self.fetched_at = time.time()
+            elif response.status_code == 200:
+                self.assets = response.json()
+                self.etag = response.headers.get("ETag")
+                self.fetched_at = time.time()
+                self._build_index()
+            elif self.assets is None:
+                raise RuntimeError(f"API request failed with status code {response.status_code}")
+            else:
+                return
+            self._save()
+
+    def _candidates(self, asset_type=None, categories=None, tags=None):
+        candidates = None
+
+        def narrow(ids):
+            nonlocal candidates
+            candidates = set(ids) if candidates is None else candidates & ids
+
+        if asset_type and asset_type != "all":
+            narrow(self.by_type.get(POLYHAVEN_ASSET_TYPES[asset_type], set()))
+        # Like the PolyHaven API, every listed category (and tag) has to match
+        for category in self._split(categories):
+            narrow(self.by_category.get(category, set()))
+        for tag in self._split(tags):
+            narrow(self.by_tag.get(tag, set()))
+        return set(self.assets) if candidates is None else candidates
+
+    @staticmethod
+    def _split(values):
+        if not values:
+            return []
+        if isinstance(values, str):
+            values = values.split(",")
+        return [v.strip().lower() for v in values if v.strip()]
+
+    def categories(self, asset_type):
+        counts = {}
+        for asset_id in self._candidates(asset_type):
+            for category in self.assets[asset_id].get("categories", []):
+                counts[category] = counts.get(category, 0) + 1
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def search(self, asset_type=None, categories=None, query=None, tags=None, limit=20):
+        """Return (top assets, total match count), ranked by relevance then popularity"""
+        candidates = self._candidates(asset_type, categories, tags)
+        scores = None
+        query_tokens = self._tokenize(query) if query else []
+        if query_tokens:
+            scores = {}
+            for token in query_tokens:
+                for asset_id, weight in self.tokens.get(token, {}).items():
+                    if asset_id in candidates:
+                        scores[asset_id] = scores.get(asset_id, 0.0) + weight
+            candidates = set(scores)
+
+        def rank(asset_id):
+            relevance = scores[asset_id] if scores is not None else 0.0
+            return relevance, self.assets[asset_id].get("download_count", 0)
+
+        top = heapq.nlargest(limit, candidates, key=rank)
+        return [(asset_id, self.assets[asset_id]) for asset_id in top], len(candidates)
+
+
+_polyhaven_catalog = PolyHavenCatalog()
+
+
+class TextureIndex:
+    """
+    Downloaded texture images by texture_id and map type, plus one shared material per texture.
+
+    Images are remembered by name together with the (size, mtime) of the file they were
+    loaded from, so set_texture only reloads an image when that file changed. Entries are
+    validated on lookup; a texture missing from the index (e.g. loaded by an older session)
+    is found once by name prefix and indexed from then on.
+    """
+
+    def __init__(self):
+        self.textures = {}
+        self.materials = {}
+
+    @staticmethod
+    def file_signature(filepath):
+        try:
+            stat = os.stat(bpy.path.abspath(filepath)) if filepath else None
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns) if stat else None
+
+    @staticmethod
+    def map_type(image):
+        """The lowercase map type of an image named "<texture_id>_<map>.<ext>" (e.g. "gl" for <id>_nor_gl.jpg)"""
+        return image.name.split('_')[-1].split('.')[0].lower()
+
+    def register(self, texture_id, image, filepath=None):
+        self.textures.setdefault(texture_id, {})[self.map_type(image)] = {
+            "image": image.name,
+            "signature": self.file_signature(filepath or image.filepath),
+        }
+
+    def lookup(self, texture_id):
+        """Returns {map_type: (image, entry)} for the indexed images that still exist"""
+        entries = self.textures.get(texture_id, {})
+        found = {}
+        for map_type, entry in list(entries.items()):
+            image = bpy.data.images.get(entry["image"])
+            if image is None:
+                del entries[map_type]
+            else:
+                found[map_type] = (image, entry)
+        return found
+
+    def discover(self, texture_id):
+        """Index images named "<texture_id>_<map>.<ext>" by scanning bpy.data.images once"""
+        discovered = {}
+        for image in bpy.data.images:
+            if image.name.startswith(texture_id + "_"):
+                map_type = self.map_type(image)
+                # Unknown source state: never equal to a real signature, so the first use reloads it
+                # (if the source file still exists)
+                self.textures.setdefault(texture_id, {})[map_type] = {"image": image.name, "signature": False}
+                discovered[map_type] = image
+        return discovered
+
+    def reset(self):
+        self.textures.clear()
+        self.materials.clear()
+
+
+_texture_index = TextureIndex()
+
+# Background jobs: network I/O on worker threads, bpy work back on the main thread
+BACKGROUND_WORKERS = 4
+MAX_FINISHED_JOBS = 100
+
+
+def _call_on_main_thread(function):
+    """Schedule a callable on Blender's main thread"""
+    _register_timer(function)
+
+
+class DeferredResult:
+    """Returned by handlers whose network I/O must run off the main thread.
+
+    fetch(job) runs on a worker thread and must not touch bpy; finish(fetched), if given,
+    runs afterwards on the main thread and produces the command result.
+    """
+
+    def __init__(self, fetch, finish=None):
+        self.fetch = fetch
+        self.finish = finish
+        self.background = False
+
+    def run(self):
+        """Run both steps synchronously on the calling thread"""
+        fetched = self.fetch(None)
+        return self.finish(fetched) if self.finish else fetched
+
+
+class BackgroundJob:
+    """State of one deferred command, shared between worker, main and client threads"""
+
+    def __init__(self, kind):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.state = "queued"
+        self.progress = None
+        self.message = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.future = None
+        self.done_event = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    @property
+    def done(self):
+        return self.done_event.is_set()
+
+    def report(self, progress=None, message=None):
+        """Progress hook for fetch steps"""
+        if progress is not None:
+            self.progress = progress
+        if message is not None:
+            self.message = message
+
+    def _settle(self, state, result=None, error=None):
+        with self.lock:
+            if self.done:
+                return
+            self.state = state
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.done_event.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in job callback: {str(e)}")
+
+    def complete(self, result):
+        self._settle("finished", result=result)
+
+    def fail(self, error):
+        self._settle("failed", error=error)
+
+    def cancel(self):
+        if self.future is not None:
+            self.future.cancel()
+        self._settle("cancelled", error="Job was cancelled")
+
+    def add_done_callback(self, callback):
+        with self.lock:
+            if not self.done:
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def response(self):
+        """Command response equivalent to running the job synchronously"""
+        if self.state == "finished":
+            return {"status": "success", "result": self.result}
+        return {"status": "error", "message": self.error or f"Job {self.state}"}
+
+    def status(self):
+        status = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": self.progress,
+            "message": self.message,
+            "elapsed_s": round((self.finished_at or time.time()) - self.created_at, 3),
+        }
+        if self.state == "finished":
+            status["result"] = self.result
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+class BackgroundJobManager:
+    """Runs DeferredResult fetch steps on a thread pool and their finish steps on the main thread"""
+
+    def __init__(self, max_workers=BACKGROUND_WORKERS):
+        self.max_workers = max_workers
+        self.executor = None
+        self.jobs = OrderedDict()
+        self.lock = threading.Lock()
+
+    def register(self, kind):
+        """Create a job without scheduling anything, for work driven from elsewhere"""
+        job = BackgroundJob(kind)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._forget_finished()
+        return job
+
+    def submit(self, kind, deferred):
+        return self.run(self.register(kind), deferred)
+
+    def run(self, job, deferred):
+        """Schedule a DeferredResult as the (remaining) work of an already registered job"""
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blendermcp")
+        job.future = self.executor.submit(self._run, job, deferred)
+        return job
+
+    def _run(self, job, deferred):
+        if job.done:
+            return
+        job.state = "running"
+        try:
+            fetched = deferred.fetch(job)
+        except Exception as e:
+            traceback.print_exc()
+            job.fail(str(e))
+            return
+
+        if deferred.finish is None:
+            job.complete(fetched)
+            return
+
+        job.state = "importing"
+
+        def finish_on_main_thread():
+            if job.done:
+                return None
+            try:
+                job.complete(deferred.finish(fetched))
+            except Exception as e:
+                traceback.print_exc()
+                job.fail(str(e))
+            return None
+
+        _call_on_main_thread(finish_on_main_thread)
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Job not found: {job_id}")
+        return job
+
+    def shutdown(self):
+        with self.lock:
+            for job in self.jobs.values():
+                if not job.done:
+                    job.cancel()
+            if self.executor is not None:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+
+
+_background_jobs = BackgroundJobManager()
+
+# Hyper3D Rodin endpoints (overridable to point the addon at a local mock server)
+RODIN_MAIN_SITE_URL = os.environ.get(
+    "BLENDERMCP_RODIN_URL", "https://hyperhuman.deemos.com/api/v2"
+).rstrip("/")
+RODIN_FAL_AI_URL = os.environ.get(
+    "BLENDERMCP_RODIN_FAL_AI_URL", "https://queue.fal.run/fal-ai/hyper3d"
+).rstrip("/")
+RODIN_POLL_INITIAL = 2.0
+RODIN_POLL_MAX = 30.0
+RODIN_POLL_BACKOFF = 1.5
+RODIN_MAX_POLL_ERRORS = 5
+RODIN_JOB_TIMEOUT = 30 * 60
+MAX_CACHED_RODIN_STATES = 200
+
+
+class RodinJobTracker:
+    """Polls Hyper3D Rodin tasks from one daemon thread with adaptive backoff.
+
+    Each tracked task is backed by a BackgroundJob, so get_job_status, wait_for_job and
+    cancel_job work on it. The poll interval grows while the remote status stays the same
+    and resets when it changes. The last status of every task is cached, keyed by the
+    subscription key (main site) or request id (fal.ai).
+    """
+
+    def __init__(self):
+        self.tasks = {}
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def track(self, key, poll, on_done=None, timeout=RODIN_JOB_TIMEOUT):
+        """
+        Start tracking a remote task and return its BackgroundJob.
+
+        poll() runs on the tracker thread, must not touch bpy and returns (state, status)
+        with state one of "pending", "done" or "failed". on_done(job, status), if given,
+        takes over the job once the task is done; otherwise the job completes with status.
+        """
+        job = _background_jobs.register("rodin")
+        job.state = "running"
+        job.message = "Waiting for the first status poll"
+        now = time.monotonic()
+        with self.lock:
+            self.tasks[job.id] = {
+                "job": job,
+                "key": key,
+                "poll": poll,
+                "on_done": on_done,
+                "timeout": timeout,
+                "deadline": now + timeout,
+                "interval": RODIN_POLL_INITIAL,
+                "next_poll": now,
+                "last_status": None,
+                "polls": 0,
+                "errors": 0,
+            }
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="blendermcp-rodin", daemon=True)
+                self.thread.start()
+        self.wakeup.set()
+        return job
+
+    def cached_status(self, key):
+        """Last polled status of a tracked task, or None"""
+        with self.lock:
+            return self.states.get(key)
+
+    def _loop(self):
+        while True:
+            # Clear before scanning, so a track() that sets the event from here on is seen
+            self.wakeup.clear()
+            with self.lock:
+                for job_id in [job_id for job_id, task in self.tasks.items() if task["job"].done]:
+                    del self.tasks[job_id]
+                if not self.tasks:
+                    self.thread = None
+                    return
+                now = time.monotonic()
+                due = [task for task in self.tasks.values() if task["next_poll"] <= now]
+                wait = min(task["next_poll"] for task in self.tasks.values()) - now
+
+            if not due:
+                self.wakeup.wait(timeout=wait)
+                continue
+
+            for task in due:
+                try:
+                    self._poll(task)
+                except Exception as e:
+                    traceback.print_exc()
+                    task["job"].fail(str(e))
+
+    def _poll(self, task):
+        job = task["job"]
+        if job.done:
+            return
+        if time.monotonic() > task["deadline"]:
+            job.fail(f"Rodin task {task['key']} did not finish within {task['timeout']}s")
+            return
+
+        try:
+            state, status = task["poll"]()
+        except Exception as e:
+            task["errors"] += 1
+            if task["errors"] >= RODIN_MAX_POLL_ERRORS:
+                job.fail(f"Polling failed {task['errors']} times in a row: {str(e)}")
+                return
+            task["interval"] = min(RODIN_POLL_MAX, task["interval"] * RODIN_POLL_BACKOFF)
+            task["next_poll"] = time.monotonic() + task["interval"]
+            job.report(message=f"Status poll failed, retrying in {task['interval']:.1f}s: {str(e)}")
+            return
+
+        task["errors"] = 0
+        task["polls"] += 1
+        with self.lock:
+            self.states[task["key"]] = {"state": state, "status": status, "polled_at": time.time()}
+            self.states.move_to_end(task["key"])
+            while len(self.states) > MAX_CACHED_RODIN_STATES:
+                self.states.popitem(last=False)
+
+        if state in ("done", "failed"):
+            # Stop polling now; an import handed to on_done keeps the job open a while longer
+            with self.lock:
+                self.tasks.pop(job.id, None)
+
+        if state == "done":
+            job.report(progress=1.0, message=f"Generation done after {task['polls']} polls")
+            if task["on_done"] is not None:
+                task["on_done"](job, status)
+            else:
+                job.complete({"state": state, "status": status})
+        elif state == "failed":
+            job.fail(f"Rodin task {task['key']} failed: {status}")
+        else:
+            if status == task["last_status"]:
+                task["interval"] = min(RODIN_POLL_MAX, task["interval"] * RODIN_POLL_BACKOFF)
+            else:
+                task["interval"] = RODIN_POLL_INITIAL
+            task["last_status"] = status
+            task["next_poll"] = time.monotonic() + task["interval"]
+            job.report(message=f"{status} (poll {task['polls']}, next in {task['interval']:.1f}s)")
+
+
+_rodin_tracker = RodinJobTracker()
+
+# Incremental scene-change feed (get_scene_changes)
+SCENE_CHANGE_LOG_SIZE = 10000
+
+
+class SceneChangeLog:
+    """Versioned log of added, removed and modified objects, materials and images.
+
+    Fed by the depsgraph_update_post handler. Only the latest change per datablock
+    is kept, so the log stays bounded no matter how often an object is touched.
+    """
+
+    TRACKED_TYPES = {
+        "OBJECT": "objects",
+        "MATERIAL": "materials",
+        "IMAGE": "images",
+    }
+    # Datablocks the addon (tagged with this custom property) or the renderer create for
+    # their own use, which are not scene changes
+    INTERNAL_PROPERTY = "blendermcp_internal"
+    INTERNAL_IMAGES = ("Render Result", "Viewer Node")
+
+    def __init__(self, max_entries=SCENE_CHANGE_LOG_SIZE):
+        self.max_entries = max_entries
+        self.version = 0
+        # Bumped by every depsgraph update touching a non-internal datablock of any type
+        # (lights, cameras, worlds, render settings, node groups, ...), for result caches
+        self.content_version = 0
+        self.suppressed = 0
+        # Changes older than this version have been dropped from the log
+        self.floor_version = 0
+        self.entries = OrderedDict()  # (id_type, name) -> change dict, ordered by version
+        self.known = None  # id_type -> set of names, filled lazily (bpy.data is restricted at register time)
+        self.internal = set()  # (id_type, name) of tracked datablocks seen with the internal tag
+        self.lock = threading.Lock()
+
+    @classmethod
+    def is_internal(cls, datablock):
+        if isinstance(datablock, bpy.types.Image) and datablock.name in cls.INTERNAL_IMAGES:
+            return True
+        return bool(datablock.get(cls.INTERNAL_PROPERTY)) if hasattr(datablock, "get") else False
+
+    @contextmanager
+    def suppressed_updates(self):
+        """
+        Don't bump content_version for updates flushed inside the block.
+
+        For addon operations that temporarily change the scene and restore it (preview
+        renders); they should end with a view_layer.update() so the depsgraph update
+        handlers run before the block exits.
+        """
+        with self.lock:
+            self.suppressed += 1
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.suppressed -= 1
+
+    @staticmethod
+    def _id_type(datablock):
+        if isinstance(datablock, bpy.types.Object):
+            return "OBJECT"
+        if isinstance(datablock, bpy.types.Material):
+            return "MATERIAL"
+        if isinstance(datablock, bpy.types.Image):
+            return "IMAGE"
+        return None
+
+    def _snapshot_names(self):
+        return {id_type: set(getattr(bpy.data, attr).keys()) for id_type, attr in self.TRACKED_TYPES.items()}
+
+    def reset(self):
+        """Forget everything, forcing clients to resync from a full snapshot (e.g. after loading a file)"""
+        with self.lock:
+            self.version += 1
+            self.content_version += 1
+            self.floor_version = self.version
+            self.entries.clear()
+            self.known = None
+            self.internal.clear()
+
+    def _is_internal_name(self, id_type, name):
+        """Whether a tracked datablock is internal; removed ones are judged by how they were last seen"""
+        key = (id_type, name)
+        datablock = getattr(bpy.data, self.TRACKED_TYPES[id_type]).get(name)
+        if datablock is None:
+            internal = key in self.internal
+            self.internal.discard(key)
+            return internal
+        if self.is_internal(datablock):
+            self.internal.add(key)
+            return True
+        self.internal.discard(key)
+        return False
+
+    def _record(self, version, action, id_type, name, what=None):
+        if self._is_internal_name(id_type, name):
+            return False
+        key = (id_type, name)
+        previous = self.entries.pop(key, None)
+        # A datablock added and then touched is still "added" for clients that never saw it
+        if previous is not None and previous["action"] == "added" and action == "modified":
+            action, what = "added", None
+        change = {"version": version, "action": action, "type": id_type, "name": name}
+        if what:
+            change["what"] = what
+        self.entries[key] = change
+        while len(self.entries) > self.max_entries:
+            _, dropped = self.entries.popitem(last=False)
+            self.floor_version = dropped["version"]
+        return True
+
+    def on_depsgraph_update(self, depsgraph):
+        """Record the changes contained in one depsgraph update"""
+        with self.lock:
+            if self.known is None:
+                self.known = self._snapshot_names()
+
+            modified = {id_type: {} for id_type in self.TRACKED_TYPES}
+            content_changed = False
+            for update in depsgraph.updates:
+                datablock = getattr(update.id, "original", update.id)
+                if not self.is_internal(datablock):
+                    content_changed = True
+                id_type = self._id_type(datablock)
+                if id_type is None:
+                    continue
+                what = []
+                if update.is_updated_transform:
+                    what.append("transform")
+                if update.is_updated_geometry:
+                    what.append("geometry")
+                if update.is_updated_shading:
+                    what.append("shading")
+                modified[id_type][datablock.name] = what
+
+            version = self.version + 1
+            changed = False
+            for id_type, attr in self.TRACKED_TYPES.items():
+                known = self.known[id_type]
+                collection = getattr(bpy.data, attr)
+                # Only diff whole name sets when something was added, removed or renamed
+                if len(collection) != len(known) or any(name not in known for name in modified[id_type]):
+                    current = set(collection.keys())
+                    for name in current - known:
+                        changed |= self._record(version, "added", id_type, name)
+                    for name in known - current:
+                        changed |= self._record(version, "removed", id_type, name)
+                    self.known[id_type] = current
+                    known = current
+                for name, what in modified[id_type].items():
+                    if name in known:
+                        changed |= self._record(version, "modified", id_type, name, what)
+
+            if changed:
+                self.version = version
+            if (changed or content_changed) and not self.suppressed:
+                self.content_version += 1
+
+    def changes_since(self, since_version):
+        """Return (changes, full_resync) for every change newer than since_version"""
+        with self.lock:
+            full_resync = since_version < self.floor_version
+            changes = []
+            for change in reversed(self.entries.values()):
+                if change["version"] <= since_version:
+                    break
+                changes.append(change)
+            changes.reverse()
+            return changes, full_resync
+
+
+_scene_change_log = SceneChangeLog()
+
+
+def _mark_internal(*datablocks, internal=True):
+    """Tag datablocks the addon creates for its own use, so the change log ignores them"""
+    for datablock in datablocks:
+        if internal:
+            datablock[SceneChangeLog.INTERNAL_PROPERTY] = True
+        elif SceneChangeLog.INTERNAL_PROPERTY in datablock:
+            del datablock[SceneChangeLog.INTERNAL_PROPERTY]
+
+
+class SpatialIndex:
+    """World-space AABBs of every mesh object in the active scene, answered with vectorized queries.
+
+    The index is rebuilt lazily and afterwards kept current by replaying the scene change log,
+    so queries only re-measure the objects that were added or modified since the last one.
+    """
+
+    # Rebuild from scratch when more than this fraction of the index changed
+    REBUILD_RATIO = 0.5
+
+    def __init__(self):
+        self.names = []
+        self.rows = {}  # name -> row in mins/maxs
+        self.mins = np.empty((0, 3))
+        self.maxs = np.empty((0, 3))
+        self.scene_name = None
+        self.synced_version = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def rebuild(self, scene):
+        mesh_objs = [obj for obj in scene.objects if obj.type == 'MESH']
+        boxes = BlenderMCPServer._get_aabbs(mesh_objs) if mesh_objs else np.empty((0, 2, 3))
+        self.names = [obj.name for obj in mesh_objs]
+        self.rows = {name: row for row, name in enumerate(self.names)}
+        self.mins = boxes[:, 0, :].copy()
+        self.maxs = boxes[:, 1, :].copy()
+        self.scene_name = scene.name
+
+    def _remove(self, name):
+        row = self.rows.pop(name, None)
+        if row is None:
+            return
+        last = len(self.names) - 1
+        if row != last:
+            # Swap-remove keeps the arrays dense without shifting every row
+            moved = self.names[last]
+            self.names[row] = moved
+            self.rows[moved] = row
+            self.mins[row] = self.mins[last]
+            self.maxs[row] = self.maxs[last]
+        self.names.pop()
+        self.mins = self.mins[:last]
+        self.maxs = self.maxs[:last]
+
+    def _update(self, objs):
+        if not objs:
+            return
+        boxes = BlenderMCPServer._get_aabbs(objs)
+        new_names = []
+        for obj, box in zip(objs, boxes):
+            row = self.rows.get(obj.name)
+            if row is None:
+                new_names.append((obj.name, box))
+            else:
+                self.mins[row] = box[0]
+                self.maxs[row] = box[1]
+        if new_names:
+            start = len(self.names)
+            for offset, (name, _) in enumerate(new_names):
+                self.names.append(name)
+                self.rows[name] = start + offset
+            self.mins = np.concatenate([self.mins, np.array([box[0] for _, box in new_names])])
+            self.maxs = np.concatenate([self.maxs, np.array([box[1] for _, box in new_names])])
+
+    def sync(self):
+        """Bring the index up to date with the active scene"""
+        scene = bpy.context.scene
+        # Count edits whose depsgraph updates haven't run yet (e.g. from the previous command)
+        _flush_depsgraph_updates()
+        version = _scene_change_log.version
+        # Objects unlinked from the scene but kept in bpy.data never show up as depsgraph updates
+        mesh_count = sum(1 for obj in scene.objects if obj.type == 'MESH')
+        if self.synced_version is None or self.scene_name != scene.name or mesh_count != len(self.names):
+            self.rebuild(scene)
+            self.synced_version = version
+            return
+
+        changes, full_resync = _scene_change_log.changes_since(self.synced_version)
+        object_changes = [c for c in changes if c["type"] == "OBJECT"]
+        if full_resync or len(object_changes) > max(64, len(self.names) * self.REBUILD_RATIO):
+            self.rebuild(scene)
+        else:
+            refreshed = []
+            for change in object_changes:
+                obj = scene.objects.get(change["name"])
+                if change["action"] == "removed" or obj is None or obj.type != 'MESH':
+                    self._remove(change["name"])
+                else:
+                    refreshed.append(obj)
+            self._update(refreshed)
+        self.synced_version = version
+
+    def row(self, name):
+        row = self.rows.get(name)
+        if row is None:
+            raise ValueError(f"Mesh object not found in scene: {name}")
+        return row
+
+    def overlaps(self, names=None, tolerance=0.0):
+        """Return every pair of boxes overlapping within tolerance (negative ignores touching contacts)"""
+        pairs = []
+        if names:
+            queried = np.zeros(len(self.names), dtype=bool)
+            for name in dict.fromkeys(names):
+                row = self.row(name)
+                hits = np.all((self.mins <= self.maxs[row] + tolerance) & (self.maxs + tolerance >= self.mins[row]), axis=1)
+                # Pairs with an earlier queried name were already reported from its side
+                queried[row] = True
+                hits &= ~queried
+                pairs.extend((name, self.names[other]) for other in np.nonzero(hits)[0])
+            return pairs
+
+        # Sweep and prune along X: only boxes starting before the current one ends can overlap it
+        order = np.argsort(self.mins[:, 0], kind='stable')
+        sorted_mins = self.mins[order]
+        sorted_maxs = self.maxs[order]
+        ends = np.searchsorted(sorted_mins[:, 0], sorted_maxs[:, 0] + tolerance, side='right')
+        for i in range(len(order)):
+            if ends[i] <= i + 1:
+                continue
+            candidates = slice(i + 1, ends[i])
+            hits = np.all(
+                (sorted_mins[candidates, 1:] <= sorted_maxs[i, 1:] + tolerance)
+                & (sorted_maxs[candidates, 1:] + tolerance >= sorted_mins[i, 1:]),
+                axis=1,
+            )
+            pairs.extend((self.names[order[i]], self.names[order[i + 1 + j]]) for j in np.nonzero(hits)[0])
+        return pairs
+
+    def region(self, region_min, region_max, inside=False):
+        """Return names of boxes intersecting (or fully inside) the region"""
+        region_min = np.asarray(region_min, dtype=np.float64)
+        region_max = np.asarray(region_max, dtype=np.float64)
+        if inside:
+            hits = np.all((self.mins >= region_min) & (self.maxs <= region_max), axis=1)
+        else:
+            hits = np.all((self.mins <= region_max) & (self.maxs >= region_min), axis=1)
+        return [self.names[row] for row in np.nonzero(hits)[0]]
+
+    def nearest(self, name=None, point=None, k=5):
+        """Return the k boxes closest to an object's box or to a point, with their distances"""
+        if name is not None:
+            row = self.row(name)
+            query_min, query_max = self.mins[row], self.maxs[row]
+        else:
+            query_min = query_max = np.asarray(point, dtype=np.float64)
+            row = None
+        # Per-axis separation between boxes, zero where they overlap on that axis
+        gaps = np.maximum(0.0, np.maximum(self.mins - query_max, query_min - self.maxs))
+        distances = np.linalg.norm(gaps, axis=1)
+        if row is not None:
+            distances[row] = np.inf
+        count = min(k, len(self.names) - (1 if row is not None else 0))
+        if count <= 0:
+            return []
+        nearest_rows = np.argpartition(distances, count - 1)[:count]
+        nearest_rows = nearest_rows[np.argsort(distances[nearest_rows])]
+        return [(self.names[r], float(distances[r])) for r in nearest_rows]
+
+    def gaps(self, name_a, name_b):
+        """Per-axis gap between two boxes: positive is empty space, negative is penetration depth"""
+        a, b = self.row(name_a), self.row(name_b)
+        gap = np.maximum(self.mins[b] - self.maxs[a], self.mins[a] - self.maxs[b])
+        return gap, float(np.linalg.norm(np.maximum(gap, 0.0)))
+
+
+_spatial_index = SpatialIndex()
+
+# Session-isolated scenes (commands carrying a top-level "session" field)
+MAX_SESSION_SCENES = 8
+SESSION_SCENE_PREFIX = "MCP Session "
+
+
+def _copy_scene_contents(source, target):
+    """
+    Deep-copy the collections and objects of one scene into another.
+
+    Object data and materials are copied too, so edits never leak back into the source;
+    data shared between objects stays shared, and parents are remapped onto the copies.
+    Returns {"objects" | "materials" | "collections": {source name: copy}}.
+    """
+    object_copies = {}
+    data_copies = {}
+    material_copies = {}
+    collection_copies = {}
+
+    def copy_material(material):
+        if material is None:
+            return None
+        if material not in material_copies:
+            material_copies[material] = material.copy()
+        return material_copies[material]
+
+    def copy_object(obj):
+        if obj in object_copies:
+            return object_copies[obj]
+        copy = obj.copy()
+        if obj.data is not None:
+            if obj.data not in data_copies:
+                data_copy = data_copies[obj.data] = obj.data.copy()
+                data_materials = getattr(data_copy, "materials", None)
+                if data_materials is not None:
+                    for i, material in enumerate(data_materials):
+                        data_materials[i] = copy_material(material)
+            copy.data = data_copies[obj.data]
+        for slot in copy.material_slots:
+            if slot.link == 'OBJECT':
+                slot.material = copy_material(slot.material)
+        object_copies[obj] = copy
+        return copy
+
+    def copy_tree(source_collection, target_collection):
+        for obj in source_collection.objects:
+            target_collection.objects.link(copy_object(obj))
+        for child in source_collection.children:
+            child_copy = collection_copies[child.name] = bpy.data.collections.new(child.name)
+            target_collection.children.link(child_copy)
+            copy_tree(child, child_copy)
+
+    copy_tree(source.collection, target.collection)
+    for obj, copy in object_copies.items():
+        if obj.parent in object_copies:
+            copy.parent = object_copies[obj.parent]
+            copy.matrix_parent_inverse = obj.matrix_parent_inverse.copy()
+    return {
+        "objects": {obj.name: copy for obj, copy in object_copies.items()},
+        "materials": {material.name: copy for material, copy in material_copies.items()},
+        "collections": collection_copies,
+    }
+
+
+def _remove_scene_contents(scene):
+    """Delete a scene's collections, objects, object data and materials that no other scene uses"""
+    collections = set(scene.collection.children_recursive)
+    owned = {scene.collection} | collections
+    objects = [obj for obj in scene.collection.all_objects if set(obj.users_collection) <= owned]
+    data = {obj.data for obj in objects if obj.data is not None}
+    materials = {slot.material for obj in objects for slot in obj.material_slots if slot.material}
+
+    bpy.data.batch_remove(objects)
+    shared = {child for other in bpy.data.scenes if other != scene
+              for child in other.collection.children_recursive}
+    bpy.data.batch_remove([coll for coll in collections if coll not in shared])
+    bpy.data.batch_remove([block for block in data if block.users == 0])
+    bpy.data.batch_remove([material for material in materials if material.users == 0])
+
+
+class SessionScenes:
+    """
+    One bpy Scene per client session, created lazily and evicted least-recently-used.
+
+    A new session scene copies the blendermcp_* settings, world, units and frame range of
+    the current scene; with a template, the template scene's contents are deep-copied in.
+    Commands for a session run under a context override pointing at its scene.
+    """
+
+    def __init__(self, max_sessions=MAX_SESSION_SCENES):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session key -> {"scene": name, "created_at", "last_used"}
+        # Scene of the session whose command is running on the main thread, if any
+        self.current = None
+
+    def get(self, key, template=None):
+        entry = self.sessions.get(key)
+        scene = bpy.data.scenes.get(entry["scene"]) if entry else None
+        if scene is None:
+            scene = self._create(key, template)
+            entry = self.sessions[key] = {"scene": scene.name, "created_at": time.time()}
+        entry["last_used"] = time.time()
+        self.sessions.move_to_end(key)
+        self._evict()
+        return scene
+
+    def _create(self, key, template_name):
+        template = None
+        if template_name:
+            template = bpy.data.scenes.get(template_name)
+            if template is None:
+                raise ValueError(f"Template scene not found: {template_name}")
+        base = template or bpy.context.scene
+
+        scene = bpy.data.scenes.new(SESSION_SCENE_PREFIX + key)
+        for name in bpy.types.Scene.bl_rna.properties.keys():
+            if name.startswith("blendermcp_"):
+                setattr(scene, name, getattr(base, name))
+        scene.world = base.world
+        scene.unit_settings.system = base.unit_settings.system
+        scene.unit_settings.scale_length = base.unit_settings.scale_length
+        scene.render.engine = base.render.engine
+        scene.frame_start = base.frame_start
+        scene.frame_end = base.frame_end
+        scene.frame_current = base.frame_current
+        if template is not None:
+            copies = _copy_scene_contents(template, scene)
+            if template.camera is not None:
+                scene.camera = copies["objects"].get(template.camera.name)
+        print(f"Created session scene {scene.name}")
+        return scene
+
+    def _evict(self):
+        while len(self.sessions) > self.max_sessions:
+            key = next(iter(self.sessions))
+            if self.current is not None and self.sessions[key]["scene"] == self.current:
+                break
+            print(f"Evicting idle session {key}")
+            self.close(key)
+
+    def close(self, key):
+        entry = self.sessions.pop(key, None)
+        if entry is None:
+            raise ValueError(f"Session not found: {key}")
+        scene = bpy.data.scenes.get(entry["scene"])
+        if scene is not None:
+            _remove_scene_contents(scene)
+            bpy.data.scenes.remove(scene)
+
+    @contextmanager
+    def scope(self, scene_name):
+        """Run the enclosed block with bpy.context.scene / view_layer pointing at a session scene"""
+        if scene_name is None:
+            yield None
+            return
+        scene = bpy.data.scenes.get(scene_name)
+        if scene is None:
+            raise RuntimeError(f"Session scene {scene_name} was closed")
+        previous = self.current
+        self.current = scene.name
+        try:
+            with bpy.context.temp_override(scene=scene, view_layer=scene.view_layers[0]):
+                yield scene
+        finally:
+            self.current = previous
+
+    def status(self):
+        now = time.time()
+        sessions = []
+        for key, entry in self.sessions.items():
+            scene = bpy.data.scenes.get(entry["scene"])
+            sessions.append({
+                "session": key,
+                "scene": entry["scene"],
+                "objects": len(scene.objects) if scene else 0,
+                "age_s": round(now - entry["created_at"], 1),
+                "idle_s": round(now - entry["last_used"], 1),
+            })
+        return {"sessions": sessions, "max_sessions": self.max_sessions}
+
+    def reset(self):
+        self.sessions.clear()
+        self.current = None
+
+
+_session_scenes = SessionScenes()
+
+# Scene snapshots (snapshot_scene / restore_scene)
+SNAPSHOT_SCENE_PREFIX = "BlenderMCP_Snapshot "
+SNAPSHOT_DIR = os.path.join(ASSET_CACHE_DIR, "snapshots")
+
+
+class SceneSnapshots:
+    """
+    Named copies of a scene's contents that can be restored any number of times.
+
+    "memory" snapshots deep-copy the objects into a hidden holder scene; the copies are
+    tagged internal (kept out of the change log) and the original names are stored on the
+    holder, so a snapshot survives saving the .blend file. "file" snapshots write the
+    scene's collections and objects to a .blend library and append them back on restore.
+    """
+
+    META_KEY = "blendermcp_snapshot"
+
+    @staticmethod
+    def _file_paths(name):
+        safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in name)
+        base = os.path.join(SNAPSHOT_DIR, f"{safe}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}")
+        return base + ".blend", base + ".json"
+
+    @staticmethod
+    def _copy_name():
+        """Unique name for a held copy, so copies never take the ".001" names of scene datablocks"""
+        return f"snapshot_{uuid.uuid4().hex[:12]}"
+
+    @staticmethod
+    def _holder(name):
+        return bpy.data.scenes.get(SNAPSHOT_SCENE_PREFIX + name)
+
+    def snapshot(self, scene, name, mode="memory"):
+        """
+        Save a snapshot, replacing an existing one of that name only once the new copy or
+        file is complete, so a failure part way through keeps the previous snapshot.
+        """
+        if mode not in ("memory", "file"):
+            raise ValueError("mode must be 'memory' or 'file'")
+        meta = {
+            "name": name,
+            "mode": mode,
+            "source_scene": scene.name,
+            "camera": scene.camera.name if scene.camera else None,
+            "objects": len(scene.collection.all_objects),
+            "created_at": time.time(),
+        }
+
+        if mode == "memory":
+            holder = bpy.data.scenes.new(f"{SNAPSHOT_SCENE_PREFIX}{name} {uuid.uuid4().hex[:8]}")
+            try:
+                meta["names"] = self._copy_into_holder(scene, holder)
+                holder[self.META_KEY] = json.dumps(meta)
+            except BaseException:
+                _remove_scene_contents(holder)
+                bpy.data.scenes.remove(holder)
+                raise
+            self._delete_files(name)
+            self._delete_holder(name)
+            holder.name = SNAPSHOT_SCENE_PREFIX + name
+        else:
+            blend_path, meta_path = self._file_paths(name)
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            meta["collections"] = [coll.name for coll in scene.collection.children]
+            meta["master_objects"] = [obj.name for obj in scene.collection.objects]
+            meta["all_objects"] = [obj.name for obj in scene.collection.all_objects]
+            datablocks = set(scene.collection.children) | set(scene.collection.objects)
+            temp_path = f"{blend_path[:-len('.blend')]}.{uuid.uuid4().hex[:8]}.tmp.blend"
+            try:
+                bpy.data.libraries.write(temp_path, datablocks, path_remap='ABSOLUTE', fake_user=True)
+                meta["filepath"] = blend_path
+                meta["bytes"] = os.path.getsize(temp_path)
+                os.replace(temp_path, blend_path)
+            finally:
+                with suppress(FileNotFoundError):
+                    os.remove(temp_path)
+            _asset_cache.write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+            self._delete_holder(name)
+        return meta
+
+    def _copy_into_holder(self, scene, holder):
+        """Copy a scene into a holder under neutral names; returns {kind: {copy name: original name}}"""
+        copies = _copy_scene_contents(scene, holder)
+        names = {"objects": {}, "data": {}, "materials": {}, "collections": {}}
+        renamed_data = set()
+        for original, copy in copies["objects"].items():
+            copy.name = self._copy_name()
+            _mark_internal(copy)
+            names["objects"][copy.name] = original
+            if copy.data is not None and copy.data not in renamed_data:
+                renamed_data.add(copy.data)
+                original_data = bpy.data.objects[original].data.name
+                copy.data.name = self._copy_name()
+                names["data"][copy.data.name] = original_data
+        for kind in ("materials", "collections"):
+            for original, copy in copies[kind].items():
+                copy.name = self._copy_name()
+                _mark_internal(copy)
+                names[kind][copy.name] = original
+        return names
+
+    def _load_meta(self, name):
+        holder = self._holder(name)
+        if holder is not None and self.META_KEY in holder:
+            return json.loads(holder[self.META_KEY])
+        _, meta_path = self._file_paths(name)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except OSError:
+            raise ValueError(f"Snapshot not found: {name}")
+
+    @staticmethod
+    def _strip_suffix(name):
+        base, _, suffix = name.rpartition(".")
+        return base if base and suffix.isdigit() else name
+
+    def restore(self, scene, name):
+        """
+        Replace a scene's contents with a snapshot; returns (meta, renamed).
+
+        Datablocks also used by another scene survive clearing the scene, so restored
+        copies can't always get their original names back; renamed maps each such
+        original name to the name the restored copy got.
+        """
+        meta = self._load_meta(name)
+        _remove_scene_contents(scene)
+        renamed = {}
+        restored_objects = {}  # original name -> restored object
+
+        if meta["mode"] == "memory":
+            holder = self._holder(name)
+            copies = _copy_scene_contents(holder, scene)
+            names = meta["names"]
+
+            def rename(copy, original):
+                copy.name = original
+                if copy.name != original:
+                    renamed[original] = copy.name
+
+            for holder_name, copy in copies["objects"].items():
+                original = names["objects"].get(holder_name, holder_name)
+                rename(copy, original)
+                _mark_internal(copy, internal=False)
+                restored_objects[original] = copy
+            renamed_data = set()
+            for holder_obj in holder.collection.all_objects:
+                data = copies["objects"][holder_obj.name].data
+                if holder_obj.data is not None and holder_obj.data.name in names["data"] and data not in renamed_data:
+                    renamed_data.add(data)
+                    rename(data, names["data"][holder_obj.data.name])
+            for kind in ("materials", "collections"):
+                for holder_name, copy in copies[kind].items():
+                    rename(copy, names[kind].get(holder_name, holder_name))
+                    _mark_internal(copy, internal=False)
+        else:
+            existing = set(bpy.data.objects)
+            with bpy.data.libraries.load(meta["filepath"], link=False) as (data_from, data_to):
+                data_to.collections = [c for c in data_from.collections if c in meta["collections"]]
+                data_to.objects = [o for o in data_from.objects if o in meta["master_objects"]]
+            for coll in data_to.collections:
+                if coll is not None:
+                    scene.collection.children.link(coll)
+                    coll.use_fake_user = False
+            for obj in data_to.objects:
+                if obj is not None:
+                    scene.collection.objects.link(obj)
+                    obj.use_fake_user = False
+            # Appending renames objects whose names are still taken to "Name.001"
+            originals = set(meta.get("all_objects", []))
+            for obj in set(bpy.data.objects) - existing:
+                original = obj.name if obj.name in originals else self._strip_suffix(obj.name)
+                restored_objects[original] = obj
+                if original != obj.name:
+                    renamed[original] = obj.name
+
+        if meta.get("camera"):
+            scene.camera = restored_objects.get(meta["camera"]) or scene.objects.get(meta["camera"])
+        return meta, renamed
+
+    def _delete_holder(self, name):
+        holder = self._holder(name)
+        if holder is None:
+            return False
+        _remove_scene_contents(holder)
+        bpy.data.scenes.remove(holder)
+        return True
+
+    def _delete_files(self, name):
+        found = False
+        for path in self._file_paths(name):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+                found = True
+        return found
+
+    def delete(self, name, missing_ok=False):
+        found = self._delete_holder(name)
+        found = self._delete_files(name) or found
+        if not found and not missing_ok:
+            raise ValueError(f"Snapshot not found: {name}")
+
+    def list(self):
+        snapshots = [
+            json.loads(scene[self.META_KEY]) for scene in bpy.data.scenes
+            if scene.name.startswith(SNAPSHOT_SCENE_PREFIX) and self.META_KEY in scene
+        ]
+        with suppress(OSError):
+            for filename in os.listdir(SNAPSHOT_DIR):
+                if filename.endswith(".json"):
+                    with suppress(OSError, ValueError), open(os.path.join(SNAPSHOT_DIR, filename), "r", encoding="utf-8") as f:
+                        snapshots.append(json.load(f))
+        for meta in snapshots:
+            meta.pop("names", None)
+        return sorted(snapshots, key=lambda meta: meta["created_at"])
+
+
+_scene_snapshots = SceneSnapshots()
+
+# Cached model imports (import_model)
+MODEL_IMPORTERS = {
+    ".fbx": lambda filepath, options: bpy.ops.import_scene.fbx(filepath=filepath, **options),
+    ".glb": lambda filepath, options: bpy.ops.import_scene.gltf(filepath=filepath, **options),
+    ".gltf": lambda filepath, options: bpy.ops.import_scene.gltf(filepath=filepath, **options),
+    ".obj": lambda filepath, options: (
+        bpy.ops.wm.obj_import(filepath=filepath, **options) if hasattr(bpy.ops.wm, "obj_import")
+        else bpy.ops.import_scene.obj(filepath=filepath, **options)
+    ),
+}
+
+
+class ModelImportCache:
+    """
+    Converted copies of imported model files, keyed on path + mtime + size + import options.
+
+    The first import of a file runs the real importer once and writes the resulting
+    collection to a .blend library in the asset cache; every later import appends or links
+    from that library instead of parsing the source again. Loaded copies carry the entry's
+    digest in a custom property, so "instance" imports can find one (even after a rename)
+    and share its mesh data. Linked libraries are copied out of the evictable cache first,
+    so .blend files that link them keep working.
+    """
+
+    META_FILE = "import.json"
+    LIBRARY_FILE = "import.blend"
+    KEY_PROPERTY = "blendermcp_import_key"
+
+    def __init__(self):
+        self.loaded = {}  # cache key -> name of the collection last loaded for it (a hint)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(filepath, options):
+        stat = os.stat(filepath)
+        return (os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, json.dumps(options, sort_keys=True))
+
+    @staticmethod
+    def digest(key):
+        return hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def linked_library_dir():
+        """Per-user directory for linked libraries, outside the asset cache and its eviction"""
+        return bpy.utils.user_resource('DATAFILES', path=os.path.join("blendermcp", "linked_models"), create=True)
+
+    def entry(self, key):
+        """Return (entry_dir, meta) of a converted file, meta being None before the first import"""
+        entry_dir = _asset_cache.entry_dir("import_model", *key)
+        meta = None
+        with suppress(OSError, ValueError):
+            with open(os.path.join(entry_dir, self.META_FILE), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if not os.path.exists(os.path.join(entry_dir, self.LIBRARY_FILE)):
+                meta = None
+        return entry_dir, meta
+
+    def store(self, key, collection):
+        """Write an imported collection to the library of its cache entry"""
+        entry_dir, _ = self.entry(key)
+        library = os.path.join(entry_dir, self.LIBRARY_FILE)
+        collection[self.KEY_PROPERTY] = self.digest(key)
+        bpy.data.libraries.write(library, {collection}, path_remap='ABSOLUTE', fake_user=True)
+        meta = {"collection": collection.name, "source": key[0], "created_at": time.time()}
+        _asset_cache.write_atomic(os.path.join(entry_dir, self.META_FILE), json.dumps(meta).encode("utf-8"))
+        self.remember(key, collection)
+        return library
+
+    def _pinned_library(self, key, library):
+        """Copy of a cached library in the linked-library directory, made once per entry"""
+        pinned = os.path.join(self.linked_library_dir(), f"{self.digest(key)}.blend")
+        if not os.path.exists(pinned):
+            temp_path = f"{pinned}.{uuid.uuid4().hex[:8]}.part"
+            shutil.copyfile(library, temp_path)
+            os.replace(temp_path, pinned)
+        return pinned
+
+    def load(self, key, link=False):
+        """
+        Append (or link) the cached collection from its library; returns it unlinked from any scene.
+
+        The caller records appended copies with remember() once they have their final name.
+        """
+        entry_dir, meta = self.entry(key)
+        library = os.path.join(entry_dir, self.LIBRARY_FILE)
+        if link:
+            library = self._pinned_library(key, library)
+            for collection in bpy.data.collections:
+                if (collection.library is not None and collection.name == meta["collection"]
+                        and bpy.path.abspath(collection.library.filepath) == library):
+                    return collection
+        with bpy.data.libraries.load(library, link=link) as (data_from, data_to):
+            data_to.collections = [meta["collection"]]
+        collection = data_to.collections[0]
+        if not link:
+            collection.use_fake_user = False
+            for obj in collection.all_objects:
+                obj.use_fake_user = False
+        return collection
+
+    def remember(self, key, collection):
+        """Note a local copy of an entry, tagging it so it can be found again after renames"""
+        collection[self.KEY_PROPERTY] = self.digest(key)
+        self.loaded[key] = collection.name
+
+    def loaded_copy(self, key):
+        """A local copy of the entry already in this file, if any still exists"""
+        digest = self.digest(key)
+
+        def usable(collection):
+            return (collection is not None and collection.library is None
+                    and collection.get(self.KEY_PROPERTY) == digest and len(collection.all_objects) > 0)
+
+        collection = bpy.data.collections.get(self.loaded.get(key, ""))
+        if not usable(collection):
+            collection = next((c for c in bpy.data.collections if usable(c)), None)
+        if collection is not None:
+            self.loaded[key] = collection.name
+        return collection
+
+    def reset(self):
+        self.loaded.clear()
+
+
+_model_import_cache = ModelImportCache()
+
+# Material library catalog (search_materials / import_library_material)
+MATERIAL_LIBRARY_DIRS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_mcp_blender", "material"),
+    *filter(None, os.environ.get("BLENDERMCP_MATERIAL_LIBRARIES", "").split(os.pathsep)),
+]
+MATERIAL_SOURCE_PROPERTY = "blendermcp_source"
+
+
+def _color_words(rgb):
+    """Basic color names ("yellow", "black", ...) describing a linear RGB color"""
+    r, g, b = (max(0.0, min(1.0, c)) ** (1 / 2.2) for c in rgb[:3])
+    hue, saturation, value = colorsys.rgb_to_hsv(r, g, b)
+    if value < 0.15:
+        return ["black"]
+    if saturation < 0.15:
+        return ["white"] if value > 0.85 else ["gray", "grey"]
+    hue *= 360
+    for limit, word in ((15, "red"), (40, "orange"), (70, "yellow"), (165, "green"),
+                        (200, "cyan"), (255, "blue"), (290, "purple"), (345, "pink"), (360, "red")):
+        if hue < limit:
+            return [word]
+
+
+class MaterialCatalog:
+    """
+    Every material of the .blend material libraries, indexed by name tokens and colors.
+
+    The index is persisted as JSON and a library file is only re-read when its mtime or
+    size changes. Reading a file links its materials just long enough to sample their
+    colors, then drops the library again.
+    """
+
+    # Relevance weight of a query token found in each field
+    FIELD_WEIGHTS = {"name": 2.0, "colors": 1.0}
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(ASSET_CACHE_DIR, "material_catalog.json")
+        self.files = None  # filepath -> {"mtime_ns", "size", "materials": [...]}
+        self.libraries = []
+
+    def _load(self):
+        self.files = {}
+        with suppress(OSError, ValueError):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.files = data["files"]
+            self.libraries = data.get("libraries", [])
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {"files": self.files, "libraries": self.libraries}
+        _asset_cache.write_atomic(self.path, json.dumps(data).encode('utf-8'))
+
+    def add_library(self, path):
+        """Index a user .blend file or directory of .blend files as well (persisted)"""
+        if self.files is None:
+            self._load()
+        path = os.path.abspath(path)
+        if path not in self.libraries:
+            self.libraries.append(path)
+
+    def library_files(self):
+        files = []
+        for path in MATERIAL_LIBRARY_DIRS + self.libraries:
+            if os.path.isfile(path) and path.lower().endswith(".blend"):
+                files.append(os.path.abspath(path))
+            elif os.path.isdir(path):
+                files.extend(os.path.abspath(os.path.join(path, name)) for name in sorted(os.listdir(path))
+                             if name.lower().endswith(".blend"))
+        return files
+
+    @staticmethod
+    def _material_colors(material):
+        """Colors a material shows: the Principled base color, or the colors feeding into it"""
+        colors = []
+        principled = None
+        if material.use_nodes and material.node_tree:
+            principled = next((n for n in material.node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
+        if principled is not None:
+            base_color = principled.inputs['Base Color']
+            if not base_color.is_linked:
+                colors.append(list(base_color.default_value)[:3])
+            else:
+                # One hop back, e.g. the two colors of a checker or brick texture
+                source = base_color.links[0].from_node
+                colors.extend(list(socket.default_value)[:3] for socket in source.inputs
+                              if socket.type == 'RGBA' and not socket.is_linked)
+        if not colors:
+            colors.append(list(material.diffuse_color)[:3])
+        return [[round(c, 4) for c in color] for color in colors]
+
+    def _index_file(self, filepath):
+        existing_libraries = set(bpy.data.libraries)
+        with bpy.data.libraries.load(filepath, link=True) as (data_from, data_to):
+            data_to.materials = list(data_from.materials)
+        materials = []
+        for material in data_to.materials:
+            if material is None:
+                continue
+            colors = self._material_colors(material)
+            materials.append({
+                "name": material.name,
+                "colors": colors,
+                "color_words": sorted({word for color in colors for word in _color_words(color)}),
+            })
+        for library in set(bpy.data.libraries) - existing_libraries:
+            bpy.data.libraries.remove(library)
+        return materials
+
+    def refresh(self):
+        """Re-index new or changed library files and drop deleted ones; returns the number re-indexed"""
+        if self.files is None:
+            self._load()
+        current = self.library_files()
+        changed = 0
+        for filepath in current:
+            stat = os.stat(filepath)
+            entry = self.files.get(filepath)
+            if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+                continue
+            try:
+                materials = self._index_file(filepath)
+            except Exception as e:
+                print(f"Failed to index material library {filepath}: {str(e)}")
+                materials = []
+            self.files[filepath] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "materials": materials}
+            changed += 1
+        for filepath in set(self.files) - set(current):
+            del self.files[filepath]
+            changed += 1
+        if changed:
+            self._save()
+        return changed
+
+    def search(self, query=None, color=None, limit=10):
+        """Materials ranked by name / color-word matches, then by distance to an RGB color"""
+        self.refresh()
+        query_tokens = PolyHavenCatalog._tokenize(query) if query else []
+        if isinstance(color, str):
+            query_tokens += PolyHavenCatalog._tokenize(color)
+            color = None
+        results = []
+        for filepath, entry in self.files.items():
+            for material in entry["materials"]:
+                name_tokens = set(PolyHavenCatalog._tokenize(material["name"]))
+                relevance = sum(
+                    self.FIELD_WEIGHTS["name"] if token in name_tokens
+                    else self.FIELD_WEIGHTS["colors"] if token in material["color_words"] else 0.0
+                    for token in query_tokens
+                )
+                if query_tokens and not relevance:
+                    continue
+                distance = min(
+                    (sum((a - b) ** 2 for a, b in zip(c, color)) ** 0.5 for c in material["colors"]),
+                    default=0.0,
+                ) if color is not None else 0.0
+                results.append((relevance, -distance, {**material, "filepath": filepath}))
+        results.sort(key=lambda item: item[:2], reverse=True)
+        return [material for _, _, material in results[:limit]], len(results)
+
+    def find(self, name, filepath=None):
+        """Library file that holds a material of that name (the given one if set)"""
+        self.refresh()
+        for candidate, entry in self.files.items():
+            if filepath and os.path.abspath(filepath) != candidate:
+                continue
+            if any(material["name"] == name for material in entry["materials"]):
+                return candidate
+        return None
+
+
+_material_catalog = MaterialCatalog()
+
+
+class ProceduralHelpers:
+    """
+    Batched generation helpers, available as `procedural` inside execute_code.
+
+    Instead of one bpy.ops call and one material per object, build one shared mesh and one
+    shared material, then place all instances in a single pass: as linked-duplicate objects,
+    or as a single geometry-nodes instancer object. Per-instance colors are read by the
+    material through an Attribute node ("color"), so they never need extra materials.
+    """
+
+    PARAMS_PROPERTY = "blendermcp_params"
+    BMESH_PRIMITIVES = {
+        "uv_sphere": lambda bm, size, detail: bmesh.ops.create_uvsphere(
+            bm, u_segments=detail * 2, v_segments=detail, radius=size),
+        "ico_sphere": lambda bm, size, detail: bmesh.ops.create_icosphere(
+            bm, subdivisions=max(1, detail // 8), radius=size),
+        "cube": lambda bm, size, detail: bmesh.ops.create_cube(bm, size=size * 2),
+        "cylinder": lambda bm, size, detail: bmesh.ops.create_cone(
+            bm, cap_ends=True, segments=detail * 2, radius1=size, radius2=size, depth=size * 2),
+        "cone": lambda bm, size, detail: bmesh.ops.create_cone(
+            bm, cap_ends=True, segments=detail * 2, radius1=size, radius2=0, depth=size * 2),
+    }
+
+    @classmethod
+    def _find_by_params(cls, datablocks, name, params):
+        """
+        A datablock built earlier with these parameters, whatever its name ended up as.
+
+        A block created while the name was taken is called "name.001", so name lookups
+        alone would miss it and every call would build another one.
+        """
+        datablock = datablocks.get(name)
+        if datablock is not None and datablock.get(cls.PARAMS_PROPERTY) == params:
+            return datablock
+        return next((d for d in datablocks if d.library is None and d.get(cls.PARAMS_PROPERTY) == params), None)
+
+    @classmethod
+    def shared_mesh(cls, kind="uv_sphere", size=1.0, detail=16, name=None, smooth=True):
+        """
+        A primitive mesh built with bmesh, reused when one with the same parameters exists.
+
+        kind is one of uv_sphere, ico_sphere, cube, cylinder, cone; size is the radius
+        (half the edge length for a cube) and detail the ring / segment count.
+        """
+        if kind not in cls.BMESH_PRIMITIVES:
+            raise ValueError(f"Unknown primitive: {kind}. Use one of {', '.join(cls.BMESH_PRIMITIVES)}")
+        name = name or kind
+        params = json.dumps([name, kind, size, detail, smooth])
+        mesh = cls._find_by_params(bpy.data.meshes, name, params)
+        if mesh is not None:
+            return mesh
+
+        mesh = bpy.data.meshes.new(name)
+        bm = bmesh.new()
+        try:
+            cls.BMESH_PRIMITIVES[kind](bm, size, detail)
+            bm.to_mesh(mesh)
+        finally:
+            bm.free()
+        if smooth:
+            mesh.polygons.foreach_set("use_smooth", [True] * len(mesh.polygons))
+        mesh[cls.PARAMS_PROPERTY] = params
+        return mesh
+
+    @classmethod
+    def instance_material(cls, name="InstanceMaterial", metallic=0.0, roughness=0.5, emission_strength=0.0):
+        """
+        One material for all instances, colored per instance by their "color" attribute.
+
+        The Attribute node uses the instancer type, which reads the color of a geometry-nodes
+        instance and falls back to the object's own color for linked duplicates.
+        emission_strength > 0 also makes the instances glow in their color.
+        """
+        params = json.dumps([name, metallic, roughness, emission_strength])
+        material = cls._find_by_params(bpy.data.materials, name, params)
+        if material is not None:
+            return material
+
+        material = bpy.data.materials.new(name)
+        material.use_nodes = True
+        nodes = material.node_tree.nodes
+        links = material.node_tree.links
+        nodes.clear()
+
+        output = nodes.new('ShaderNodeOutputMaterial')
+        output.location = (300, 0)
+        principled = nodes.new('ShaderNodeBsdfPrincipled')
+        principled.location = (0, 0)
+        principled.inputs['Metallic'].default_value = metallic
+        principled.inputs['Roughness'].default_value = roughness
+        attribute = nodes.new('ShaderNodeAttribute')
+        attribute.location = (-300, 0)
+        attribute.attribute_type = 'INSTANCER'
+        attribute.attribute_name = "color"
+
+        links.new(attribute.outputs['Color'], principled.inputs['Base Color'])
+        if emission_strength > 0:
+            # "Emission" was renamed "Emission Color" in Blender 4.0
+            emission = principled.inputs.get('Emission Color') or principled.inputs['Emission']
+            links.new(attribute.outputs['Color'], emission)
+            principled.inputs['Emission Strength'].default_value = emission_strength
+        links.new(principled.outputs[0], output.inputs['Surface'])
+        material[cls.PARAMS_PROPERTY] = params
+        return material
+
+    @staticmethod
+    def _per_instance(values, count, width, default):
+        """Broadcast None / one value / one value per instance to a (count, width) float array"""
+        if values is None:
+            values = default
+        array = np.asarray(values, dtype=np.float32)
+        if array.ndim == 0:
+            array = np.full((count, width), array, dtype=np.float32)
+        elif array.ndim == 1:
+            array = np.tile(array, (count, 1))
+        if array.shape[1] == 3 and width == 4:
+            array = np.hstack([array, np.ones((count, 1), dtype=np.float32)])
+        if array.shape != (count, width):
+            raise ValueError(f"Expected {count} values of size {width}, got shape {array.shape}")
+        return array
+
+    @classmethod
+    def instance(cls, mesh, coordinates, material=None, name="Instance", colors=None, scale=1.0,
+                 scales=None, rotations=None, method="objects", collection=None):
+        """
+        Place one mesh at every coordinate in a single pass.
+
+        - coordinates: (N, 3) positions (list or numpy array)
+        - colors / rotations: one value for all or one per instance (RGB(A), XYZ Euler radians)
+        - scale: one uniform or XYZ scale for all instances
+        - scales: (N, 3) XYZ scale per instance, overriding scale
+        - method "objects": N linked-duplicate objects sharing the mesh; returns the objects
+        - method "geometry_nodes": one point-cloud object instancing the mesh on its points,
+          far cheaper for thousands of instances; returns that object
+        """
+        coordinates = np.asarray(coordinates, dtype=np.float32).reshape(-1, 3)
+        count = len(coordinates)
+        colors = cls._per_instance(colors, count, 4, (0.8, 0.8, 0.8, 1.0))
+        if scales is not None:
+            # Always per instance, so a flat list of 3 can't be mistaken for one XYZ scale
+            scales = np.asarray(scales, dtype=np.float32)
+            if scales.shape != (count, 3):
+                raise ValueError(f"scales must have shape ({count}, 3), got {scales.shape}; use scale= for one value")
+        else:
+            scales = cls._per_instance(scale, count, 3, 1.0)
+        rotations = cls._per_instance(rotations, count, 3, 0.0)
+        collection = collection or bpy.context.collection
+        if material is not None:
+            if mesh.materials:
+                mesh.materials[0] = material
+            else:
+                mesh.materials.append(material)
+
+        if method == "objects":
+            objects = []
+            for i in range(count):
+                obj = bpy.data.objects.new(f"{name}_{i:03d}", mesh)
+                obj.location = coordinates[i]
+                obj.scale = scales[i]
+                obj.rotation_euler = rotations[i]
+                obj.color = colors[i]
+                collection.objects.link(obj)
+                objects.append(obj)
+            return objects
+        if method == "geometry_nodes":
+            return cls._geometry_nodes_instancer(mesh, coordinates, colors, scales, rotations, name, collection)
+        raise ValueError("method must be 'objects' or 'geometry_nodes'")
+
+    @classmethod
+    def _geometry_nodes_instancer(cls, mesh, coordinates, colors, scales, rotations, name, collection):
+        # Drop the points of a previous run whose object was deleted, instead of piling up .001s
+        previous = bpy.data.meshes.get(f"{name}_points")
+        if previous is not None and previous.users == 0:
+            bpy.data.meshes.remove(previous)
+        points = bpy.data.meshes.new(f"{name}_points")
+        points.vertices.add(len(coordinates))
+        points.vertices.foreach_set("co", coordinates.ravel())
+        for attribute_name, attribute_type, values in (
+            ("color", 'FLOAT_COLOR', colors), ("scale", 'FLOAT_VECTOR', scales), ("rotation", 'FLOAT_VECTOR', rotations),
+        ):
+            attribute = points.attributes.new(attribute_name, attribute_type, 'POINT')
+            attribute.data.foreach_set("color" if attribute_type == 'FLOAT_COLOR' else "vector", values.ravel())
+
+        # The prototype only has to exist for the Object Info node, it is not linked to a scene
+        prototype = bpy.data.objects.get(f"{name}_prototype") or bpy.data.objects.new(f"{name}_prototype", mesh)
+        prototype.data = mesh
+
+        obj = bpy.data.objects.new(name, points)
+        collection.objects.link(obj)
+        modifier = obj.modifiers.new("Instances", 'NODES')
+        modifier.node_group = cls._instancer_node_group(prototype)
+        return obj
+
+    @classmethod
+    def _instancer_node_group(cls, prototype):
+        """The Instance on Points group of a prototype, reused across calls"""
+        name = f"{prototype.name}_instancer"
+        params = json.dumps(["instancer", prototype.name])
+        group = cls._find_by_params(bpy.data.node_groups, name, params)
+        if group is not None:
+            group.nodes["Prototype"].inputs['Object'].default_value = prototype
+            return group
+
+        group = bpy.data.node_groups.new(name, 'GeometryNodeTree')
+        group[cls.PARAMS_PROPERTY] = params
+        if hasattr(group, "interface"):  # Blender 4.0+
+            group.interface.new_socket("Geometry", in_out='INPUT', socket_type='NodeSocketGeometry')
+            group.interface.new_socket("Geometry", in_out='OUTPUT', socket_type='NodeSocketGeometry')
+        else:
+            group.inputs.new('NodeSocketGeometry', "Geometry")
+            group.outputs.new('NodeSocketGeometry', "Geometry")
+        nodes, links = group.nodes, group.links
+
+        group_input = nodes.new('NodeGroupInput')
+        group_output = nodes.new('NodeGroupOutput')
+        object_info = nodes.new('GeometryNodeObjectInfo')
+        object_info.name = "Prototype"
+        object_info.inputs['Object'].default_value = prototype
+        instance_on_points = nodes.new('GeometryNodeInstanceOnPoints')
+        links.new(group_input.outputs[0], instance_on_points.inputs['Points'])
+        links.new(object_info.outputs['Geometry'], instance_on_points.inputs['Instance'])
+        for attribute_name, socket_name in (("scale", 'Scale'), ("rotation", 'Rotation')):
+            named_attribute = nodes.new('GeometryNodeInputNamedAttribute')
+            named_attribute.data_type = 'FLOAT_VECTOR'
+            named_attribute.inputs['Name'].default_value = attribute_name
+            # Before Blender 4.0 there is one "Attribute" output per data type, only one enabled
+            attribute_output = next(output for output in named_attribute.outputs if output.enabled)
+            links.new(attribute_output, instance_on_points.inputs[socket_name])
+        links.new(instance_on_points.outputs['Instances'], group_output.inputs[0])
+
+        for i, node in enumerate((group_input, object_info, instance_on_points, group_output)):
+            node.location = (i * 250 - 400, 0)
+        return group
+
+
+procedural = ProceduralHelpers()
+
+
+class AnimationHelpers:
+    """
+    Keyframe / F-curve modifier / driver helpers, available as `animation` inside execute_code.
+
+    Effects that scripts used to drive from bpy.app.timers callbacks (spinning objects,
+    flickering emission) are written as animation data instead, so Blender evaluates them
+    natively on every frame without running Python, and they show up in renders.
+    """
+
+    AXES = {"X": 0, "Y": 1, "Z": 2}
+
+    @staticmethod
+    def _fcurve(id_data, data_path, index):
+        """The F-curve of an animated property, for both legacy and layered (4.4+) actions"""
+        action = id_data.animation_data.action
+        if getattr(action, "layers", None):
+            for layer in action.layers:
+                for strip in layer.strips:
+                    channelbag = strip.channelbag(id_data.animation_data.action_slot)
+                    fcurve = channelbag.fcurves.find(data_path, index=index) if channelbag else None
+                    if fcurve is not None:
+                        return fcurve
+        return action.fcurves.find(data_path, index=index)
+
+    @staticmethod
+    def _fps(scene):
+        return scene.render.fps / scene.render.fps_base
+
+    @classmethod
+    def spin(cls, objects, axis="Z", degrees_per_second=90.0, step_seconds=None, start_frame=None):
+        """
+        Rotate objects forever around a local axis.
+
+        Two linear keyframes one second apart with linear extrapolation give a constant
+        speed; step_seconds adds a Stepped modifier so the rotation jumps once per step
+        (like a timer firing every step_seconds) instead of turning continuously.
+        """
+        scene = bpy.context.scene
+        fps = cls._fps(scene)
+        start_frame = scene.frame_start if start_frame is None else start_frame
+        index = cls.AXES[axis.upper()]
+        for obj in objects:
+            start_value = obj.rotation_euler[index]
+            obj.keyframe_insert("rotation_euler", index=index, frame=start_frame)
+            obj.rotation_euler[index] = start_value + math.radians(degrees_per_second)
+            obj.keyframe_insert("rotation_euler", index=index, frame=start_frame + fps)
+            obj.rotation_euler[index] = start_value
+
+            fcurve = cls._fcurve(obj, "rotation_euler", index)
+            for keyframe in fcurve.keyframe_points:
+                keyframe.interpolation = 'LINEAR'
+            fcurve.extrapolation = 'LINEAR'
+            if step_seconds:
+                stepped = fcurve.modifiers.new('STEPPED')
+                stepped.frame_step = step_seconds * fps
+                stepped.frame_offset = start_frame
+        return len(objects)
+
+    @staticmethod
+    def _emission_strength_socket(material):
+        if not material.use_nodes:
+            return None
+        for node in material.node_tree.nodes:
+            if node.type == 'EMISSION':
+                return node.inputs['Strength']
+            if node.type == 'BSDF_PRINCIPLED' and 'Emission Strength' in node.inputs:
+                return node.inputs['Emission Strength']
+        return None
+
+    @classmethod
+    def flicker(cls, targets, amount=0.5, speed=1.0, seed=None):
+        """
+        Random flicker through Noise F-curve modifiers, each target with its own phase.
+
+        - Materials: the emission strength varies by +-amount times its current value.
+        - Objects: the object color (read by instance materials through their "color"
+          attribute) gets brighter and darker by +-amount, so instances sharing one
+          material still flicker independently.
+        speed is roughly the number of flickers per second. Returns how many targets flicker.
+        """
+        rng = random.Random(seed)
+        scene = bpy.context.scene
+        scale = max(1.0, cls._fps(scene) / max(speed, 1e-3))
+        flickering = 0
+        for target in targets:
+            if isinstance(target, bpy.types.Material):
+                socket = cls._emission_strength_socket(target)
+                if socket is None:
+                    continue
+                socket.keyframe_insert("default_value", frame=scene.frame_start)
+                channels = [(target.node_tree, socket.path_from_id("default_value"), 0, socket.default_value)]
+            else:
+                target.keyframe_insert("color", frame=scene.frame_start)
+                channels = [(target, "color", i, target.color[i]) for i in range(3)]
+
+            # Noise adds (sample - 0.5) * strength; the same phase and offset on every
+            # channel gives the same sample, so a color only changes brightness
+            phase, offset = rng.uniform(0, 100), rng.uniform(0, 1000)
+            for id_data, data_path, index, value in channels:
+                fcurve = cls._fcurve(id_data, data_path, index)
+                # Flickering the same target again replaces its noise instead of stacking it
+                for modifier in [m for m in fcurve.modifiers if m.type == 'NOISE']:
+                    fcurve.modifiers.remove(modifier)
+                noise = fcurve.modifiers.new('NOISE')
+                noise.strength = 2 * amount * value
+                noise.scale = scale
+                noise.phase = phase
+                noise.offset = offset
+            flickering += 1
+        return flickering
+
+    @staticmethod
+    def drive(id_data, data_path, expression, index=-1, variables=None):
+        """
+        Drive a property with an expression such as "frame * 0.05" or "sin(frame / 8)".
+
+        variables maps a name to (id, data_path) of a single-property variable. Simple
+        expressions run in Blender's native expression evaluator, without Python.
+        """
+        fcurves = id_data.driver_add(data_path, index)
+        fcurves = fcurves if isinstance(fcurves, list) else [fcurves]
+        for fcurve in fcurves:
+            driver = fcurve.driver
+            driver.type = 'SCRIPTED'
+            driver.expression = expression
+            for name, (target_id, target_path) in (variables or {}).items():
+                variable = driver.variables.new()
+                variable.name = name
+                variable.type = 'SINGLE_PROP'
+                variable.targets[0].id = target_id
+                variable.targets[0].data_path = target_path
+        return fcurves
+
+    @classmethod
+    def play(cls, loop_seconds=None):
+        """Start viewport playback (looping over loop_seconds if given) so the animation runs live"""
+        scene = bpy.context.scene
+        if loop_seconds:
+            scene.frame_end = scene.frame_start + int(round(loop_seconds * cls._fps(scene))) - 1
+        screen = bpy.context.screen
+        if bpy.app.background or screen is None or screen.is_animation_playing:
+            return False
+        bpy.ops.screen.animation_play()
+        return True
+
+
+animation = AnimationHelpers()
+
+
+def _execute_code_globals():
+    """Fresh globals for execute_code: bpy plus the helpers scripts can use"""
+    return {"bpy": bpy, "yield_now": yield_now, "procedural": procedural, "animation": animation}
+
+
+@persistent
+def _on_depsgraph_update_post(scene, depsgraph):
+    try:
+        _scene_change_log.on_depsgraph_update(depsgraph)
+    except Exception as e:
+        print(f"Error recording scene changes: {str(e)}")
+
+
+@persistent
+def _on_load_post(*args):
+    _scene_change_log.reset()
+    _texture_index.reset()
+    _model_import_cache.reset()
+    _session_scenes.reset()
+
+
 class BlenderMCPServer:
     def __init__(self, host='localhost', port=9876):
         self.host = host
@@ -35,6 +2772,8 @@ class BlenderMCPServer:
         self.running = False
         self.socket = None
         self.server_thread = None
+        self.started_at = None
+        self.commands_executed = 0
     
     def start(self):
         if self.running:
@@ -48,7 +2787,8 @@ class BlenderMCPServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            self.socket.listen(LISTEN_BACKLOG)
+            self.started_at = time.time()
             
             # Start server thread
             self.server_thread = threading.Thread(target=self._server_loop)
@@ -62,6 +2802,7 @@ class BlenderMCPServer:
             
     def stop(self):
         self.running = False
+        _background_jobs.shutdown()
         
         # Close socket
         if self.socket:
@@ -120,6 +2861,15 @@ class BlenderMCPServer:
         print("Client handler started")
         client.settimeout(None)  # No timeout
         buffer = b''
+        send_lock = threading.Lock()
+
+        def send_response(response):
+            # Responses may come from the main thread, worker threads or this thread
+            try:
+                with send_lock:
+                    client.sendall(json.dumps(response).encode('utf-8'))
+            except:
+                print("Failed to send response - client disconnected")
         
         try:
             while self.running:
@@ -136,30 +2886,37 @@ class BlenderMCPServer:
                         command = json.loads(buffer.decode('utf-8'))
                         buffer = b''
                         
+                        # Job queries only touch thread-safe state and may block
+                        # while waiting, so they are answered right here
+                        if command.get("type") in self.CLIENT_THREAD_COMMANDS:
+                            send_response(self.execute_client_thread_command(command))
+                            continue
+
                         # Execute command in Blender's main thread
-                        def execute_wrapper():
+                        def execute_wrapper(command=command):
+                            self.commands_executed += 1
                             try:
                                 response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
+                                if isinstance(response, DeferredResult):
+                                    # Network I/O runs on a worker thread; respond when the job settles
+                                    job = _background_jobs.submit(command.get("type"), response)
+                                    if response.background:
+                                        send_response({"status": "success", "result": job.status()})
+                                    else:
+                                        job.add_done_callback(lambda job: send_response(job.response()))
+                                    return None
+                                send_response(response)
                             except Exception as e:
                                 print(f"Error executing command: {str(e)}")
                                 traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
+                                send_response({
+                                    "status": "error",
+                                    "message": str(e)
+                                })
                             return None
                         
                         # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
+                        _call_on_main_thread(execute_wrapper)
                     except json.JSONDecodeError:
                         # Incomplete data, wait for more
                         pass
@@ -175,6 +2932,23 @@ class BlenderMCPServer:
                 pass
             print("Client handler stopped")
 
+    # Commands answered on the client thread instead of Blender's main thread
+    CLIENT_THREAD_COMMANDS = ("get_job_status", "wait_for_job", "cancel_job", "ping")
+
+    def execute_client_thread_command(self, command):
+        """Execute a command that only touches thread-safe job state"""
+        handlers = {
+            "get_job_status": self.get_job_status,
+            "wait_for_job": self.wait_for_job,
+            "cancel_job": self.cancel_job,
+            "ping": self.ping,
+        }
+        try:
+            return {"status": "success", "result": handlers[command.get("type")](**command.get("params", {}))}
+        except Exception as e:
+            print(f"Error in handler: {str(e)}")
+            return {"status": "error", "message": str(e)}
+
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
         try:            
@@ -185,11 +2959,44 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
+    # Commands that manage sessions rather than run inside one
+    SESSION_FREE_COMMANDS = ("list_sessions", "close_session")
+
+    # Wire parameter names that differ from the handler's argument names
+    PARAM_ALIASES = {
+        "query_region": {"min": "min_corner", "max": "max_corner"},
+    }
+
     def _execute_command_internal(self, command):
         """Internal command execution with proper context"""
         cmd_type = command.get("type")
-        params = command.get("params", {})
+        params = dict(command.get("params", {}))
+        # Deferred (network-bound) commands can return a job ID right away instead of waiting
+        background = bool(params.pop("background", False))
+
+        session = command.get("session")
+        if session is None or cmd_type in self.SESSION_FREE_COMMANDS:
+            return self._dispatch_command(cmd_type, params, background)
+
+        # Scope the command, and the main-thread half of a deferred command, to the session's scene
+        scene_name = _session_scenes.get(str(session), command.get("session_template")).name
+        with _session_scenes.scope(scene_name):
+            response = self._dispatch_command(cmd_type, params, background)
+            # Nothing else evaluates a scene that no window shows, so flush its edits here
+            _flush_depsgraph_updates()
+        if isinstance(response, DeferredResult) and response.finish is not None:
+            finish = response.finish
 
+            def finish_in_session(fetched):
+                with _session_scenes.scope(scene_name):
+                    result = finish(fetched)
+                    _flush_depsgraph_updates()
+                    return result
+
+            response.finish = finish_in_session
+        return response
+
+    def _dispatch_command(self, cmd_type, params, background):
         # Add a handler for checking PolyHaven status
         if cmd_type == "get_polyhaven_status":
             return {"status": "success", "result": self.get_polyhaven_status()}
@@ -198,11 +3005,30 @@ class BlenderMCPServer:
         handlers = {
             "get_scene_info": self.get_scene_info,
             "get_object_info": self.get_object_info,
+            "get_scene_changes": self.get_scene_changes,
+            "query_overlaps": self.query_overlaps,
+            "query_nearest": self.query_nearest,
+            "query_gaps": self.query_gaps,
+            "query_region": self.query_region,
             "get_viewport_screenshot": self.get_viewport_screenshot,
+            "render_preview": self.render_preview,
             "execute_code": self.execute_code,
+            "clear_namespaces": self.clear_namespaces,
+            "get_script_status": self.get_script_status,
+            "cancel_script": self.cancel_script,
+            "get_http_stats": self.get_http_stats,
             "get_polyhaven_status": self.get_polyhaven_status,
             "get_hyper3d_status": self.get_hyper3d_status,
             "get_sketchfab_status": self.get_sketchfab_status,
+            "list_sessions": self.list_sessions,
+            "close_session": self.close_session,
+            "snapshot_scene": self.snapshot_scene,
+            "restore_scene": self.restore_scene,
+            "list_snapshots": self.list_snapshots,
+            "delete_snapshot": self.delete_snapshot,
+            "import_model": self.import_model,
+            "search_materials": self.search_materials,
+            "import_library_material": self.import_library_material,
         }
         
         # Add Polyhaven handlers only if enabled
@@ -212,6 +3038,7 @@ class BlenderMCPServer:
                 "search_polyhaven_assets": self.search_polyhaven_assets,
                 "download_polyhaven_asset": self.download_polyhaven_asset,
                 "set_texture": self.set_texture,
+                "set_texture_bulk": self.set_texture_bulk,
             }
             handlers.update(polyhaven_handlers)
         
@@ -219,6 +3046,7 @@ class BlenderMCPServer:
         if bpy.context.scene.blendermcp_use_hyper3d:
             polyhaven_handlers = {
                 "create_rodin_job": self.create_rodin_job,
+                "track_rodin_job": self.track_rodin_job,
                 "poll_rodin_job_status": self.poll_rodin_job_status,
                 "import_generated_asset": self.import_generated_asset,
             }
@@ -236,8 +3064,13 @@ class BlenderMCPServer:
         if handler:
             try:
                 print(f"Executing handler for {cmd_type}")
+                aliases = self.PARAM_ALIASES.get(cmd_type, {})
+                params = {aliases.get(key, key): value for key, value in params.items()}
                 result = handler(**params)
                 print(f"Handler execution complete")
+                if isinstance(result, DeferredResult):
+                    result.background = background
+                    return result
                 return {"status": "success", "result": result}
             except Exception as e:
                 print(f"Error in handler: {str(e)}")
@@ -248,64 +3081,384 @@ class BlenderMCPServer:
 
     
     
-    def get_scene_info(self):
-        """Get information about the current Blender scene"""
+    def get_scene_info(self, cursor=0, limit=SCENE_QUERY_DEFAULT_LIMIT, object_types=None,
+                       name_filter=None, collection=None, fields=None, compact=False,
+                       precision=2, time_budget_ms=SCENE_QUERY_TIME_BUDGET_MS):
+        """
+        Get information about the current Blender scene, one page of objects at a time.
+
+        Parameters:
+        - cursor: Index in the scene object list to resume from (use the returned next_cursor)
+        - limit: Maximum number of objects to return in this page
+        - object_types: Optional list of object types to keep (e.g. ["MESH", "LIGHT"])
+        - name_filter: Optional case-insensitive glob pattern matched against object names
+        - collection: Optional collection name; only objects inside it (recursively) are kept
+        - fields: Per-object fields to include, see SCENE_QUERY_FIELDS (default: ["location"])
+        - compact: Return {"fields": [...], "rows": [[...], ...]} instead of a list of dicts
+        - precision: Number of decimals used when rounding float values
+        - time_budget_ms: Stop early and return a partial page once this much time is spent
+
+        next_cursor is None once the end of the object list has been reached.
+        """
         try:
+            start_time = time.perf_counter()
+            scene = bpy.context.scene
             print("Getting scene info...")
-            # Simplify the scene info to reduce data size
+
+            fields = list(fields) if fields else ["location"]
+            unknown_fields = [f for f in fields if f not in SCENE_QUERY_FIELDS]
+            if unknown_fields:
+                return {"error": f"Unknown fields: {unknown_fields}. Must be any of: {list(SCENE_QUERY_FIELDS)}"}
+
+            cursor = max(0, int(cursor or 0))
+            limit = max(1, min(int(limit), SCENE_QUERY_MAX_LIMIT))
+            type_filter = {t.upper() for t in object_types} if object_types else None
+            pattern = name_filter.lower() if name_filter else None
+
+            collection_names = None
+            if collection:
+                coll = bpy.data.collections.get(collection)
+                if coll is None:
+                    return {"error": f"Collection not found: {collection}"}
+                collection_names = {obj.name for obj in coll.all_objects}
+
             scene_info = {
-                "name": bpy.context.scene.name,
-                "object_count": len(bpy.context.scene.objects),
-                "objects": [],
+                "name": scene.name,
+                "scene_version": _scene_change_log.version,
+                "object_count": len(scene.objects),
                 "materials_count": len(bpy.data.materials),
             }
-            
-            # Collect minimal object information (limit to first 10 objects)
-            for i, obj in enumerate(bpy.context.scene.objects):
-                if i >= 10:  # Reduced from 20 to 10
+
+            page = []
+            next_cursor = None
+            deadline = start_time + time_budget_ms / 1000.0
+            for index, obj in enumerate(itertools.islice(scene.objects, cursor, None), start=cursor):
+                if len(page) >= limit or (index > cursor and index % 64 == 0 and time.perf_counter() > deadline):
+                    next_cursor = index
                     break
-                    
-                obj_info = {
-                    "name": obj.name,
-                    "type": obj.type,
-                    # Only include basic location data
-                    "location": [round(float(obj.location.x), 2), 
-                                round(float(obj.location.y), 2), 
-                                round(float(obj.location.z), 2)],
-                }
-                scene_info["objects"].append(obj_info)
-            
-            print(f"Scene info collected: {len(scene_info['objects'])} objects")
+                if type_filter and obj.type not in type_filter:
+                    continue
+                if collection_names is not None and obj.name not in collection_names:
+                    continue
+                if pattern and not fnmatch.fnmatchcase(obj.name.lower(), pattern):
+                    continue
+                page.append(obj)
+
+            bboxes = {}
+            if "bbox" in fields:
+                mesh_objs = [obj for obj in page if obj.type == 'MESH']
+                if mesh_objs:
+                    bboxes = dict(zip((obj.name for obj in mesh_objs), self._get_aabbs(mesh_objs).reshape(-1, 6)))
+            rows = [
+                [obj.name, obj.type] + [self._get_object_field(obj, f, precision, bboxes) for f in fields]
+                for obj in page
+            ]
+
+            if compact:
+                scene_info["fields"] = ["name", "type"] + fields
+                scene_info["rows"] = rows
+            else:
+                columns = ["name", "type"] + fields
+                scene_info["objects"] = [dict(zip(columns, row)) for row in rows]
+            scene_info["returned_count"] = len(rows)
+            scene_info["next_cursor"] = next_cursor
+            scene_info["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000.0, 2)
+
+            print(f"Scene info collected: {len(rows)} objects")
             return scene_info
         except Exception as e:
             print(f"Error in get_scene_info: {str(e)}")
             traceback.print_exc()
             return {"error": str(e)}
+
+    def get_http_stats(self):
+        """Get request, retry, error and latency counters per integration"""
+        return _http.get_stats()
+
+    def snapshot_scene(self, name, mode="memory"):
+        """
+        Save the current scene's objects, collections and materials under a name.
+
+        mode "memory" keeps deep copies inside Blender (fastest restore); mode "file" writes
+        them to a .blend library in the asset cache (no memory cost while unused).
+        """
+        start = time.perf_counter()
+        meta = _scene_snapshots.snapshot(bpy.context.scene, name, mode)
+        meta.pop("names", None)
+        return {**meta, "time_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    def restore_scene(self, name):
+        """Replace the current scene's contents with a snapshot (the snapshot stays reusable)"""
+        start = time.perf_counter()
+        meta, renamed = _scene_snapshots.restore(bpy.context.scene, name)
+        bpy.context.view_layer.update()
+        result = {
+            "restored": name,
+            "mode": meta["mode"],
+            "objects": len(bpy.context.scene.objects),
+            "time_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+        if renamed:
+            result["renamed"] = renamed
+            result["warning"] = (
+                f"{len(renamed)} datablocks are still used by another scene, so their restored "
+                f"copies got new names (see renamed)"
+            )
+        return result
+
+    def list_snapshots(self):
+        """List the saved scene snapshots"""
+        return {"snapshots": _scene_snapshots.list()}
+
+    def delete_snapshot(self, name):
+        """Delete a snapshot and free its copies or file"""
+        _scene_snapshots.delete(name)
+        return {"deleted": name}
+
+    def list_sessions(self):
+        """List the session scenes with their object counts and idle times"""
+        return _session_scenes.status()
+
+    def close_session(self, session):
+        """Delete a session's scene and everything only it used"""
+        _session_scenes.close(str(session))
+        return {"closed": str(session)}
+
+    def ping(self):
+        """Liveness check answered without waiting for Blender's main thread"""
+        return {
+            "pong": True,
+            "pid": os.getpid(),
+            "headless": bool(bpy.app.background),
+            "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else 0.0,
+            "commands_executed": self.commands_executed,
+            "scene_version": _scene_change_log.version,
+            "active_jobs": sum(1 for job in list(_background_jobs.jobs.values()) if not job.done),
+        }
+
+    def get_job_status(self, job_id=None):
+        """Get the state of a background job (all known jobs if job_id is omitted)"""
+        if job_id is None:
+            return {"jobs": [job.status() for job in list(_background_jobs.jobs.values())]}
+        return _background_jobs.get(job_id).status()
+
+    def wait_for_job(self, job_id, timeout=30.0):
+        """Block (on the client thread) until a background job settles or the timeout expires"""
+        job = _background_jobs.get(job_id)
+        job.done_event.wait(timeout=float(timeout))
+        status = job.status()
+        status["timed_out"] = not job.done
+        return status
+
+    def cancel_job(self, job_id):
+        """Cancel a background job; a fetch already in flight finishes but its result is dropped"""
+        job = _background_jobs.get(job_id)
+        job.cancel()
+        return job.status()
+
+    def get_scene_changes(self, since_version=0, limit=1000):
+        """
+        Get the objects, materials and images added, removed or modified since a version.
+
+        Pass the scene_version returned by get_scene_info (or the version returned by a
+        previous call). When full_resync is True, changes older than the log were dropped
+        and the client should take a fresh get_scene_info snapshot instead.
+        """
+        since_version = int(since_version or 0)
+        _flush_depsgraph_updates()
+        current_version = _scene_change_log.version
+        changes, full_resync = _scene_change_log.changes_since(since_version)
+        has_more = len(changes) > limit
+        if has_more:
+            # Cut the page on a version boundary so resuming from "version" loses nothing
+            boundary = changes[limit]["version"]
+            page = [c for c in changes[:limit] if c["version"] < boundary]
+            if not page:
+                page = [c for c in changes if c["version"] == boundary]
+            changes = page
+        return {
+            "version": changes[-1]["version"] if has_more else current_version,
+            "changes": changes,
+            "has_more": has_more,
+            "full_resync": full_resync,
+        }
+
+    def query_overlaps(self, names=None, tolerance=0.0):
+        """
+        Find mesh objects whose world-space bounding boxes overlap.
+
+        Parameters:
+        - names: Optional list of object names; only pairs involving them are returned
+        - tolerance: Extra distance counted as overlapping (negative ignores touching contacts)
+        """
+        _spatial_index.sync()
+        pairs = _spatial_index.overlaps(names=names, tolerance=float(tolerance))
+        return {"pairs": [list(pair) for pair in pairs], "count": len(pairs), "index_size": len(_spatial_index)}
+
+    def query_nearest(self, name=None, point=None, k=5):
+        """Find the k mesh objects whose bounding boxes are closest to an object or to a point"""
+        if name is None and point is None:
+            raise ValueError("Either name or point must be given")
+        _spatial_index.sync()
+        nearest = _spatial_index.nearest(name=name, point=point, k=int(k))
+        return {
+            "nearest": [{"name": n, "distance": round(d, 6)} for n, d in nearest],
+            "index_size": len(_spatial_index),
+        }
+
+    def query_gaps(self, a, b, tolerance=1e-4):
+        """
+        Measure the space between the bounding boxes of two mesh objects.
+
+        gap is per axis: positive is empty space, negative is how deep the boxes interpenetrate.
+        touching is True when the boxes meet within tolerance without a visible gap.
+        """
+        _spatial_index.sync()
+        gap, distance = _spatial_index.gaps(a, b)
+        return {
+            "gap": [round(float(g), 6) for g in gap],
+            "distance": round(distance, 6),
+            "overlapping": bool(np.all(gap < -tolerance)),
+            "touching": bool(distance <= tolerance and np.any(gap >= -tolerance)),
+        }
+
+    def query_region(self, min_corner, max_corner, inside=False):
+        """Find mesh objects whose bounding boxes intersect (or, with inside=True, lie within) a box region"""
+        _spatial_index.sync()
+        names = _spatial_index.region(min_corner, max_corner, inside=inside)
+        return {"objects": names, "count": len(names), "index_size": len(_spatial_index)}
+
+    def _get_object_field(self, obj, field, precision=2, bboxes=None):
+        """Extract a single scene query field from an object"""
+        def rounded(values):
+            return [round(float(v), precision) for v in values]
+
+        if field == "location":
+            return rounded(obj.location)
+        if field == "rotation":
+            return rounded(obj.rotation_euler)
+        if field == "scale":
+            return rounded(obj.scale)
+        if field == "dimensions":
+            return rounded(obj.dimensions)
+        if field == "bbox":
+            if obj.type != 'MESH':
+                return None
+            if bboxes and obj.name in bboxes:
+                return rounded(bboxes[obj.name])
+            min_corner, max_corner = self._get_aabb(obj)
+            return rounded(min_corner) + rounded(max_corner)
+        if field == "materials":
+            return [slot.material.name for slot in obj.material_slots if slot.material]
+        if field == "mesh":
+            if obj.type != 'MESH' or not obj.data:
+                return None
+            return [len(obj.data.vertices), len(obj.data.edges), len(obj.data.polygons)]
+        if field == "collections":
+            return [coll.name for coll in obj.users_collection]
+        if field == "parent":
+            return obj.parent.name if obj.parent else None
+        if field == "visible":
+            return obj.visible_get()
+        raise ValueError(f"Unknown field: {field}")
     
+    @staticmethod
+    def _get_aabbs(objs):
+        """ Returns the world-space AABBs of many mesh objects as an (N, 2, 3) array of [min, max] corners. """
+        count = len(objs)
+        local_corners = np.empty((count, 8, 3), dtype=np.float64)
+        matrices = np.empty((count, 4, 4), dtype=np.float64)
+        for i, obj in enumerate(objs):
+            if obj.type != 'MESH':
+                raise TypeError(f"Object must be a mesh: {obj.name}")
+            local_corners[i] = obj.bound_box
+            matrices[i] = obj.matrix_world
+
+        # Transform all corners of all objects to world space in one go
+        world_corners = np.einsum('nij,nkj->nki', matrices[:, :3, :3], local_corners) + matrices[:, None, :3, 3]
+        return np.stack([world_corners.min(axis=1), world_corners.max(axis=1)], axis=1)
+
     @staticmethod
     def _get_aabb(obj):
         """ Returns the world-space axis-aligned bounding box (AABB) of an object. """
         if obj.type != 'MESH':
             raise TypeError("Object must be a mesh")
 
-        # Get the bounding box corners in local space
-        local_bbox_corners = [mathutils.Vector(corner) for corner in obj.bound_box]
+        return BlenderMCPServer._get_aabbs([obj])[0].tolist()
+
+    @staticmethod
+    def _encode_array(array, encoding, blob=None):
+        """Encode a flat numpy array as base64, or append it to a binary side-channel blob"""
+        info = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        if encoding == "file":
+            info["offset"] = blob.tell()
+            info["length"] = array.nbytes
+            blob.write(array.tobytes())
+        else:
+            info["data"] = base64.b64encode(array.tobytes()).decode('ascii')
+        return info
 
-        # Convert to world coordinates
-        world_bbox_corners = [obj.matrix_world @ corner for corner in local_bbox_corners]
+    def _get_geometry(self, obj, fields, encoding="base64", filepath=None, evaluated=False):
+        """Pull mesh arrays with foreach_get and return them as base64 or as a binary file"""
+        eval_obj = None
+        if evaluated:
+            eval_obj = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+            mesh = eval_obj.to_mesh()
+        else:
+            mesh = obj.data
 
-        # Compute axis-aligned min/max coordinates
-        min_corner = mathutils.Vector(map(min, zip(*world_bbox_corners)))
-        max_corner = mathutils.Vector(map(max, zip(*world_bbox_corners)))
+        try:
+            arrays = {}
+            if "positions" in fields:
+                positions = np.empty(len(mesh.vertices) * 3, dtype='<f4')
+                mesh.vertices.foreach_get("co", positions)
+                arrays["positions"] = positions.reshape(-1, 3)
+            if "normals" in fields:
+                normals = np.empty(len(mesh.vertices) * 3, dtype='<f4')
+                mesh.vertices.foreach_get("normal", normals)
+                arrays["normals"] = normals.reshape(-1, 3)
+            if "indices" in fields or "uvs" in fields:
+                mesh.calc_loop_triangles()
+            if "indices" in fields:
+                indices = np.empty(len(mesh.loop_triangles) * 3, dtype='<u4')
+                mesh.loop_triangles.foreach_get("vertices", indices)
+                arrays["indices"] = indices.reshape(-1, 3)
+            if "uvs" in fields and mesh.uv_layers.active:
+                # UVs live on face corners (loops), so triangles index them through their loops
+                uvs = np.empty(len(mesh.loops) * 2, dtype='<f4')
+                mesh.uv_layers.active.data.foreach_get("uv", uvs)
+                arrays["uvs"] = uvs.reshape(-1, 2)
+                uv_indices = np.empty(len(mesh.loop_triangles) * 3, dtype='<u4')
+                mesh.loop_triangles.foreach_get("loops", uv_indices)
+                arrays["uv_indices"] = uv_indices.reshape(-1, 3)
+        finally:
+            if eval_obj is not None:
+                eval_obj.to_mesh_clear()
 
-        return [
-            [*min_corner], [*max_corner]
-        ]
+        geometry = {"encoding": encoding, "byte_order": "little", "evaluated": evaluated}
+        if encoding == "file":
+            if not filepath:
+                fd, filepath = tempfile.mkstemp(prefix=f"{obj.name}_", suffix=".bin")
+                os.close(fd)
+            with open(filepath, "wb") as blob:
+                geometry["buffers"] = {key: self._encode_array(array, encoding, blob) for key, array in arrays.items()}
+            geometry["filepath"] = filepath
+        else:
+            geometry["buffers"] = {key: self._encode_array(array, encoding) for key, array in arrays.items()}
+        return geometry
 
+    def get_object_info(self, name, include_geometry=False, geometry_fields=None,
+                        encoding="base64", filepath=None, evaluated=False):
+        """
+        Get detailed information about a specific object
 
-    
-    def get_object_info(self, name):
-        """Get detailed information about a specific object"""
+        Parameters:
+        - include_geometry: Also return mesh arrays (see GEOMETRY_FIELDS) for mesh objects
+        - geometry_fields: Subset of GEOMETRY_FIELDS to export (default: all)
+        - encoding: "base64" to inline the arrays, or "file" to write them to one binary file
+        - filepath: Binary file path for encoding="file" (a temporary file is used if omitted)
+        - evaluated: Export the mesh with modifiers applied
+        """
         obj = bpy.data.objects.get(name)
         if not obj:
             raise ValueError(f"Object not found: {name}")
@@ -338,10 +3491,19 @@ class BlenderMCPServer:
                 "edges": len(mesh.edges),
                 "polygons": len(mesh.polygons),
             }
+
+            if include_geometry:
+                geometry_fields = list(geometry_fields) if geometry_fields else list(GEOMETRY_FIELDS)
+                unknown_fields = [f for f in geometry_fields if f not in GEOMETRY_FIELDS]
+                if unknown_fields:
+                    raise ValueError(f"Unknown geometry fields: {unknown_fields}. Must be any of: {list(GEOMETRY_FIELDS)}")
+                if encoding not in ("base64", "file"):
+                    raise ValueError(f"Invalid encoding: {encoding}. Must be one of: base64, file")
+                obj_info["geometry"] = self._get_geometry(obj, geometry_fields, encoding, filepath, evaluated)
         
         return obj_info
     
-    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
+    def get_viewport_screenshot(self, max_size=800, filepath=None, format="png", inline=None):
         """
         Capture a screenshot of the current 3D viewport and save it to the specified path.
         
@@ -349,9 +3511,18 @@ class BlenderMCPServer:
         - max_size: Maximum size in pixels for the largest dimension of the image
         - filepath: Path where to save the screenshot file
         - format: Image format (png, jpg, etc.)
+        - inline: Return the image as base64 PNG in the response instead of writing a file
+          (the default when no filepath is given)
         
         Returns success/error status
         """
+        if bpy.app.background or bpy.context.screen is None:
+            return {"error": "No 3D viewport found (running headless); use render_preview instead"}
+        if inline is None:
+            inline = not filepath
+        if inline:
+            return self._get_inline_viewport_screenshot(max_size)
+
         try:
             if not filepath:
                 return {"error": "No filepath provided"}
@@ -398,489 +3569,709 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
     
-    def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
+    @staticmethod
+    def _read_viewport_pixels(area, region):
+        """Read a 3D viewport into an (H, W, 4) uint8 array, bottom row first (main thread only)"""
+        space = area.spaces.active
+        width, height = region.width, region.height
+        try:
+            # Draw the view into an offscreen buffer and read it back without touching the disk
+            offscreen = gpu.types.GPUOffScreen(width, height)
+            try:
+                offscreen.draw_view3d(
+                    bpy.context.scene,
+                    bpy.context.view_layer,
+                    space,
+                    region,
+                    space.region_3d.view_matrix,
+                    space.region_3d.window_matrix,
+                    do_color_management=True,
+                )
+                with offscreen.bind():
+                    framebuffer = gpu.state.active_framebuffer_get()
+                    buffer = framebuffer.read_color(0, 0, width, height, 4, 0, 'UBYTE')
+            finally:
+                offscreen.free()
+            buffer.dimensions = width * height * 4
+            try:
+                pixels = np.frombuffer(buffer, dtype=np.uint8)
+            except TypeError:
+                pixels = np.array(buffer.to_list(), dtype=np.uint8)
+            return pixels.reshape(height, width, 4)
+        except Exception as e:
+            print(f"Offscreen viewport capture failed, falling back to screenshot_area: {str(e)}")
+
+        fd, path = tempfile.mkstemp(prefix="blendermcp_screenshot_", suffix=".png")
+        os.close(fd)
+        try:
+            with bpy.context.temp_override(area=area):
+                bpy.ops.screen.screenshot_area(filepath=path)
+            img = bpy.data.images.load(path)
+            try:
+                width, height = img.size
+                pixels = np.empty(width * height * 4, dtype=np.float32)
+                img.pixels.foreach_get(pixels)
+            finally:
+                bpy.data.images.remove(img)
+        finally:
+            with suppress(OSError):
+                os.unlink(path)
+        return (np.clip(pixels, 0.0, 1.0) * 255.0 + 0.5).astype(np.uint8).reshape(height, width, 4)
+
+    def _get_inline_viewport_screenshot(self, max_size):
+        """
+        Capture the viewport and return it as a base64 PNG.
+
+        Only the pixel read happens on the main thread; downscaling and encoding run in a
+        background job. Results are cached per scene, content version, view and size, so repeated
+        captures of an unchanged viewport return immediately.
+        """
+        try:
+            area = next((a for a in bpy.context.screen.areas if a.type == 'VIEW_3D'), None)
+            if not area:
+                return {"error": "No 3D viewport found"}
+            region = next((r for r in area.regions if r.type == 'WINDOW'), None)
+            space = area.spaces.active
+
+            key = (
+                _scene_change_log.content_version,
+                bpy.context.scene.name,
+                tuple(round(v, 6) for row in space.region_3d.perspective_matrix for v in row),
+                region.width,
+                region.height,
+                int(max_size),
+                space.shading.type,
+                bpy.context.scene.frame_current,
+            )
+            cached = _screenshot_cache.get(key)
+            if cached is not None:
+                return {**cached, "cached": True}
+
+            pixels = self._read_viewport_pixels(area, region)
+        except Exception as e:
+            return {"error": str(e)}
+
+        def fetch(job):
+            # OpenGL rows are bottom-up, PNG rows top-down
+            rgb = _downscale_pixels(pixels, max_size)[::-1, :, :3]
+            png = _encode_png(np.ascontiguousarray(rgb))
+            result = {
+                "success": True,
+                "width": rgb.shape[1],
+                "height": rgb.shape[0],
+                "mime_type": "image/png",
+                "encoding": "base64",
+                "image": base64.b64encode(png).decode("ascii"),
+                "bytes": len(png),
+                "content_version": key[0],
+                "cached": False,
+            }
+            _screenshot_cache.put(key, result)
+            return result
+
+        return DeferredResult(fetch)
+
+    @staticmethod
+    def _resolve_render_engine(engine):
+        """Map WORKBENCH / EEVEE to the engine identifier this Blender version provides"""
+        available = {item.identifier for item in bpy.types.RenderSettings.bl_rna.properties['engine'].enum_items}
+        for identifier in PREVIEW_ENGINES.get(engine.upper(), (engine.upper(),)):
+            if identifier in available:
+                return identifier
+        raise ValueError(f"Unsupported preview engine: {engine} (use WORKBENCH or EEVEE)")
+
+    def _make_framing_camera(self, view, aspect):
+        """Create a temporary camera looking at every visible mesh from a PREVIEW_VIEWS direction"""
+        if view not in PREVIEW_VIEWS:
+            raise ValueError(f"Unknown view: {view} (use one of {', '.join(PREVIEW_VIEWS)} or 'camera')")
+
+        camera_data = bpy.data.cameras.new("BlenderMCP_PreviewCamera")
+        camera = bpy.data.objects.new("BlenderMCP_PreviewCamera", camera_data)
+        _mark_internal(camera, camera_data)
+        bpy.context.scene.collection.objects.link(camera)
+
+        meshes = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH' and obj.visible_get()]
+        if meshes:
+            aabbs = self._get_aabbs(meshes)
+            low, high = aabbs[:, 0].min(axis=0), aabbs[:, 1].max(axis=0)
+        else:
+            low, high = np.full(3, -1.0), np.full(3, 1.0)
+        center = mathutils.Vector(((low + high) / 2).tolist())
+        radius = max(float(np.linalg.norm(high - low)) / 2, 1e-3)
+
+        # Distance at which the bounding sphere fits the narrower field of view
+        fov = camera_data.angle if aspect >= 1 else 2 * np.arctan(np.tan(camera_data.angle / 2) * aspect)
+        distance = float(radius / np.sin(fov / 2) * 1.05)
+        direction = mathutils.Vector(PREVIEW_VIEWS[view]).normalized()
+        camera.location = center + direction * distance
+        camera.rotation_euler = (-direction).to_track_quat('-Z', 'Y').to_euler()
+        camera_data.clip_start = max(distance - radius * 2, distance * 1e-3)
+        camera_data.clip_end = distance + radius * 2
+        return camera
+
+    def render_preview(self, resolution=512, engine="WORKBENCH", camera=None, view=None,
+                       samples=8, filepath=None):
+        """
+        Render a fast preview image; works under `blender --background`.
+
+        Parameters:
+        - resolution: Size of the square image, or [width, height]
+        - engine: WORKBENCH (fastest) or EEVEE
+        - camera: Name of a camera object to render from
+        - view: "camera" for the scene camera, or iso/front/back/left/right/top to frame all
+          visible meshes automatically (default: the scene camera if there is one, else iso)
+        - samples: Anti-aliasing / render samples
+        - filepath: Also save the PNG there
+
+        Returns the PNG as base64. Results are cached per scene content version (any change to
+        objects, lights, cameras, worlds, render settings, ...) and parameters.
+        """
+        try:
+            scene = bpy.context.scene
+            if isinstance(resolution, (list, tuple)):
+                width, height = (int(v) for v in resolution)
+            else:
+                width = height = int(resolution)
+            if not (0 < width <= PREVIEW_MAX_RESOLUTION and 0 < height <= PREVIEW_MAX_RESOLUTION):
+                return {"error": f"Resolution must be between 1 and {PREVIEW_MAX_RESOLUTION}"}
+            engine_id = self._resolve_render_engine(engine)
+
+            camera_obj = None
+            if camera:
+                camera_obj = bpy.data.objects.get(camera)
+                if camera_obj is None or camera_obj.type != 'CAMERA':
+                    return {"error": f"Camera not found: {camera}"}
+            elif view == "camera" or (view is None and scene.camera is not None):
+                camera_obj = scene.camera
+                if camera_obj is None:
+                    return {"error": "The scene has no camera; pass a view to frame the scene automatically"}
+            view = None if camera_obj is not None else (view or "iso")
+
+            # Count pending edits (e.g. from execute_code) before keying the cache and before
+            # the suppressed block below, which would otherwise swallow them
+            _flush_depsgraph_updates()
+            key = (
+                _scene_change_log.content_version, scene.name, scene.frame_current, width, height,
+                engine_id, int(samples), camera_obj.name if camera_obj else None, view,
+            )
+            cached = _preview_cache.get(key)
+            if cached is None:
+                # The temporary camera and render settings are restored afterwards; flush their
+                # depsgraph updates while suppressed so the render doesn't invalidate itself
+                with _scene_change_log.suppressed_updates():
+                    try:
+                        png, render_time = self._render_preview_png(
+                            scene, width, height, engine_id, samples, camera_obj, view
+                        )
+                    finally:
+                        bpy.context.view_layer.update()
+                cached = {"png": png, "render_time_ms": round(render_time * 1000, 1)}
+                _preview_cache.put(key, cached)
+                from_cache = False
+            else:
+                from_cache = True
+
+            if filepath:
+                with open(filepath, "wb") as f:
+                    f.write(cached["png"])
+
+            return {
+                "success": True,
+                "width": width,
+                "height": height,
+                "engine": engine_id,
+                "camera": camera_obj.name if camera_obj else f"auto ({view})",
+                "mime_type": "image/png",
+                "encoding": "base64",
+                "image": base64.b64encode(cached["png"]).decode("ascii"),
+                "render_time_ms": cached["render_time_ms"],
+                "content_version": key[0],
+                "cached": from_cache,
+                **({"filepath": filepath} if filepath else {}),
+            }
+        except Exception as e:
+            traceback.print_exc()
+            return {"error": f"Failed to render preview: {str(e)}"}
+
+    def _render_preview_png(self, scene, width, height, engine_id, samples, camera_obj, view):
+        """Render with temporary settings, restoring the scene afterwards; returns (png bytes, seconds)"""
+        render = scene.render
+        saved = {
+            "engine": render.engine,
+            "resolution_x": render.resolution_x,
+            "resolution_y": render.resolution_y,
+            "resolution_percentage": render.resolution_percentage,
+            "filepath": render.filepath,
+            "file_format": render.image_settings.file_format,
+            "camera": scene.camera,
+            "render_aa": scene.display.render_aa,
+        }
+        eevee = getattr(scene, "eevee", None)
+        if eevee is not None:
+            saved["taa_render_samples"] = eevee.taa_render_samples
+
+        temp_camera = None
+        fd, path = tempfile.mkstemp(prefix="blendermcp_preview_", suffix=".png")
+        os.close(fd)
+        try:
+            if camera_obj is None:
+                temp_camera = self._make_framing_camera(view, width / height)
+                camera_obj = temp_camera
+
+            render.engine = engine_id
+            render.resolution_x = width
+            render.resolution_y = height
+            render.resolution_percentage = 100
+            render.filepath = path
+            render.image_settings.file_format = 'PNG'
+            scene.camera = camera_obj
+            if engine_id == "BLENDER_WORKBENCH":
+                # Workbench only offers fixed anti-aliasing levels; take the largest within samples
+                samples = int(samples)
+                if samples <= 1:
+                    scene.display.render_aa = 'OFF'
+                elif samples < 5:
+                    scene.display.render_aa = 'FXAA'
+                else:
+                    scene.display.render_aa = str(max(level for level in (5, 8, 11, 16, 32) if level <= samples))
+            elif eevee is not None:
+                eevee.taa_render_samples = max(1, int(samples))
+
+            start = time.perf_counter()
+            bpy.ops.render.render(write_still=True)
+            elapsed = time.perf_counter() - start
+            with open(path, "rb") as f:
+                return f.read(), elapsed
+        finally:
+            render.engine = saved["engine"]
+            render.resolution_x = saved["resolution_x"]
+            render.resolution_y = saved["resolution_y"]
+            render.resolution_percentage = saved["resolution_percentage"]
+            render.filepath = saved["filepath"]
+            render.image_settings.file_format = saved["file_format"]
+            scene.camera = saved["camera"]
+            scene.display.render_aa = saved["render_aa"]
+            if eevee is not None:
+                eevee.taa_render_samples = saved["taa_render_samples"]
+            if temp_camera is not None:
+                camera_data = temp_camera.data
+                bpy.data.objects.remove(temp_camera)
+                bpy.data.cameras.remove(camera_data)
+            with suppress(OSError):
+                os.unlink(path)
+
+    def execute_code(self, code, namespace=None, reset_namespace=False, max_output=EXECUTE_CODE_MAX_OUTPUT,
+                     cooperative=False, entry="main", tick_budget_ms=COOPERATIVE_TICK_BUDGET_MS):
+        """
+        Execute arbitrary Blender Python code
+
+        Parameters:
+        - code: Python source; compiled code objects are cached by content hash
+        - namespace: Optional name of a persistent namespace, so later calls can reuse
+          functions and variables defined here (a fresh namespace is used if omitted)
+        - reset_namespace: Clear the named namespace before executing
+        - max_output: Maximum number of captured stdout characters returned
+        - cooperative: Run the script in time slices across timer ticks instead of in one go.
+          The script either yields at top level (`yield` or `yield yield_now(progress, message)`)
+          or defines a generator function named by `entry`. Returns a job_id to pass to
+          get_script_status / cancel_script.
+        - tick_budget_ms: Time a cooperative script may run per timer tick
+        """
         # This is powerful but potentially dangerous - use with caution
         try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
+            start_time = time.perf_counter()
+            code_obj, cache_hit = _code_cache.get(code, cooperative=cooperative)
+            compiled_time = time.perf_counter()
+
+            # Create a local namespace for execution, or reuse a named one
+            if namespace:
+                if reset_namespace:
+                    _code_namespaces.pop(namespace, None)
+                exec_globals = _code_namespaces.get(namespace)
+                if exec_globals is None:
+                    exec_globals = _execute_code_globals()
+                    _code_namespaces[namespace] = exec_globals
+                    while len(_code_namespaces) > MAX_NAMESPACES:
+                        _code_namespaces.popitem(last=False)
+                _code_namespaces.move_to_end(namespace)
+            else:
+                exec_globals = _execute_code_globals()
+
+            if cooperative:
+                return self._start_cooperative_script(code_obj, exec_globals, namespace, entry,
+                                                      tick_budget_ms, max_output, cache_hit)
 
             # Capture stdout during execution, and return it as result
-            capture_buffer = io.StringIO()
+            capture_buffer = CappedOutput(max_output)
             with redirect_stdout(capture_buffer):
-                exec(code, namespace)
+                exec(code_obj, exec_globals)
+            end_time = time.perf_counter()
             
             captured_output = capture_buffer.getvalue()
-            return {"executed": True, "result": captured_output}
+            result = {
+                "executed": True,
+                "result": captured_output,
+                "compile_cached": cache_hit,
+                "compile_ms": round((compiled_time - start_time) * 1000.0, 3),
+                "execution_ms": round((end_time - compiled_time) * 1000.0, 3),
+            }
+            if capture_buffer.truncated:
+                result["output_truncated"] = True
+                result["output_size"] = capture_buffer.total
+            if namespace:
+                result["namespace"] = namespace
+            return result
         except Exception as e:
             raise Exception(f"Code execution error: {str(e)}")
+
+    def _start_cooperative_script(self, code_obj, exec_globals, namespace, entry,
+                                  tick_budget_ms, max_output, cache_hit):
+        """Run the module body, then schedule its generator to be resumed on timer ticks"""
+        capture_buffer = CappedOutput(max_output)
+        with redirect_stdout(capture_buffer):
+            exec(code_obj, exec_globals)
+
+        script_function = exec_globals.pop("__mcp_script__", None) or exec_globals.get(entry)
+        if not inspect.isgeneratorfunction(script_function):
+            # Nothing to resume: the script already ran to completion
+            return {
+                "executed": True,
+                "result": capture_buffer.getvalue(),
+                "compile_cached": cache_hit,
+                "cooperative": False,
+            }
+
+        script = CooperativeScript(script_function(), namespace, tick_budget_ms, max_output)
+        script.output.write(capture_buffer.getvalue())
+        _cooperative_scripts[script.id] = script
+        if not _is_timer_registered(_drive_cooperative_scripts):
+            _register_timer(_drive_cooperative_scripts)
+        return {
+            "executed": False,
+            "cooperative": True,
+            "job_id": script.id,
+            "state": script.state,
+            "compile_cached": cache_hit,
+        }
+
+    def get_script_status(self, job_id=None):
+        """Get progress and captured output of a cooperative script (all scripts if job_id is omitted)"""
+        if job_id is None:
+            return {"scripts": [script.status() for script in _cooperative_scripts.values()]}
+        script = _cooperative_scripts.get(job_id)
+        if not script:
+            raise ValueError(f"Script job not found: {job_id}")
+        return script.status()
+
+    def cancel_script(self, job_id):
+        """Cancel a running cooperative script; its finally blocks still run"""
+        script = _cooperative_scripts.get(job_id)
+        if not script:
+            raise ValueError(f"Script job not found: {job_id}")
+        script.cancel()
+        return script.status()
+
+    def clear_namespaces(self, names=None):
+        """Drop persistent execute_code namespaces (all of them if names is omitted)"""
+        cleared = list(_code_namespaces) if names is None else [n for n in names if n in _code_namespaces]
+        for name in cleared:
+            del _code_namespaces[name]
+        return {"cleared": cleared, "remaining": list(_code_namespaces)}
     
     
 
     def get_polyhaven_categories(self, asset_type):
-        """Get categories for a specific asset type from Polyhaven"""
-        try:
-            if asset_type not in ["hdris", "textures", "models", "all"]:
+        """Get categories for a specific asset type from the local Polyhaven catalog"""
+        if asset_type not in ["hdris", "textures", "models", "all"]:
+            return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
+
+        def query():
+            return {"categories": _polyhaven_catalog.categories(asset_type)}
+
+        return self._query_polyhaven_catalog(query)
+    
+    def search_polyhaven_assets(self, asset_type=None, categories=None, query=None, tags=None, limit=20):
+        """
+        Search for assets in the local Polyhaven catalog with optional filtering
+
+        Parameters:
+        - asset_type: hdris, textures, models or all
+        - categories / tags: Comma-separated string or list; every entry has to match
+        - query: Free text matched against asset names, tags and categories
+        - limit: Number of top-ranked assets to return
+        """
+        if asset_type and asset_type != "all":
+            if asset_type not in ["hdris", "textures", "models"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}")
-            if response.status_code == 200:
-                return {"categories": response.json()}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
-        except Exception as e:
-            return {"error": str(e)}
+
+        def search():
+            # Return only the top assets to keep response size manageable
+            top, total_count = _polyhaven_catalog.search(asset_type, categories, query, tags, int(limit))
+            assets = dict(top)
+            return {"assets": assets, "total_count": total_count, "returned_count": len(assets)}
+
+        return self._query_polyhaven_catalog(search)
+
+    def _query_polyhaven_catalog(self, query):
+        """Answer from memory when the catalog is warm, otherwise refresh it off the main thread first"""
+        if _polyhaven_catalog.is_fresh:
+            return query()
+
+        def fetch(job):
+            try:
+                _polyhaven_catalog.refresh()
+                return query()
+            except Exception as e:
+                return {"error": str(e)}
+
+        return DeferredResult(fetch)
     
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
+    def _get_polyhaven_files(self, asset_id):
+        """Get the files information of an asset, cached on disk for POLYHAVEN_FILES_TTL seconds"""
+        entry_dir = _asset_cache.entry_dir("polyhaven_files", asset_id)
+        files_path = os.path.join(entry_dir, "files.json")
+        with suppress(OSError, ValueError):
+            if time.time() - os.path.getmtime(files_path) < POLYHAVEN_FILES_TTL:
+                with open(files_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+        files_response = _http.get("polyhaven", f"https://api.polyhaven.com/files/{asset_id}")
+        if files_response.status_code != 200:
+            raise RuntimeError(f"Failed to get asset files: {files_response.status_code}")
+        files_data = files_response.json()
+        _asset_cache.write_atomic(files_path, json.dumps(files_data).encode('utf-8'))
+        return files_data
+
+    def _fetch_polyhaven_asset(self, asset_id, asset_type, resolution, file_format):
+        """
+        Download the files of a Polyhaven asset into the asset cache.
+
+        Only touches the network and the disk, never bpy. Returns a dict with the local
+        paths needed by _import_polyhaven_asset, or {"error": ...}.
+        """
         try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
-            
-            if asset_type and asset_type != "all":
-                if asset_type not in ["hdris", "textures", "models"]:
-                    return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-                
-            if categories:
-                params["categories"] = categories
-                
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
-                
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
-        except Exception as e:
+            files_data = self._get_polyhaven_files(asset_id)
+        except RuntimeError as e:
             return {"error": str(e)}
-    
+
+        entry_dir = _asset_cache.entry_dir("polyhaven", asset_id, asset_type, resolution, file_format)
+
+        # Handle different asset types
+        if asset_type == "hdris":
+            if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
+                file_info = files_data["hdri"][resolution][file_format]
+                try:
+                    path = _asset_cache.fetch(entry_dir, f"{asset_id}_{resolution}.{file_format}", file_info)
+                except Exception as e:
+                    return {"error": f"Failed to download HDRI: {str(e)}"}
+                return {"path": path}
+            return {"error": f"Requested resolution or format not available for this HDRI"}
+
+        elif asset_type == "textures":
+            map_files = {}
+            for map_type in files_data:
+                if map_type not in ["blend", "gltf"]:  # Skip non-texture files
+                    if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
+                        map_files[f"{asset_id}_{map_type}.{file_format}"] = (map_type, files_data[map_type][resolution][file_format])
+
+            # Fetch every map concurrently instead of paying one round trip per file
+            fetched = _asset_cache.fetch_many(entry_dir, [(relpath, info) for relpath, (_, info) in map_files.items()])
+            map_paths = {}
+            for relpath, (map_type, _) in map_files.items():
+                if isinstance(fetched[relpath], Exception):
+                    print(f"Failed to download texture map {map_type}: {str(fetched[relpath])}")
+                else:
+                    map_paths[map_type] = fetched[relpath]
+            if not map_paths:
+                return {"error": f"No texture maps found for the requested resolution and format"}
+            return {"map_paths": map_paths}
+
+        elif asset_type == "models":
+            if file_format in files_data and resolution in files_data[file_format]:
+                file_info = files_data[file_format][resolution][file_format]
+                # Download the main model file and its included files together,
+                # keeping the included files next to it
+                main_file_name = file_info["url"].split("/")[-1]
+                files = [(main_file_name, file_info)]
+                if "include" in file_info and file_info["include"]:
+                    files.extend(file_info["include"].items())
+                fetched = _asset_cache.fetch_many(entry_dir, files)
+
+                if isinstance(fetched[main_file_name], Exception):
+                    return {"error": f"Failed to download model: {str(fetched[main_file_name])}"}
+                for include_path, result in fetched.items():
+                    if isinstance(result, Exception):
+                        print(f"Failed to download included file: {include_path} ({str(result)})")
+                return {"path": fetched[main_file_name]}
+            return {"error": f"Requested format or resolution not available for this model"}
+
+        return {"error": f"Unsupported asset type: {asset_type}"}
+
+    def _import_polyhaven_asset(self, asset_id, asset_type, file_format, fetched):
+        """Load previously fetched Polyhaven files into Blender (main thread only)"""
+        if asset_type == "hdris":
+            return self._import_polyhaven_hdri(asset_id, fetched["path"], file_format)
+        elif asset_type == "textures":
+            return self._import_polyhaven_textures(asset_id, fetched["map_paths"], file_format)
+        elif asset_type == "models":
+            return self._import_polyhaven_model(asset_id, fetched["path"], file_format)
+        return {"error": f"Unsupported asset type: {asset_type}"}
+
     def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+        if not file_format:
+            # Default formats: .hdr for HDRIs, .jpg for textures, glTF for models
+            file_format = {"hdris": "hdr", "textures": "jpg", "models": "gltf"}.get(asset_type)
+
+        def fetch(job):
+            try:
+                return self._fetch_polyhaven_asset(asset_id, asset_type, resolution, file_format)
+            except Exception as e:
+                return {"error": f"Failed to download asset: {str(e)}"}
+
+        def finish(fetched):
+            if "error" in fetched:
+                return fetched
+            try:
+                return self._import_polyhaven_asset(asset_id, asset_type, file_format, fetched)
+            except Exception as e:
+                return {"error": f"Failed to download asset: {str(e)}"}
+
+        return DeferredResult(fetch, finish)
+
+    def _import_polyhaven_hdri(self, asset_id, hdri_path, file_format):
         try:
-            # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}")
-            if files_response.status_code != 200:
-                return {"error": f"Failed to get asset files: {files_response.status_code}"}
-            
-            files_data = files_response.json()
-            
-            # Handle different asset types
-            if asset_type == "hdris":
-                # For HDRIs, download the .hdr or .exr file
-                if not file_format:
-                    file_format = "hdr"  # Default format for HDRIs
-                
-                if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
-                    file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
-                    
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
-                        
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
-                    
-                    try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-                        
-                        world = bpy.data.worlds[0]
-                        world.use_nodes = True
-                        node_tree = world.node_tree
-                        
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-                        
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-                        
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-                        
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-                        
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
-                                try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
-                                except:
-                                    continue
-                        
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-                        
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-                        
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
-                        
-                        # Set as active world
-                        bpy.context.scene.world = world
-                        
-                        # Clean up temporary file
-                        try:
-                            tempfile._cleanup()  # This will clean up all temporary files
-                        except:
-                            pass
-                        
-                        return {
-                            "success": True, 
-                            "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
-                else:
-                    return {"error": f"Requested resolution or format not available for this HDRI"}
-                    
-            elif asset_type == "textures":
-                if not file_format:
-                    file_format = "jpg"  # Default format for textures
-                
-                downloaded_maps = {}
-                
+            # Create a new world if none exists
+            if not bpy.data.worlds:
+                bpy.data.worlds.new("World")
+
+            world = bpy.data.worlds[0]
+            world.use_nodes = True
+            node_tree = world.node_tree
+
+            # Clear existing nodes
+            for node in node_tree.nodes:
+                node_tree.nodes.remove(node)
+
+            # Create nodes
+            tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+            tex_coord.location = (-800, 0)
+
+            mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+            mapping.location = (-600, 0)
+
+            # Load the image from the asset cache, reusing it if it is already loaded
+            env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+            env_tex.location = (-400, 0)
+            env_tex.image = bpy.data.images.load(hdri_path, check_existing=True)
+
+            # Use a color space that exists in all Blender versions
+            if file_format.lower() == 'exr':
+                # Try to use Linear color space for EXR files
                 try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:  # Skip non-texture files
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-                                
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-                                        
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-                                        
-                                        # Pack the image into .blend file
-                                        image.pack()
-                                        
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-                                        
-                                        downloaded_maps[map_type] = image
-                                        
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
-                
-                    if not downloaded_maps:
-                        return {"error": f"No texture maps found for the requested resolution and format"}
-                    
-                    # Create a new material with the downloaded textures
-                    mat = bpy.data.materials.new(name=asset_id)
-                    mat.use_nodes = True
-                    nodes = mat.node_tree.nodes
-                    links = mat.node_tree.links
-                    
-                    # Clear default nodes
-                    for node in nodes:
-                        nodes.remove(node)
-                    
-                    # Create output node
-                    output = nodes.new(type='ShaderNodeOutputMaterial')
-                    output.location = (300, 0)
-                    
-                    # Create principled BSDF node
-                    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-                    principled.location = (0, 0)
-                    links.new(principled.outputs[0], output.inputs[0])
-                    
-                    # Add texture nodes based on available maps
-                    tex_coord = nodes.new(type='ShaderNodeTexCoord')
-                    tex_coord.location = (-800, 0)
-                    
-                    mapping = nodes.new(type='ShaderNodeMapping')
-                    mapping.location = (-600, 0)
-                    mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-                    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-                    
-                    # Position offset for texture nodes
-                    x_pos = -400
-                    y_pos = 300
-                    
-                    # Connect different texture maps
-                    for map_type, image in downloaded_maps.items():
-                        tex_node = nodes.new(type='ShaderNodeTexImage')
-                        tex_node.location = (x_pos, y_pos)
-                        tex_node.image = image
-                        
-                        # Set color space based on map type
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'sRGB'
-                            except:
-                                pass  # Use default if sRGB not available
-                        else:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'Non-Color'
-                            except:
-                                pass  # Use default if Non-Color not available
-                        
-                        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-                        
-                        # Connect to appropriate input on Principled BSDF
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                        elif map_type.lower() in ['roughness', 'rough']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                        elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                        elif map_type.lower() in ['normal', 'nor']:
-                            # Add normal map node
-                            normal_map = nodes.new(type='ShaderNodeNormalMap')
-                            normal_map.location = (x_pos + 200, y_pos)
-                            links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                            links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                        elif map_type in ['displacement', 'disp', 'height']:
-                            # Add displacement node
-                            disp_node = nodes.new(type='ShaderNodeDisplacement')
-                            disp_node.location = (x_pos + 200, y_pos - 200)
-                            links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                            links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                        
-                        y_pos -= 250
-                    
-                    return {
-                        "success": True, 
-                        "message": f"Texture {asset_id} imported as material",
-                        "material": mat.name,
-                        "maps": list(downloaded_maps.keys())
-                    }
-                
-                except Exception as e:
-                    return {"error": f"Failed to process textures: {str(e)}"}
-                
-            elif asset_type == "models":
-                # For models, prefer glTF format if available
-                if not file_format:
-                    file_format = "gltf"  # Default format for models
-                
-                if file_format in files_data and resolution in files_data[file_format]:
-                    file_info = files_data[file_format][resolution][file_format]
-                    file_url = file_info["url"]
-                    
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
-                    
+                    env_tex.image.colorspace_settings.name = 'Linear'
+                except:
+                    # Fallback to Non-Color if Linear isn't available
+                    env_tex.image.colorspace_settings.name = 'Non-Color'
+            else:  # hdr
+                # For HDR files, try these options in order
+                for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
                     try:
-                        # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-                        
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
-                        
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
-                        
-                        # Check for included files and download them
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                # Get the URL for the included file - this is the fix
-                                include_url = include_info["url"]
-                                
-                                # Create the directory structure for the included file
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-                                
-                                # Download the included file
-                                include_response = requests.get(include_url)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    print(f"Failed to download included file: {include_path}")
-                        
-                        # Import the model into Blender
-                        if file_format == "gltf" or file_format == "glb":
-                            bpy.ops.import_scene.gltf(filepath=main_file_path)
-                        elif file_format == "fbx":
-                            bpy.ops.import_scene.fbx(filepath=main_file_path)
-                        elif file_format == "obj":
-                            bpy.ops.import_scene.obj(filepath=main_file_path)
-                        elif file_format == "blend":
-                            # For blend files, we need to append or link
-                            with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
-                                data_to.objects = data_from.objects
-                            
-                            # Link the objects to the scene
-                            for obj in data_to.objects:
-                                if obj is not None:
-                                    bpy.context.collection.objects.link(obj)
-                        else:
-                            return {"error": f"Unsupported model format: {file_format}"}
-                        
-                        # Get the names of imported objects
-                        imported_objects = [obj.name for obj in bpy.context.selected_objects]
-                        
-                        return {
-                            "success": True, 
-                            "message": f"Model {asset_id} imported successfully",
-                            "imported_objects": imported_objects
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                else:
-                    return {"error": f"Requested format or resolution not available for this model"}
-                
-            else:
-                return {"error": f"Unsupported asset type: {asset_type}"}
-                
+                        env_tex.image.colorspace_settings.name = color_space
+                        break  # Stop if we successfully set a color space
+                    except:
+                        continue
+
+            background = node_tree.nodes.new(type='ShaderNodeBackground')
+            background.location = (-200, 0)
+
+            output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+            output.location = (0, 0)
+
+            # Connect nodes
+            node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+            node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+            node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+            node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
+
+            # Set as active world
+            bpy.context.scene.world = world
+
+            return {
+                "success": True,
+                "message": f"HDRI {asset_id} imported successfully",
+                "image_name": env_tex.image.name
+            }
         except Exception as e:
-            return {"error": f"Failed to download asset: {str(e)}"}
+            return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
+
+    def _import_polyhaven_textures(self, asset_id, map_paths, file_format):
+        downloaded_maps = {}
 
-    def set_texture(self, object_name, texture_id):
-        """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
         try:
-            # Get the object
-            obj = bpy.data.objects.get(object_name)
-            if not obj:
-                return {"error": f"Object not found: {object_name}"}
-            
-            # Make sure object can accept materials
-            if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
-                return {"error": f"Object {object_name} cannot accept materials"}
-            
-            # Find all images related to this texture and ensure they're properly loaded
-            texture_images = {}
-            for img in bpy.data.images:
-                if img.name.startswith(texture_id + "_"):
-                    # Extract the map type from the image name
-                    map_type = img.name.split('_')[-1].split('.')[0]
-                    
-                    # Force a reload of the image
-                    img.reload()
-                    
-                    # Ensure proper color space
-                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                        try:
-                            img.colorspace_settings.name = 'sRGB'
-                        except:
-                            pass
-                    else:
-                        try:
-                            img.colorspace_settings.name = 'Non-Color'
-                        except:
-                            pass
-                    
-                    # Ensure the image is packed
-                    if not img.packed_file:
-                        img.pack()
-                    
-                    texture_images[map_type] = img
-                    print(f"Loaded texture map: {map_type} - {img.name}")
-                    
-                    # Debug info
-                    print(f"Image size: {img.size[0]}x{img.size[1]}")
-                    print(f"Color space: {img.colorspace_settings.name}")
-                    print(f"File format: {img.file_format}")
-                    print(f"Is packed: {bool(img.packed_file)}")
+            for map_type, map_path in map_paths.items():
+                # Load image from the asset cache
+                image = bpy.data.images.load(map_path)
+                image.name = f"{asset_id}_{map_type}.{file_format}"
+
+                # Pack the image into .blend file
+                image.pack()
+                _texture_index.register(asset_id, image, map_path)
+
+                # Set color space based on map type
+                if map_type in ['color', 'diffuse', 'albedo']:
+                    try:
+                        image.colorspace_settings.name = 'sRGB'
+                    except:
+                        pass
+                else:
+                    try:
+                        image.colorspace_settings.name = 'Non-Color'
+                    except:
+                        pass
+
+                downloaded_maps[map_type] = image
+
+            if not downloaded_maps:
+                return {"error": f"No texture maps found for the requested resolution and format"}
+
+            # Create a new material with the downloaded textures
+            mat = bpy.data.materials.new(name=asset_id)
+            mat.use_nodes = True
+            nodes = mat.node_tree.nodes
+            links = mat.node_tree.links
 
-            if not texture_images:
-                return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
-            
-            # Create a new material
-            new_mat_name = f"{texture_id}_material_{object_name}"
-            
-            # Remove any existing material with this name to avoid conflicts
-            existing_mat = bpy.data.materials.get(new_mat_name)
-            if existing_mat:
-                bpy.data.materials.remove(existing_mat)
-            
-            new_mat = bpy.data.materials.new(name=new_mat_name)
-            new_mat.use_nodes = True
-            
-            # Set up the material nodes
-            nodes = new_mat.node_tree.nodes
-            links = new_mat.node_tree.links
-            
             # Clear default nodes
-            nodes.clear()
-            
+            for node in nodes:
+                nodes.remove(node)
+
             # Create output node
             output = nodes.new(type='ShaderNodeOutputMaterial')
-            output.location = (600, 0)
-            
+            output.location = (300, 0)
+
             # Create principled BSDF node
             principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-            principled.location = (300, 0)
+            principled.location = (0, 0)
             links.new(principled.outputs[0], output.inputs[0])
-            
+
             # Add texture nodes based on available maps
             tex_coord = nodes.new(type='ShaderNodeTexCoord')
             tex_coord.location = (-800, 0)
-            
+
             mapping = nodes.new(type='ShaderNodeMapping')
             mapping.location = (-600, 0)
             mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
             links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-            
+
             # Position offset for texture nodes
             x_pos = -400
             y_pos = 300
-            
+
             # Connect different texture maps
-            for map_type, image in texture_images.items():
+            for map_type, image in downloaded_maps.items():
                 tex_node = nodes.new(type='ShaderNodeTexImage')
                 tex_node.location = (x_pos, y_pos)
                 tex_node.image = image
-                
+
                 # Set color space based on map type
                 if map_type.lower() in ['color', 'diffuse', 'albedo']:
                     try:
@@ -892,9 +4283,9 @@ class BlenderMCPServer:
                         tex_node.image.colorspace_settings.name = 'Non-Color'
                     except:
                         pass  # Use default if Non-Color not available
-                
+
                 links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-                
+
                 # Connect to appropriate input on Principled BSDF
                 if map_type.lower() in ['color', 'diffuse', 'albedo']:
                     links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
@@ -902,141 +4293,341 @@ class BlenderMCPServer:
                     links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
                 elif map_type.lower() in ['metallic', 'metalness', 'metal']:
                     links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                elif map_type.lower() in ['normal', 'nor', 'dx', 'gl']:
+                elif map_type.lower() in ['normal', 'nor']:
                     # Add normal map node
                     normal_map = nodes.new(type='ShaderNodeNormalMap')
                     normal_map.location = (x_pos + 200, y_pos)
                     links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
                     links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                elif map_type.lower() in ['displacement', 'disp', 'height']:
+                elif map_type in ['displacement', 'disp', 'height']:
                     # Add displacement node
                     disp_node = nodes.new(type='ShaderNodeDisplacement')
                     disp_node.location = (x_pos + 200, y_pos - 200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
                     links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
                     links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                
+
                 y_pos -= 250
-            
-            # Second pass: Connect nodes with proper handling for special cases
-            texture_nodes = {}
-            
-            # First find all texture nodes and store them by map type
-            for node in nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    for map_type, image in texture_images.items():
-                        if node.image == image:
-                            texture_nodes[map_type] = node
-                            break
-            
-            # Now connect everything using the nodes instead of images
-            # Handle base color (diffuse)
+
+            return {
+                "success": True,
+                "message": f"Texture {asset_id} imported as material",
+                "material": mat.name,
+                "maps": list(downloaded_maps.keys())
+            }
+
+        except Exception as e:
+            return {"error": f"Failed to process textures: {str(e)}"}
+
+    def _import_polyhaven_model(self, asset_id, main_file_path, file_format):
+        try:
+            # Import the model into Blender
+            if file_format == "gltf" or file_format == "glb":
+                bpy.ops.import_scene.gltf(filepath=main_file_path)
+            elif file_format == "fbx":
+                bpy.ops.import_scene.fbx(filepath=main_file_path)
+            elif file_format == "obj":
+                bpy.ops.import_scene.obj(filepath=main_file_path)
+            elif file_format == "blend":
+                # For blend files, we need to append or link
+                with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
+                    data_to.objects = data_from.objects
+
+                # Link the objects to the scene
+                for obj in data_to.objects:
+                    if obj is not None:
+                        bpy.context.collection.objects.link(obj)
+            else:
+                return {"error": f"Unsupported model format: {file_format}"}
+
+            # Get the names of imported objects
+            imported_objects = [obj.name for obj in bpy.context.selected_objects]
+
+            return {
+                "success": True,
+                "message": f"Model {asset_id} imported successfully",
+                "imported_objects": imported_objects
+            }
+        except Exception as e:
+            return {"error": f"Failed to import model: {str(e)}"}
+
+    def _load_texture_images(self, texture_id):
+        """
+        Get the downloaded images of a texture from the texture index.
+
+        Images are only reloaded (and re-packed) when their source file still exists and
+        changed since they were indexed. Returns ({map_type: image}, [reloaded map types]).
+        """
+        indexed = _texture_index.lookup(texture_id)
+        if not indexed:
+            _texture_index.discover(texture_id)
+            indexed = _texture_index.lookup(texture_id)
+
+        texture_images = {}
+        reloaded = []
+        for map_type, (img, entry) in indexed.items():
+            signature = _texture_index.file_signature(img.filepath)
+            # A missing source file (evicted cache) keeps the packed pixels and the entry as they are
+            if signature is not None and signature != entry["signature"]:
+                # A packed image reloads its packed bytes, so drop them to read the new file
+                if img.packed_file:
+                    img.unpack(method='REMOVE')
+                img.reload()
+
+                # Ensure proper color space
+                if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                    try:
+                        img.colorspace_settings.name = 'sRGB'
+                    except:
+                        pass
+                else:
+                    try:
+                        img.colorspace_settings.name = 'Non-Color'
+                    except:
+                        pass
+
+                # Ensure the image is packed
+                if not img.packed_file:
+                    img.pack()
+
+                entry["signature"] = signature
+                reloaded.append(map_type)
+                print(f"Reloaded texture map: {map_type} - {img.name}")
+
+            texture_images[map_type] = img
+        return texture_images, reloaded
+
+    def _get_texture_material(self, texture_id, texture_images):
+        """Get the shared material of a texture, (re)building its nodes only when its images changed"""
+        images_key = sorted((map_type, img.name) for map_type, img in texture_images.items())
+        cached = _texture_index.materials.get(texture_id)
+        mat = bpy.data.materials.get(cached[0]) if cached else None
+        if mat is not None and cached[1] == images_key:
+            return mat, True
+
+        # The index is emptied on file load; reuse the material saved in the file
+        if mat is None:
+            mat = bpy.data.materials.get(f"{texture_id}_material")
+
+        if mat is None:
+            mat = bpy.data.materials.new(name=f"{texture_id}_material")
+        self._build_texture_material(mat, texture_images)
+        _texture_index.materials[texture_id] = (mat.name, images_key)
+        return mat, False
+
+    def _build_texture_material(self, mat, texture_images):
+        """Replace a material's node tree with a Principled BSDF setup driven by the texture maps"""
+        mat.use_nodes = True
+
+        # Set up the material nodes
+        nodes = mat.node_tree.nodes
+        links = mat.node_tree.links
+
+        # Clear default nodes
+        nodes.clear()
+
+        # Create output node
+        output = nodes.new(type='ShaderNodeOutputMaterial')
+        output.location = (600, 0)
+
+        # Create principled BSDF node
+        principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+        principled.location = (300, 0)
+        links.new(principled.outputs[0], output.inputs[0])
+
+        # Add texture nodes based on available maps
+        tex_coord = nodes.new(type='ShaderNodeTexCoord')
+        tex_coord.location = (-800, 0)
+
+        mapping = nodes.new(type='ShaderNodeMapping')
+        mapping.location = (-600, 0)
+        mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
+        links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
+
+        # Position offset for texture nodes
+        x_pos = -400
+        y_pos = 300
+
+        # Connect different texture maps
+        for map_type, image in texture_images.items():
+            tex_node = nodes.new(type='ShaderNodeTexImage')
+            tex_node.location = (x_pos, y_pos)
+            tex_node.image = image
+
+            # Set color space based on map type
+            if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                try:
+                    tex_node.image.colorspace_settings.name = 'sRGB'
+                except:
+                    pass  # Use default if sRGB not available
+            else:
+                try:
+                    tex_node.image.colorspace_settings.name = 'Non-Color'
+                except:
+                    pass  # Use default if Non-Color not available
+
+            links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
+
+            # Connect to appropriate input on Principled BSDF
+            if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
+            elif map_type.lower() in ['roughness', 'rough']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
+            elif map_type.lower() in ['metallic', 'metalness', 'metal']:
+                links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
+            elif map_type.lower() in ['normal', 'nor', 'dx', 'gl']:
+                # Add normal map node
+                normal_map = nodes.new(type='ShaderNodeNormalMap')
+                normal_map.location = (x_pos + 200, y_pos)
+                links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
+                links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+            elif map_type.lower() in ['displacement', 'disp', 'height']:
+                # Add displacement node
+                disp_node = nodes.new(type='ShaderNodeDisplacement')
+                disp_node.location = (x_pos + 200, y_pos - 200)
+                disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
+                links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
+                links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+
+            y_pos -= 250
+
+        # Second pass: Connect nodes with proper handling for special cases
+        texture_nodes = {}
+
+        # First find all texture nodes and store them by map type
+        for node in nodes:
+            if node.type == 'TEX_IMAGE' and node.image:
+                for map_type, image in texture_images.items():
+                    if node.image == image:
+                        texture_nodes[map_type] = node
+                        break
+
+        # Now connect everything using the nodes instead of images
+        # Handle base color (diffuse)
+        for map_name in ['color', 'diffuse', 'albedo']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
+                print(f"Connected {map_name} to Base Color")
+                break
+
+        # Handle roughness
+        for map_name in ['roughness', 'rough']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
+                print(f"Connected {map_name} to Roughness")
+                break
+
+        # Handle metallic
+        for map_name in ['metallic', 'metalness', 'metal']:
+            if map_name in texture_nodes:
+                links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
+                print(f"Connected {map_name} to Metallic")
+                break
+
+        # Handle normal maps
+        for map_name in ['gl', 'dx', 'nor']:
+            if map_name in texture_nodes:
+                normal_map_node = nodes.new(type='ShaderNodeNormalMap')
+                normal_map_node.location = (100, 100)
+                links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
+                links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
+                print(f"Connected {map_name} to Normal")
+                break
+
+        # Handle displacement
+        for map_name in ['displacement', 'disp', 'height']:
+            if map_name in texture_nodes:
+                disp_node = nodes.new(type='ShaderNodeDisplacement')
+                disp_node.location = (300, -200)
+                disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
+                links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
+                links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+                print(f"Connected {map_name} to Displacement")
+                break
+
+        # Handle ARM texture (Ambient Occlusion, Roughness, Metallic)
+        if 'arm' in texture_nodes:
+            separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
+            separate_rgb.location = (-200, -100)
+            links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
+
+            # Connect Roughness (G) if no dedicated roughness map
+            if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
+                links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
+                print("Connected ARM.G to Roughness")
+
+            # Connect Metallic (B) if no dedicated metallic map
+            if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
+                links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
+                print("Connected ARM.B to Metallic")
+
+            # For AO (R channel), multiply with base color if we have one
+            base_color_node = None
             for map_name in ['color', 'diffuse', 'albedo']:
                 if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
-                    print(f"Connected {map_name} to Base Color")
-                    break
-            
-            # Handle roughness
-            for map_name in ['roughness', 'rough']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
-                    print(f"Connected {map_name} to Roughness")
+                    base_color_node = texture_nodes[map_name]
                     break
-            
-            # Handle metallic
-            for map_name in ['metallic', 'metalness', 'metal']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
-                    print(f"Connected {map_name} to Metallic")
-                    break
-            
-            # Handle normal maps
-            for map_name in ['gl', 'dx', 'nor']:
-                if map_name in texture_nodes:
-                    normal_map_node = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map_node.location = (100, 100)
-                    links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
-                    links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
-                    print(f"Connected {map_name} to Normal")
-                    break
-            
-            # Handle displacement
-            for map_name in ['displacement', 'disp', 'height']:
+
+            if base_color_node:
+                mix_node = nodes.new(type='ShaderNodeMixRGB')
+                mix_node.location = (100, 200)
+                mix_node.blend_type = 'MULTIPLY'
+                mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
+
+                # Disconnect direct connection to base color
+                for link in base_color_node.outputs['Color'].links:
+                    if link.to_socket == principled.inputs['Base Color']:
+                        links.remove(link)
+
+                # Connect through the mix node
+                links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
+                links.new(separate_rgb.outputs['R'], mix_node.inputs[2])
+                links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
+                print("Connected ARM.R to AO mix with Base Color")
+
+        # Handle AO (Ambient Occlusion) if separate
+        if 'ao' in texture_nodes:
+            base_color_node = None
+            for map_name in ['color', 'diffuse', 'albedo']:
                 if map_name in texture_nodes:
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (300, -200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
-                    links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                    print(f"Connected {map_name} to Displacement")
+                    base_color_node = texture_nodes[map_name]
                     break
+
+            if base_color_node:
+                mix_node = nodes.new(type='ShaderNodeMixRGB')
+                mix_node.location = (100, 200)
+                mix_node.blend_type = 'MULTIPLY'
+                mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
+
+                # Disconnect direct connection to base color
+                for link in base_color_node.outputs['Color'].links:
+                    if link.to_socket == principled.inputs['Base Color']:
+                        links.remove(link)
+
+                # Connect through the mix node
+                links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
+                links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
+                links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
+                print("Connected AO to mix with Base Color")
+
+    def set_texture(self, object_name, texture_id):
+        """Apply a previously downloaded Polyhaven texture to an object using the texture's shared material"""
+        try:
+            # Get the object
+            obj = bpy.data.objects.get(object_name)
+            if not obj:
+                return {"error": f"Object not found: {object_name}"}
             
-            # Handle ARM texture (Ambient Occlusion, Roughness, Metallic)
-            if 'arm' in texture_nodes:
-                separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
-                separate_rgb.location = (-200, -100)
-                links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
-                
-                # Connect Roughness (G) if no dedicated roughness map
-                if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
-                    links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
-                    print("Connected ARM.G to Roughness")
-                
-                # Connect Metallic (B) if no dedicated metallic map
-                if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
-                    links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
-                    print("Connected ARM.B to Metallic")
-                
-                # For AO (R channel), multiply with base color if we have one
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-                
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-                    
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-                    
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(separate_rgb.outputs['R'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected ARM.R to AO mix with Base Color")
-            
-            # Handle AO (Ambient Occlusion) if separate
-            if 'ao' in texture_nodes:
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-                
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-                    
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-                    
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected AO to mix with Base Color")
+            # Make sure object can accept materials
+            if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
+                return {"error": f"Object {object_name} cannot accept materials"}
             
+            texture_images, reloaded = self._load_texture_images(texture_id)
+            if not texture_images:
+                return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
+
+            # One material per texture, shared by every object it is applied to
+            new_mat, reused = self._get_texture_material(texture_id, texture_images)
+
             # CRITICAL: Make sure to clear all existing materials from the object
             while len(obj.data.materials) > 0:
                 obj.data.materials.pop(index=0)
@@ -1078,9 +4669,11 @@ class BlenderMCPServer:
             
             return {
                 "success": True,
-                "message": f"Created new material and applied texture {texture_id} to {object_name}",
+                "message": f"{'Reused' if reused else 'Created'} material and applied texture {texture_id} to {object_name}",
                 "material": new_mat.name,
+                "material_reused": reused,
                 "maps": texture_maps,
+                "reloaded_maps": reloaded,
                 "material_info": material_info
             }
             
@@ -1089,6 +4682,73 @@ class BlenderMCPServer:
             traceback.print_exc()
             return {"error": f"Failed to apply texture: {str(e)}"}
 
+    def set_texture_bulk(self, texture_id, object_names=None, name_pattern=None, collection=None):
+        """
+        Apply a previously downloaded Polyhaven texture to many objects in one pass.
+
+        Targets are the union of object_names, objects whose name matches the
+        case-insensitive glob name_pattern, and the objects of a collection (including
+        nested collections). All of them get the texture's single shared material.
+        """
+        start_time = time.perf_counter()
+        try:
+            if not (object_names or name_pattern or collection):
+                return {"error": "Pass object_names, name_pattern or collection"}
+
+            targets = {}
+            outcomes = {}
+            for name in object_names or []:
+                obj = bpy.data.objects.get(name)
+                if obj is None:
+                    outcomes[name] = "not found"
+                else:
+                    targets[obj.name] = obj
+            if name_pattern:
+                pattern = name_pattern.lower()
+                for obj in bpy.context.scene.objects:
+                    if fnmatch.fnmatchcase(obj.name.lower(), pattern):
+                        targets[obj.name] = obj
+            if collection:
+                coll = bpy.data.collections.get(collection)
+                if coll is None:
+                    return {"error": f"Collection not found: {collection}"}
+                for obj in coll.all_objects:
+                    targets[obj.name] = obj
+
+            texture_images, reloaded = self._load_texture_images(texture_id)
+            if not texture_images:
+                return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
+            mat, reused = self._get_texture_material(texture_id, texture_images)
+
+            applied = 0
+            for name, obj in targets.items():
+                data = obj.data
+                if data is None or not hasattr(data, 'materials'):
+                    outcomes[name] = "cannot accept materials"
+                    continue
+                data.materials.clear()
+                data.materials.append(mat)
+                outcomes[name] = "applied"
+                applied += 1
+
+            if applied:
+                bpy.context.view_layer.update()
+
+            return {
+                "success": applied > 0,
+                "material": mat.name,
+                "material_reused": reused,
+                "maps": list(texture_images.keys()),
+                "reloaded_maps": reloaded,
+                "applied": applied,
+                "objects": outcomes,
+                "time_ms": round((time.perf_counter() - start_time) * 1000, 2),
+            }
+        except Exception as e:
+            print(f"Error in set_texture_bulk: {str(e)}")
+            traceback.print_exc()
+            return {"error": f"Failed to apply texture: {str(e)}"}
+
     def get_polyhaven_status(self):
         """Get the current status of PolyHaven integration"""
         enabled = bpy.context.scene.blendermcp_use_polyhaven
@@ -1133,12 +4793,32 @@ class BlenderMCPServer:
                             3. Restart the connection to Claude"""
             }
 
-    def create_rodin_job(self, *args, **kwargs):
+    def create_rodin_job(self, *args, track=False, import_as=None, **kwargs):
+        """
+        Create a Rodin generation job.
+
+        With track=True (implied by import_as) the addon polls the job itself and the
+        response carries a "tracking_job" status whose job_id can be passed to
+        wait_for_job; with import_as the finished asset is imported under that name.
+        """
         match bpy.context.scene.blendermcp_hyper3d_mode:
             case "MAIN_SITE":
-                return self.create_rodin_job_main_site(*args, **kwargs)
+                data = self.create_rodin_job_main_site(*args, **kwargs)
+                if (track or import_as) and isinstance(data, dict) and "jobs" in data:
+                    data["tracking_job"] = self.track_rodin_job_main_site(
+                        subscription_key=data["jobs"]["subscription_key"],
+                        task_uuid=data.get("uuid"),
+                        import_as=import_as,
+                    )
+                return data
             case "FAL_AI":
-                return self.create_rodin_job_fal_ai(*args, **kwargs)
+                data = self.create_rodin_job_fal_ai(*args, **kwargs)
+                if (track or import_as) and isinstance(data, dict) and "request_id" in data:
+                    data["tracking_job"] = self.track_rodin_job_fal_ai(
+                        request_id=data["request_id"],
+                        import_as=import_as,
+                    )
+                return data
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
@@ -1161,8 +4841,11 @@ class BlenderMCPServer:
                 files.append(("prompt", (None, text_prompt)))
             if bbox_condition:
                 files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
-            response = requests.post(
-                "https://hyperhuman.deemos.com/api/v2/rodin",
+            # Creating a job is not idempotent, so never retry it
+            response = _http.post(
+                "hyper3d",
+                f"{RODIN_MAIN_SITE_URL}/rodin",
+                retries=0,
                 headers={
                     "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
                 },
@@ -1189,8 +4872,10 @@ class BlenderMCPServer:
                 req_data["prompt"] = text_prompt
             if bbox_condition:
                 req_data["bbox_condition"] = bbox_condition
-            response = requests.post(
-                "https://queue.fal.run/fal-ai/hyper3d/rodin",
+            response = _http.post(
+                "hyper3d",
+                f"{RODIN_FAL_AI_URL}/rodin",
+                retries=0,
                 headers={
                     "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
                     "Content-Type": "application/json",
@@ -1202,108 +4887,491 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
 
-    def poll_rodin_job_status(self, *args, **kwargs):
-        match bpy.context.scene.blendermcp_hyper3d_mode:
-            case "MAIN_SITE":
-                return self.poll_rodin_job_status_main_site(*args, **kwargs)
-            case "FAL_AI":
-                return self.poll_rodin_job_status_fal_ai(*args, **kwargs)
-            case _:
-                return f"Error: Unknown Hyper3D Rodin mode!"
+    def poll_rodin_job_status(self, *args, **kwargs):
+        match bpy.context.scene.blendermcp_hyper3d_mode:
+            case "MAIN_SITE":
+                return self.poll_rodin_job_status_main_site(*args, **kwargs)
+            case "FAL_AI":
+                return self.poll_rodin_job_status_fal_ai(*args, **kwargs)
+            case _:
+                return f"Error: Unknown Hyper3D Rodin mode!"
+
+    @staticmethod
+    def _request_rodin_status_main_site(subscription_key, api_key):
+        response = _http.post(
+            "hyper3d",
+            f"{RODIN_MAIN_SITE_URL}/status",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+            },
+            json={
+                "subscription_key": subscription_key,
+            },
+        )
+        data = response.json()
+        return {
+            "status_list": [i["status"] for i in data["jobs"]]
+        }
+
+    @staticmethod
+    def _request_rodin_status_fal_ai(request_id, api_key):
+        response = _http.get(
+            "hyper3d",
+            f"{RODIN_FAL_AI_URL}/requests/{request_id}/status",
+            headers={
+                "Authorization": f"KEY {api_key}",
+            },
+        )
+        data = response.json()
+        return data
+
+    @staticmethod
+    def _cached_rodin_status(key):
+        """Status cached by the job tracker for a tracked task, or None"""
+        cached = _rodin_tracker.cached_status(key)
+        if cached is None:
+            return None
+        return {
+            **cached["status"],
+            "cached": True,
+            "polled_s_ago": round(time.time() - cached["polled_at"], 1),
+        }
+
+    def poll_rodin_job_status_main_site(self, subscription_key: str):
+        """Call the job status API to get the job status (answered from the tracker cache for tracked jobs)"""
+        cached = self._cached_rodin_status(subscription_key)
+        if cached is not None:
+            return cached
+        return self._request_rodin_status_main_site(
+            subscription_key, bpy.context.scene.blendermcp_hyper3d_api_key
+        )
+    
+    def poll_rodin_job_status_fal_ai(self, request_id: str):
+        """Call the job status API to get the job status (answered from the tracker cache for tracked jobs)"""
+        cached = self._cached_rodin_status(request_id)
+        if cached is not None:
+            return cached
+        return self._request_rodin_status_fal_ai(
+            request_id, bpy.context.scene.blendermcp_hyper3d_api_key
+        )
+
+    def track_rodin_job(self, *args, **kwargs):
+        match bpy.context.scene.blendermcp_hyper3d_mode:
+            case "MAIN_SITE":
+                return self.track_rodin_job_main_site(*args, **kwargs)
+            case "FAL_AI":
+                return self.track_rodin_job_fal_ai(*args, **kwargs)
+            case _:
+                return f"Error: Unknown Hyper3D Rodin mode!"
+
+    def _track_rodin_task(self, key, poll, fetch, import_as, timeout):
+        """Hand a remote task to the tracker, importing the result under import_as when done"""
+        on_done = None
+        if import_as:
+            def on_done(job, status):
+                _background_jobs.run(job, DeferredResult(fetch, self._finish_generated_asset(import_as)))
+
+        job = _rodin_tracker.track(key, poll, on_done=on_done, timeout=float(timeout))
+        return job.status()
+
+    def track_rodin_job_main_site(self, subscription_key: str, task_uuid: str=None,
+                                  import_as: str=None, timeout: float=RODIN_JOB_TIMEOUT):
+        """
+        Poll a Rodin job in the background until all of its jobs are done.
+
+        Returns the tracking job status; use wait_for_job with its job_id. With import_as
+        (which needs task_uuid) the generated GLB is downloaded and imported under that name.
+        """
+        if import_as and not task_uuid:
+            raise ValueError("task_uuid is required to import the generated asset")
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+
+        def poll():
+            status = self._request_rodin_status_main_site(subscription_key, api_key)
+            status_list = status["status_list"]
+            if any(s == "Failed" for s in status_list):
+                return "failed", status
+            if status_list and all(s == "Done" for s in status_list):
+                return "done", status
+            return "pending", status
+
+        def fetch(job):
+            return self._fetch_generated_asset_main_site(task_uuid, api_key)
+
+        return self._track_rodin_task(subscription_key, poll, fetch, import_as, timeout)
+
+    def track_rodin_job_fal_ai(self, request_id: str, import_as: str=None,
+                               timeout: float=RODIN_JOB_TIMEOUT):
+        """
+        Poll a fal.ai Rodin request in the background until it completes.
+
+        Returns the tracking job status; use wait_for_job with its job_id. With import_as
+        the generated GLB is downloaded and imported under that name.
+        """
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+
+        def poll():
+            status = self._request_rodin_status_fal_ai(request_id, api_key)
+            state = status.get("status")
+            if state == "COMPLETED":
+                return ("failed" if status.get("error") else "done"), status
+            if state in ("IN_QUEUE", "IN_PROGRESS"):
+                return "pending", status
+            return "failed", status
+
+        def fetch(job):
+            return self._fetch_generated_asset_fal_ai(request_id, api_key)
+
+        return self._track_rodin_task(request_id, poll, fetch, import_as, timeout)
+
+    @staticmethod
+    def _import_isolated(import_function):
+        """
+        Run an importer with a fresh temporary collection active and return the objects it created.
+
+        Importers link new objects into the active collection, so this finds them without
+        diffing bpy.data.objects. The objects (and any collections the importer created)
+        are then moved into the collection that was active before.
+        """
+        view_layer = bpy.context.view_layer
+        previous = view_layer.active_layer_collection
+        target = previous.collection
+        staging = bpy.data.collections.new("BlenderMCP_Import")
+        bpy.context.scene.collection.children.link(staging)
+        try:
+            view_layer.active_layer_collection = view_layer.layer_collection.children[staging.name]
+            import_function()
+            imported = list(staging.all_objects)
+        finally:
+            view_layer.active_layer_collection = previous
+            for obj in list(staging.objects):
+                if target.objects.get(obj.name) is None:
+                    target.objects.link(obj)
+                staging.objects.unlink(obj)
+            for child in list(staging.children):
+                target.children.link(child)
+                staging.children.unlink(child)
+            bpy.data.collections.remove(staging)
+        return imported
+
+    def search_materials(self, query=None, color=None, limit=10, library=None):
+        """
+        Search the material libraries without opening them.
+
+        Parameters:
+        - query: Free text matched against material names and color words ("yellow tiles")
+        - color: A color word, or an [r, g, b] linear color to rank by closeness
+        - library: Optional .blend file or directory to add to the indexed libraries
+        """
+        if library:
+            _material_catalog.add_library(library)
+        materials, total = _material_catalog.search(query, color, int(limit))
+        return {"materials": materials, "total_count": total, "returned_count": len(materials)}
+
+    def import_library_material(self, name, filepath=None, assign_to=None):
+        """
+        Append a library material, reusing the copy from an earlier import.
+
+        Appended materials are tagged with their source, so importing the same material again
+        returns the existing one instead of creating name.001. assign_to is a list of object
+        names (or "*" for every mesh in the scene) whose first material slot is replaced.
+        """
+        filepath = _material_catalog.find(name, filepath)
+        if filepath is None:
+            return {"error": f"Material not found in the material libraries: {name}"}
+        source = f"{filepath}::{name}"
+
+        material = next((m for m in bpy.data.materials
+                         if m.library is None and m.get(MATERIAL_SOURCE_PROPERTY) == source), None)
+        reused = material is not None
+        if material is None:
+            with bpy.data.libraries.load(filepath, link=False) as (data_from, data_to):
+                data_to.materials = [name]
+            material = data_to.materials[0]
+            material[MATERIAL_SOURCE_PROPERTY] = source
+
+        if assign_to == "*":
+            targets = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
+        else:
+            targets = [bpy.data.objects[obj_name] for obj_name in assign_to or [] if obj_name in bpy.data.objects]
+            targets = [obj for obj in targets if hasattr(obj.data, "materials")]
+        for obj in targets:
+            if obj.data.materials:
+                obj.data.materials[0] = material
+            else:
+                obj.data.materials.append(material)
+
+        return {"material": material.name, "filepath": filepath, "reused": reused, "assigned": len(targets)}
+
+    @staticmethod
+    def _instance_collection(source, name):
+        """New collection with linked duplicates of source's objects (mesh data is shared)"""
+        collection = bpy.data.collections.new(name)
+        copies = {}
+        for obj in source.all_objects:
+            copies[obj] = obj.copy()
+            collection.objects.link(copies[obj])
+        for obj, copy in copies.items():
+            if obj.parent in copies:
+                copy.parent = copies[obj.parent]
+        return collection
+
+    def import_model(self, filepath, name=None, mode="append", options=None, location=None, use_cache=True):
+        """
+        Import an FBX / glTF / OBJ file through the import cache.
+
+        The first import of a file (per mtime and import options) runs Blender's importer and
+        saves the result as a .blend library. Later imports reuse it according to mode:
+        - "append": editable copy appended from the library (no re-parsing of the source)
+        - "instance": linked duplicates of a copy already in this file, sharing its mesh data
+          (falls back to "append" when there is none)
+        - "link": the library collection linked read-only and placed with a collection instance
+          (linked from a per-user copy of the library that the asset cache never evicts)
+        The imported root objects are moved to location when given.
+        """
+        options = options or {}
+        if mode not in ("append", "instance", "link"):
+            return {"error": "mode must be 'append', 'instance' or 'link'"}
+        extension = os.path.splitext(filepath)[1].lower()
+        if extension not in MODEL_IMPORTERS:
+            return {"error": f"Unsupported model format: {extension}"}
+        if not os.path.exists(filepath):
+            return {"error": f"File not found: {filepath}"}
 
-    def poll_rodin_job_status_main_site(self, subscription_key: str):
-        """Call the job status API to get the job status"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/status",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                "subscription_key": subscription_key,
-            },
-        )
-        data = response.json()
+        start = time.perf_counter()
+        name = name or os.path.splitext(os.path.basename(filepath))[0]
+        key = ModelImportCache.key(filepath, options)
+        _, meta = _model_import_cache.entry(key)
+        target = bpy.context.collection
+        cache = "hit"
+        instance = None
+
+        if meta is None or not use_cache:
+            cache = "miss"
+            _model_import_cache.misses += 1
+            imported = self._import_isolated(lambda: MODEL_IMPORTERS[extension](filepath, options))
+            collection = bpy.data.collections.new(name)
+            for obj in imported:
+                for users_collection in list(obj.users_collection):
+                    users_collection.objects.unlink(obj)
+                collection.objects.link(obj)
+            target.children.link(collection)
+            if use_cache:
+                _model_import_cache.store(key, collection)
+        else:
+            _model_import_cache.hits += 1
+            source = _model_import_cache.loaded_copy(key) if mode == "instance" else None
+            if source is not None:
+                collection = self._instance_collection(source, name)
+                _model_import_cache.remember(key, collection)
+            elif mode == "link":
+                collection = _model_import_cache.load(key, link=True)
+                instance = bpy.data.objects.new(name, None)
+                instance.instance_type = 'COLLECTION'
+                instance.instance_collection = collection
+                target.objects.link(instance)
+            else:
+                mode = "append" if mode == "instance" else mode
+                collection = _model_import_cache.load(key)
+                collection.name = name
+                _model_import_cache.remember(key, collection)
+            if instance is None:
+                target.children.link(collection)
+
+        if location is not None:
+            roots = [instance] if instance else [obj for obj in collection.all_objects if obj.parent is None]
+            for obj in roots:
+                obj.location = mathutils.Vector(obj.location) + mathutils.Vector(location)
+
+        objects = [instance] if instance else list(collection.all_objects)
         return {
-            "status_list": [i["status"] for i in data["jobs"]]
+            "success": True,
+            "collection": collection.name,
+            "objects": [obj.name for obj in objects],
+            "mode": mode if cache == "hit" else "import",
+            "cache": cache,
+            "time_ms": round((time.perf_counter() - start) * 1000, 2),
         }
-    
-    def poll_rodin_job_status_fal_ai(self, request_id: str):
-        """Call the job status API to get the job status"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
-            headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-        )
-        data = response.json()
-        return data
 
     @staticmethod
-    def _clean_imported_glb(filepath, mesh_name=None):
-        # Get the set of existing objects before import
-        existing_objects = set(bpy.data.objects)
+    def _count_triangles(mesh):
+        """Triangle count of a mesh from its polygon sizes, without triangulating"""
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        return int((loop_totals - 2).sum())
 
-        # Import the GLB file
-        bpy.ops.import_scene.gltf(filepath=filepath)
-        
-        # Ensure the context is updated
-        bpy.context.view_layer.update()
-        
-        # Get all imported objects
-        imported_objects = list(set(bpy.data.objects) - existing_objects)
-        # imported_objects = [obj for obj in bpy.context.view_layer.objects if obj.select_get()]
-        
-        if not imported_objects:
-            print("Error: No objects were imported.")
-            return
-        
-        # Identify the mesh object
-        mesh_obj = None
-        
-        if len(imported_objects) == 1 and imported_objects[0].type == 'MESH':
-            mesh_obj = imported_objects[0]
-            print("Single mesh imported, no cleanup needed.")
+    # foreach_get property, components and dtype of each mesh attribute data type
+    ATTRIBUTE_LAYOUTS = {
+        'FLOAT': ("value", 1, np.float32),
+        'INT': ("value", 1, np.int32),
+        'INT8': ("value", 1, np.int32),
+        'BOOLEAN': ("value", 1, np.bool_),
+        'FLOAT2': ("vector", 2, np.float32),
+        'INT32_2D': ("value", 2, np.int32),
+        'FLOAT_VECTOR': ("vector", 3, np.float32),
+        'FLOAT_COLOR': ("color", 4, np.float32),
+        'BYTE_COLOR': ("color", 4, np.float32),
+        'QUATERNION': ("value", 4, np.float32),
+        'FLOAT4X4': ("value", 16, np.float32),
+    }
+
+    @staticmethod
+    def _mesh_signature(mesh):
+        """
+        Hash of everything a mesh carries, equal only for true duplicates.
+
+        Covers the topology, every generic attribute (UVs, colors, sharp flags, ...), UV
+        layers and corner normals. Returns None for meshes that must never be merged
+        (shape keys, or an attribute type that can't be hashed).
+        """
+        if mesh.shape_keys is not None:
+            return None
+
+        def add(array, decimals=None):
+            digest.update(np.round(array, decimals).tobytes() if decimals is not None else array.tobytes())
+
+        digest = hashlib.sha1()
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        add(co, 5)
+        vertex_indices = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", vertex_indices)
+        add(vertex_indices)
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        add(loop_totals)
+
+        # Generic attributes; names starting with "." are internal (selection, hiding, ...)
+        for attribute in sorted(mesh.attributes, key=lambda a: a.name):
+            if attribute.name.startswith("."):
+                continue
+            layout = BlenderMCPServer.ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+            if layout is None:
+                return None
+            prop, components, dtype = layout
+            values = np.empty(len(attribute.data) * components, dtype=dtype)
+            attribute.data.foreach_get(prop, values)
+            digest.update(f"{attribute.name}:{attribute.domain}:{attribute.data_type}".encode("utf-8"))
+            add(values, 5 if dtype is np.float32 else None)
+
+        # UV layers (stored outside mesh.attributes before Blender 3.5)
+        for uv_layer in mesh.uv_layers:
+            uv = np.empty(len(uv_layer.data) * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", uv)
+            digest.update(uv_layer.name.encode("utf-8"))
+            add(uv, 5)
+
+        # Corner normals, which include custom split normals
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        if hasattr(mesh, "corner_normals"):  # Blender 4.1+
+            mesh.corner_normals.foreach_get("vector", normals)
         else:
-            if len(imported_objects) == 2:
-                empty_objs = [i for i in imported_objects if i.type == "EMPTY"]
-                if len(empty_objs) != 1:
-                    print("Error: Expected an empty node with one mesh child or a single mesh object.")
-                    return
-                parent_obj = empty_objs.pop()
-                if len(parent_obj.children) == 1:
-                    potential_mesh = parent_obj.children[0]
-                    if potential_mesh.type == 'MESH':
-                        print("GLB structure confirmed: Empty node with one mesh child.")
-                        
-                        # Unparent the mesh from the empty node
-                        potential_mesh.parent = None
-                        
-                        # Remove the empty node
-                        bpy.data.objects.remove(parent_obj)
-                        print("Removed empty node, keeping only the mesh.")
-                        
-                        mesh_obj = potential_mesh
-                    else:
-                        print("Error: Child is not a mesh object.")
-                        return
-                else:
-                    print("Error: Expected an empty node with one mesh child or a single mesh object.")
-                    return
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get("normal", normals)
+        add(normals, 4)
+
+        digest.update("|".join(m.name if m else "" for m in mesh.materials).encode("utf-8"))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _instance_duplicate_meshes(mesh_objects):
+        """Make objects with identical meshes share one mesh datablock; returns how many objects were re-pointed"""
+        users = {}
+        for obj in mesh_objects:
+            # Vertex group weights live in the mesh but are named on the object, so leave those alone
+            if not obj.vertex_groups:
+                users.setdefault(obj.data, []).append(obj)
+
+        by_signature = {}
+        instanced = 0
+        for mesh, objects in users.items():
+            signature = BlenderMCPServer._mesh_signature(mesh)
+            if signature is None:
+                continue
+            shared = by_signature.setdefault(signature, mesh)
+            if shared is mesh:
+                continue
+            for obj in objects:
+                obj.data = shared
+            instanced += len(objects)
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+        return instanced
+
+    @staticmethod
+    def _clean_imported_glb(filepath, mesh_name=None, merge=False, instance_duplicates=True):
+        """
+        Import a GLB and tidy it up, returning (object, stats).
+
+        A single mesh (or, with merge=True, all meshes joined into one) is returned as a
+        parentless mesh object without the importer's empties. Otherwise the hierarchy is
+        kept under one root, and meshes with identical geometry share their data when
+        instance_duplicates is set. Returns (None, stats) if nothing usable was imported.
+        """
+        started = time.perf_counter()
+        imported = BlenderMCPServer._import_isolated(lambda: bpy.ops.import_scene.gltf(filepath=filepath))
+        imported_at = time.perf_counter()
+        stats = {"import_time_s": round(imported_at - started, 3), "imported_objects": len(imported)}
+
+        mesh_objects = [obj for obj in imported if obj.type == 'MESH']
+        if not mesh_objects:
+            print("Error: No mesh objects were imported.")
+            return None, stats
+
+        if len(mesh_objects) == 1 or merge:
+            # Flatten: keep world transforms, drop the importer's empties
+            for obj in imported:
+                if obj.parent is not None:
+                    matrix = obj.matrix_world.copy()
+                    obj.parent = None
+                    obj.matrix_world = matrix
+            for obj in imported:
+                if obj.type == 'EMPTY':
+                    bpy.data.objects.remove(obj)
+
+            root = mesh_objects[0]
+            if len(mesh_objects) > 1:
+                with bpy.context.temp_override(
+                    active_object=root,
+                    object=root,
+                    selected_objects=mesh_objects,
+                    selected_editable_objects=mesh_objects,
+                ):
+                    bpy.ops.object.join()
+                mesh_objects = [root]
+        else:
+            if instance_duplicates:
+                stats["instanced_objects"] = BlenderMCPServer._instance_duplicate_meshes(mesh_objects)
+
+            roots = [obj for obj in imported if obj.parent is None]
+            if len(roots) == 1:
+                root = roots[0]
             else:
-                print("Error: Expected an empty node with one mesh child or a single mesh object.")
-                return
-        
-        # Rename the mesh if needed
+                root = bpy.data.objects.new(mesh_name or "GLB_Root", None)
+                bpy.context.collection.objects.link(root)
+                for obj in roots:
+                    obj.parent = root
+
+        # Rename the result if needed
         try:
-            if mesh_obj and mesh_obj.name is not None and mesh_name:
-                mesh_obj.name = mesh_name
-                if mesh_obj.data.name is not None:
-                    mesh_obj.data.name = mesh_name
+            if mesh_name:
+                root.name = mesh_name
+                if root.type == 'MESH':
+                    root.data.name = mesh_name
                 print(f"Mesh renamed to: {mesh_name}")
         except Exception as e:
             print("Having issue with renaming, give up renaming.")
 
-        return mesh_obj
+        unique_meshes = {obj.data for obj in mesh_objects}
+        triangles = {mesh: BlenderMCPServer._count_triangles(mesh) for mesh in unique_meshes}
+        stats.update({
+            "cleanup_time_s": round(time.perf_counter() - imported_at, 3),
+            "mesh_objects": len(mesh_objects),
+            "unique_meshes": len(unique_meshes),
+            "triangles": sum(triangles[obj.data] for obj in mesh_objects),
+            "unique_triangles": sum(triangles.values()),
+        })
+        return root, stats
 
     def import_generated_asset(self, *args, **kwargs):
         match bpy.context.scene.blendermcp_hyper3d_mode:
@@ -1314,54 +5382,17 @@ class BlenderMCPServer:
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
-    def import_generated_asset_main_site(self, task_uuid: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                'task_uuid': task_uuid
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        for i in data_["list"]:
-            if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-    
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-                    
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-                        
-                    # Close the file
-                    temp_file.close()
-                    
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-                
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
+    def _import_generated_glb(self, filepath, name, merge=False, instance_duplicates=True):
+        """Import a downloaded Rodin GLB and describe the resulting object (main thread only)"""
         try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
+            obj, stats = self._clean_imported_glb(
+                filepath=filepath,
+                mesh_name=name,
+                merge=merge,
+                instance_duplicates=instance_duplicates,
             )
+            if obj is None:
+                return {"succeed": False, "error": "The GLB file contains no mesh", "stats": stats}
             result = {
                 "name": obj.name,
                 "type": obj.type,
@@ -1373,39 +5404,37 @@ class BlenderMCPServer:
             if obj.type == "MESH":
                 bounding_box = self._get_aabb(obj)
                 result["world_bounding_box"] = bounding_box
+            else:
+                meshes = [child for child in obj.children_recursive if child.type == "MESH"]
+                if meshes:
+                    aabbs = self._get_aabbs(meshes)
+                    result["world_bounding_box"] = [aabbs[:, 0].min(axis=0).tolist(), aabbs[:, 1].max(axis=0).tolist()]
+                result["mesh_children"] = [child.name for child in meshes]
             
             return {
-                "succeed": True, **result
+                "succeed": True, **result, "stats": stats
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
-    
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
-            headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        
+
+    @staticmethod
+    def _download_to_temp_glb(url, prefix):
+        """Stream a GLB to a temporary file, returning {"path": ...} or {"succeed": False, "error": ...}"""
         temp_file = tempfile.NamedTemporaryFile(
             delete=False,
-            prefix=request_id,
+            prefix=prefix,
             suffix=".glb",
         )
 
         try:
             # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-                
+            with _http.get("hyper3d", url, stream=True) as response:
+                response.raise_for_status()  # Raise an exception for HTTP errors
+
+                # Write the content to the temporary file
+                for chunk in response.iter_content(chunk_size=8192):
+                    temp_file.write(chunk)
+
             # Close the file
             temp_file.close()
             
@@ -1415,28 +5444,66 @@ class BlenderMCPServer:
             os.unlink(temp_file.name)
             return {"succeed": False, "error": str(e)}
 
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
+        return {"path": temp_file.name}
+
+    def _finish_generated_asset(self, name, **import_options):
+        def finish(fetched):
+            if "path" not in fetched:
+                return fetched
+            return self._import_generated_glb(fetched["path"], name, **import_options)
+        return finish
+
+    def _fetch_generated_asset_main_site(self, task_uuid, api_key):
+        response = _http.post(
+            "hyper3d",
+            f"{RODIN_MAIN_SITE_URL}/download",
+            headers={
+                "Authorization": f"Bearer {api_key}",
+            },
+            json={
+                'task_uuid': task_uuid
             }
+        )
+        data_ = response.json()
+        for i in data_["list"]:
+            if i["name"].endswith(".glb"):
+                return self._download_to_temp_glb(i["url"], task_uuid)
+        return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
 
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-            
-            return {
-                "succeed": True, **result
+    def _fetch_generated_asset_fal_ai(self, request_id, api_key):
+        response = _http.get(
+            "hyper3d",
+            f"{RODIN_FAL_AI_URL}/requests/{request_id}",
+            headers={
+                "Authorization": f"Key {api_key}",
             }
-        except Exception as e:
-            return {"succeed": False, "error": str(e)}
+        )
+        data_ = response.json()
+        return self._download_to_temp_glb(data_["model_mesh"]["url"], request_id)
+
+    def import_generated_asset_main_site(self, task_uuid: str, name: str,
+                                         merge: bool=False, instance_duplicates: bool=True):
+        """Fetch the generated asset, import into blender"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+
+        def fetch(job):
+            return self._fetch_generated_asset_main_site(task_uuid, api_key)
+
+        return DeferredResult(fetch, self._finish_generated_asset(
+            name, merge=merge, instance_duplicates=instance_duplicates
+        ))
+    
+    def import_generated_asset_fal_ai(self, request_id: str, name: str,
+                                      merge: bool=False, instance_duplicates: bool=True):
+        """Fetch the generated asset, import into blender"""
+        api_key = bpy.context.scene.blendermcp_hyper3d_api_key
+
+        def fetch(job):
+            return self._fetch_generated_asset_fal_ai(request_id, api_key)
+
+        return DeferredResult(fetch, self._finish_generated_asset(
+            name, merge=merge, instance_duplicates=instance_duplicates
+        ))
     #endregion
 
     #region Sketchfab API
@@ -1452,10 +5519,10 @@ class BlenderMCPServer:
                     "Authorization": f"Token {api_key}"
                 }
                 
-                response = requests.get(
+                response = _http.get(
+                    "sketchfab",
                     "https://api.sketchfab.com/v3/me",
                     headers=headers,
-                    timeout=30  # Add timeout of 30 seconds
                 )
                 
                 if response.status_code == 200:
@@ -1504,185 +5571,225 @@ class BlenderMCPServer:
     
     def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True):
         """Search for models on Sketchfab based on query and optional filters"""
-        try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
-            if not api_key:
-                return {"error": "Sketchfab API key is not configured"}
-                
-            # Build search parameters with exact fields from Sketchfab API docs
-            params = {
-                "type": "models",
-                "q": query,
-                "count": count,
-                "downloadable": downloadable,
-                "archives_flavours": False
-            }
-            
-            if categories:
-                params["categories"] = categories
-                
-            # Make API request to Sketchfab search endpoint
-            # The proper format according to Sketchfab API docs for API key auth
-            headers = {
-                "Authorization": f"Token {api_key}"
-            }
-            
-            
-            # Use the search endpoint as specified in the API documentation
-            response = requests.get(
-                "https://api.sketchfab.com/v3/search",
-                headers=headers,
-                params=params,
-                timeout=30  # Add timeout of 30 seconds
-            )
-            
-            if response.status_code == 401:
-                return {"error": "Authentication failed (401). Check your API key."}
-                
-            if response.status_code != 200:
-                return {"error": f"API request failed with status code {response.status_code}"}
-                
-            response_data = response.json()
-            
-            # Safety check on the response structure
-            if response_data is None:
-                return {"error": "Received empty response from Sketchfab API"}
-                
-            # Handle 'results' potentially missing from response
-            results = response_data.get("results", [])
-            if not isinstance(results, list):
-                return {"error": f"Unexpected response format from Sketchfab API: {response_data}"}
-                
-            return response_data
-        
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return {"error": str(e)}
+        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        if not api_key:
+            return {"error": "Sketchfab API key is not configured"}
 
-    def download_sketchfab_model(self, uid):
-        """Download a model from Sketchfab by its UID"""
-        try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
-            if not api_key:
-                return {"error": "Sketchfab API key is not configured"}
-                
-            # Use proper authorization header for API key auth
-            headers = {
-                "Authorization": f"Token {api_key}"
-            }
-            
-            # Request download URL using the exact endpoint from the documentation
-            download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
-            
-            response = requests.get(
-                download_endpoint,
-                headers=headers,
-                timeout=30  # Add timeout of 30 seconds
-            )
-            
-            if response.status_code == 401:
-                return {"error": "Authentication failed (401). Check your API key."}
-                
-            if response.status_code != 200:
-                return {"error": f"Download request failed with status code {response.status_code}"}
-                
-            data = response.json()
-            
-            # Safety check for None data
-            if data is None:
-                return {"error": "Received empty response from Sketchfab API for download request"}
-                
-            # Extract download URL with safety checks
-            gltf_data = data.get("gltf")
-            if not gltf_data:
-                return {"error": "No gltf download URL available for this model. Response: " + str(data)}
+        def fetch(job):
+            try:
+                # Build search parameters with exact fields from Sketchfab API docs
+                params = {
+                    "type": "models",
+                    "q": query,
+                    "count": count,
+                    "downloadable": downloadable,
+                    "archives_flavours": False
+                }
                 
-            download_url = gltf_data.get("url")
-            if not download_url:
-                return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
+                if categories:
+                    params["categories"] = categories
+                    
+                # Make API request to Sketchfab search endpoint
+                # The proper format according to Sketchfab API docs for API key auth
+                headers = {
+                    "Authorization": f"Token {api_key}"
+                }
                 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
-            
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
                 
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
-            zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
-            
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
+                # Use the search endpoint as specified in the API documentation
+                response = _http.get(
+                    "sketchfab",
+                    "https://api.sketchfab.com/v3/search",
+                    headers=headers,
+                    params=params,
+                )
                 
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
+                if response.status_code == 401:
+                    return {"error": "Authentication failed (401). Check your API key."}
                     
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
+                if response.status_code != 200:
+                    return {"error": f"API request failed with status code {response.status_code}"}
                     
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
+                response_data = response.json()
+                
+                # Safety check on the response structure
+                if response_data is None:
+                    return {"error": "Received empty response from Sketchfab API"}
                     
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
+                # Handle 'results' potentially missing from response
+                results = response_data.get("results", [])
+                if not isinstance(results, list):
+                    return {"error": f"Unexpected response format from Sketchfab API: {response_data}"}
                     
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
-                
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
-                
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
+                return response_data
             
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
-                return {"error": "No glTF file found in the downloaded model"}
-                
-            main_file = os.path.join(temp_dir, gltf_files[0])
+            except requests.exceptions.Timeout:
+                return {"error": "Request timed out. Check your internet connection."}
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                return {"error": str(e)}
+
+        return DeferredResult(fetch)
+
+    def _fetch_sketchfab_model(self, uid, api_key, job=None):
+        """Download and extract a Sketchfab model into the asset cache (no bpy), returning the main glTF path"""
+        # Models are cached by uid, so repeated imports skip the network entirely
+        entry_dir = _asset_cache.entry_dir("sketchfab", uid)
+        manifest_path = os.path.join(entry_dir, "manifest.json")
+        with suppress(OSError, ValueError, KeyError):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                main_file = os.path.join(entry_dir, json.load(f)["main_file"])
+            if os.path.isfile(main_file):
+                return {"main_file": main_file, "cached": True}
+
+        # Use proper authorization header for API key auth
+        headers = {
+            "Authorization": f"Token {api_key}"
+        }
+        
+        # Request download URL using the exact endpoint from the documentation
+        download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
+        
+        response = _http.get(
+            "sketchfab",
+            download_endpoint,
+            headers=headers,
+        )
+        
+        if response.status_code == 401:
+            return {"error": "Authentication failed (401). Check your API key."}
             
-            # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+        if response.status_code != 200:
+            return {"error": f"Download request failed with status code {response.status_code}"}
             
-            # Get the names of imported objects
-            imported_objects = [obj.name for obj in bpy.context.selected_objects]
+        data = response.json()
+        
+        # Safety check for None data
+        if data is None:
+            return {"error": "Received empty response from Sketchfab API for download request"}
             
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
+        # Extract download URL with safety checks
+        gltf_data = data.get("gltf")
+        if not gltf_data:
+            return {"error": "No gltf download URL available for this model. Response: " + str(data)}
             
-            return {
-                "success": True,
-                "message": "Model imported successfully",
-                "imported_objects": imported_objects
-            }
-        
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return {"error": f"Failed to download model: {str(e)}"}
+        download_url = gltf_data.get("url")
+        if not download_url:
+            return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
+            
+        # Stream the archive to disk instead of holding it in memory
+        def report(done, total):
+            if job is not None:
+                job.report(
+                    progress=done / total if total else None,
+                    message=f"Downloaded {done / 1024 / 1024:.1f} MB" + (f" of {total / 1024 / 1024:.1f} MB" if total else ""),
+                )
+
+        zip_file_path = _asset_cache.fetch(
+            entry_dir, f"{uid}.zip", {"url": download_url}, integration="sketchfab", progress=report
+        )
+
+        try:
+            main_file = self._extract_sketchfab_model(zip_file_path, entry_dir)
+        except ValueError as e:
+            with suppress(Exception):
+                shutil.rmtree(entry_dir)
+            return {"error": f"Security issue: {str(e)}"}
+        finally:
+            # Only the extracted files are kept in the cache
+            with suppress(OSError):
+                os.unlink(zip_file_path)
+
+        if not main_file:
+            with suppress(Exception):
+                shutil.rmtree(entry_dir)
+            return {"error": "No glTF file found in the downloaded model"}
+
+        _asset_cache.write_atomic(manifest_path, json.dumps({"main_file": main_file}).encode('utf-8'))
+        _asset_cache.evict(keep=entry_dir)
+        return {"main_file": os.path.join(entry_dir, main_file), "cached": False}
+
+    @staticmethod
+    def _extract_sketchfab_model(zip_file_path, target_dir):
+        """
+        Extract only the main glTF and the buffers/textures it references.
+
+        Every member is checked for path traversal right before it is written.
+        Returns the main file path relative to target_dir, or None.
+        """
+        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+            names = [info.filename for info in zip_ref.infolist() if not info.is_dir()]
+            gltf_files = [n for n in names if n.lower().endswith('.gltf') or n.lower().endswith('.glb')]
+            if not gltf_files:
+                return None
+            # Prefer the shallowest file (Sketchfab archives ship scene.gltf at the root)
+            main_file = min(gltf_files, key=lambda n: (n.count('/'), n))
+
+            wanted = [main_file]
+            if main_file.lower().endswith('.gltf'):
+                gltf = json.loads(zip_ref.read(main_file).decode('utf-8'))
+                base = os.path.dirname(main_file)
+                for item in gltf.get("buffers", []) + gltf.get("images", []):
+                    uri = item.get("uri")
+                    if uri and not uri.startswith("data:"):
+                        wanted.append(os.path.normpath(os.path.join(base, urllib.parse.unquote(uri))).replace(os.sep, '/'))
+
+            available = set(names)
+            for name in wanted:
+                if name not in available:
+                    print(f"Referenced file missing from archive: {name}")
+                    continue
+                # Additional explicit check for directory traversal
+                if ".." in name.split('/'):
+                    raise ValueError("Zip contains files with directory traversal sequence")
+                target_path = AssetCache.resolve(target_dir, name)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                with zip_ref.open(name) as source, open(target_path, "wb") as target:
+                    shutil.copyfileobj(source, target, DOWNLOAD_CHUNK_SIZE)
+            return main_file
+
+    def download_sketchfab_model(self, uid):
+        """Download a model from Sketchfab by its UID"""
+        api_key = bpy.context.scene.blendermcp_sketchfab_api_key
+        if not api_key:
+            return {"error": "Sketchfab API key is not configured"}
+
+        def fetch(job):
+            try:
+                return self._fetch_sketchfab_model(uid, api_key, job)
+            except requests.exceptions.Timeout:
+                return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
+            except json.JSONDecodeError as e:
+                return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+            except Exception as e:
+                import traceback
+                traceback.print_exc()
+                return {"error": f"Failed to download model: {str(e)}"}
+
+        def finish(fetched):
+            if "error" in fetched:
+                return fetched
+            try:
+                # Import the model
+                bpy.ops.import_scene.gltf(filepath=fetched["main_file"])
+                
+                # Get the names of imported objects
+                imported_objects = [obj.name for obj in bpy.context.selected_objects]
+                
+                return {
+                    "success": True,
+                    "message": "Model imported successfully",
+                    "imported_objects": imported_objects,
+                    "cached": fetched["cached"],
+                }
+            except Exception as e:
+                traceback.print_exc()
+                return {"error": f"Failed to download model: {str(e)}"}
+
+        return DeferredResult(fetch, finish)
     #endregion
 
 # Blender UI Panel
@@ -1825,6 +5932,9 @@ def register():
     bpy.utils.register_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
     bpy.utils.register_class(BLENDERMCP_OT_StartServer)
     bpy.utils.register_class(BLENDERMCP_OT_StopServer)
+
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update_post)
+    bpy.app.handlers.load_post.append(_on_load_post)
     
     print("BlenderMCP addon registered")
 
@@ -1838,6 +5948,11 @@ def unregister():
     bpy.utils.unregister_class(BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey)
     bpy.utils.unregister_class(BLENDERMCP_OT_StartServer)
     bpy.utils.unregister_class(BLENDERMCP_OT_StopServer)
+
+    if _on_depsgraph_update_post in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update_post)
+    if _on_load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(_on_load_post)
     
     del bpy.types.Scene.blendermcp_port
     del bpy.types.Scene.blendermcp_server_running
@@ -1850,5 +5965,30 @@ def unregister():
 
     print("BlenderMCP addon unregistered")
 
+def serve_headless(host='localhost', port=9876):
+    """
+    Run the MCP server inside `blender --background`, executing commands on the calling
+    (main) thread until the server stops or the process is interrupted.
+    """
+    server = BlenderMCPServer(host=host, port=port)
+    bpy.types.blendermcp_server = server
+    server.start()
+    try:
+        while server.running:
+            _headless_loop.run_pending()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
 if __name__ == "__main__":
-    register()
\ No newline at end of file
+    register()
+
+    if bpy.app.background:
+        # blender --background [file.blend] --python addon_new.py -- [--host HOST] [--port PORT]
+        parser = argparse.ArgumentParser(prog="addon_new.py")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument("--port", type=int, default=9876)
+        args = parser.parse_args(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+        serve_headless(args.host, args.port)
\ No newline at end of file
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+BlenderMCP 多实例工作池
+启动 N 个无界面 Blender（blender --background + addon_new.py），每个监听独立端口，
+对外只暴露一个与插件相同协议的 TCP 端口（默认 9876）：
+
+- 会话亲和：命令中的 "session" 字段（没有则按客户端连接）固定路由到同一个 Blender，
+  新会话分配给会话数/在途命令最少的健康实例
+- 健康检查：定期 ping，进程退出或连续失败则重启
+- 回收：实例执行满 M 条命令后不再接新会话，旧会话结束后重启，避免内存/场景膨胀
+- 统计：发送 {"type": "pool_stats"} 返回每个实例的命令数、排队、延迟分位数
+
+用法：
+    python blender_pool.py --workers 4 --blender /path/to/blender [--blend scene.blend]
+        [--port 9876] [--recycle-after 500] [--health-interval 5]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import re
+import signal
+import time
+from collections import deque
+
+ADDON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "addon_new.py")
+
+STARTUP_TIMEOUT = 120.0     # 等待 Blender 启动并开始监听的最长时间
+COMMAND_TIMEOUT = 600.0     # 单条命令的最长执行时间（渲染、下载可能较慢）
+PING_TIMEOUT = 10.0
+MAX_PING_FAILURES = 3
+SESSION_IDLE_TIMEOUT = 900.0
+LATENCY_WINDOW = 1000
+
+
+class JsonStream:
+    """从 TCP 流中逐个解析 JSON 对象（插件协议没有分帧，只能按完整 JSON 切分）
+
+    缓冲区保存原始字节，多字节 UTF-8 字符跨两次 read 也不会被截断。对象/数组只扫描新到的数据，
+    增量记录括号深度和字符串状态，括号闭合时才解析一次，大响应（内联截图、几何数据）保持线性耗时。
+    """
+
+    _STRUCTURAL = re.compile(rb'[][{}"]')
+    _STRING_SPECIAL = re.compile(rb'["\\]')
+    _WHITESPACE = re.compile(rb'\s*')
+
+    def __init__(self, reader):
+        self.reader = reader
+        self.buffer = bytearray()
+        self.scan = 0            # 已扫描到的位置
+        self.depth = 0
+        self.in_string = False
+
+    def _find_end(self):
+        """继续扫描缓冲区，返回第一个完整顶层对象/数组的结束位置，不完整则返回 None"""
+        buffer = self.buffer
+        pos = self.scan
+        while True:
+            if self.in_string:
+                match = self._STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    self.scan = len(buffer)
+                    return None
+                pos = match.start()
+                if buffer[pos] == ord("\\"):
+                    if pos + 1 >= len(buffer):
+                        # 转义符后的字符还没到，下次从转义符处继续
+                        self.scan = pos
+                        return None
+                    pos += 2
+                    continue
+                self.in_string = False
+            else:
+                match = self._STRUCTURAL.search(buffer, pos)
+                if match is None:
+                    self.scan = len(buffer)
+                    return None
+                pos = match.start()
+                char = buffer[pos]
+                if char == ord('"'):
+                    self.in_string = True
+                elif char in b"{[":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth <= 0:
+                        return pos + 1
+            pos += 1
+
+    def _take(self, end):
+        data = bytes(self.buffer[:end])
+        del self.buffer[:end]
+        self.scan = 0
+        self.depth = 0
+        self.in_string = False
+        return json.loads(data)
+
+    async def read(self):
+        """返回下一个 JSON 值；连接关闭时返回 None。格式错误的值会被丢弃并抛出 ValueError"""
+        while True:
+            if self.scan == 0:
+                del self.buffer[:self._WHITESPACE.match(self.buffer).end()]
+            if self.buffer:
+                if self.buffer[0] in b"{[":
+                    end = self._find_end()
+                    if end is not None:
+                        return self._take(end)
+                else:
+                    # 顶层标量没有结束标记，只能尝试整体解析
+                    try:
+                        text = self.buffer.decode("utf-8")
+                        _, end = json.JSONDecoder().raw_decode(text)
+                    except ValueError:
+                        pass
+                    else:
+                        return self._take(len(text[:end].encode("utf-8")))
+            data = await self.reader.read(65536)
+            if not data:
+                return None
+            self.buffer += data
+
+
+async def send_json(writer, obj):
+    writer.write(json.dumps(obj).encode("utf-8"))
+    await writer.drain()
+
+
+class Worker:
+    """一个无界面 Blender 进程及其统计信息"""
+
+    def __init__(self, index, port, args):
+        self.index = index
+        self.port = port
+        self.args = args
+        self.process = None
+        self.state = "stopped"   # starting / ready / draining / restarting / stopped
+        self.sessions = set()
+        self.in_flight = 0
+        self.commands = 0        # 本次进程生命周期内的命令数（用于回收）
+        self.total_commands = 0
+        self.errors = 0
+        self.restarts = 0
+        self.ping_failures = 0
+        self.started_at = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def name(self):
+        return f"worker-{self.index}@{self.port}"
+
+    @property
+    def load(self):
+        return len(self.sessions), self.in_flight
+
+    async def start(self):
+        self.state = "starting"
+        try:
+            await self._launch()
+        except BaseException:
+            # 启动失败（进程退出、超时、找不到 Blender 等）时标记为 stopped，maintain 会重试
+            await self.stop()
+            raise
+
+        self.state = "ready"
+        self.commands = 0
+        self.ping_failures = 0
+        self.started_at = time.time()
+        print(f"✅ {self.name} 已就绪 (pid {self.process.pid})")
+
+    async def _launch(self):
+        """启动 Blender 进程并等待它响应 ping"""
+        command = [self.args.blender, "--background"]
+        if self.args.factory_startup:
+            command.append("--factory-startup")
+        if self.args.blend:
+            command.append(self.args.blend)
+        command += ["--python", ADDON_PATH, "--", "--host", "127.0.0.1", "--port", str(self.port)]
+
+        self.process = None
+        log = open(os.path.join(self.args.log_dir, f"{self.name}.log"), "ab") if self.args.log_dir else asyncio.subprocess.DEVNULL
+        try:
+            self.process = await asyncio.create_subprocess_exec(*command, stdout=log, stderr=asyncio.subprocess.STDOUT)
+        finally:
+            if log is not asyncio.subprocess.DEVNULL:
+                log.close()
+
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.process.returncode is not None:
+                raise RuntimeError(f"{self.name} 启动失败，退出码 {self.process.returncode}")
+            try:
+                await self.ping()
+                break
+            except (OSError, asyncio.TimeoutError, RuntimeError):
+                await asyncio.sleep(0.5)
+        else:
+            raise RuntimeError(f"{self.name} 在 {STARTUP_TIMEOUT}s 内没有响应")
+
+    async def stop(self):
+        if self.process and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.state = "stopped"
+
+    async def ping(self):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", self.port), PING_TIMEOUT)
+        try:
+            await send_json(writer, {"type": "ping", "params": {}})
+            response = await asyncio.wait_for(JsonStream(reader).read(), PING_TIMEOUT)
+        finally:
+            writer.close()
+        if not response or response.get("status") != "success":
+            raise RuntimeError(f"ping 失败: {response}")
+        return response["result"]
+
+    def record(self, latency, ok):
+        self.commands += 1
+        self.total_commands += 1
+        self.latencies.append(latency)
+        if not ok:
+            self.errors += 1
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000, 1) if latencies else None
+
+        return {
+            "name": self.name,
+            "pid": self.process.pid if self.process else None,
+            "state": self.state,
+            "sessions": len(self.sessions),
+            "in_flight": self.in_flight,
+            "commands": self.commands,
+            "total_commands": self.total_commands,
+            "errors": self.errors,
+            "restarts": self.restarts,
+            "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else None,
+            "latency_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+        }
+
+
+class Session:
+    """一个会话固定在一个实例上，并持有到该实例的专用连接"""
+
+    def __init__(self, key, worker):
+        self.key = key
+        self.worker = worker
+        self.reader = None
+        self.writer = None
+        self.stream = None
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    async def send(self, command):
+        async with self.lock:
+            self.last_used = time.monotonic()
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.worker.port)
+                self.stream = JsonStream(self.reader)
+            await send_json(self.writer, command)
+            response = await asyncio.wait_for(self.stream.read(), COMMAND_TIMEOUT)
+            if response is None:
+                raise ConnectionError("worker closed the connection")
+            return response
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class BlenderPool:
+    def __init__(self, args):
+        self.args = args
+        self.workers = [Worker(i, args.base_port + i, args) for i in range(args.workers)]
+        self.sessions = {}
+        self.connection_ids = itertools.count(1)
+        self.started_at = time.time()
+
+    async def start(self):
+        results = await asyncio.gather(*(worker.start() for worker in self.workers), return_exceptions=True)
+        for worker, result in zip(self.workers, results):
+            if isinstance(result, Exception):
+                print(f"❌ {result}")
+        if not any(worker.state == "ready" for worker in self.workers):
+            raise RuntimeError("没有可用的 Blender 实例")
+
+    async def stop(self):
+        for session in self.sessions.values():
+            session.close()
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+    def session_for(self, key):
+        session = self.sessions.get(key)
+        if session is not None and session.worker.state in ("ready", "draining"):
+            return session
+        if session is not None:
+            self.release(key)
+
+        candidates = [worker for worker in self.workers if worker.state == "ready"]
+        if not candidates:
+            raise RuntimeError("没有可用的 Blender 实例")
+        worker = min(candidates, key=lambda w: w.load)
+        session = Session(key, worker)
+        self.sessions[key] = session
+        worker.sessions.add(key)
+        return session
+
+    def release(self, key):
+        session = self.sessions.pop(key, None)
+        if session is not None:
+            session.close()
+            session.worker.sessions.discard(key)
+
+    async def execute(self, key, command):
+        session = self.session_for(key)
+        worker = session.worker
+        worker.in_flight += 1
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = await session.send(command)
+            ok = response.get("status") == "success"
+            return response
+        except Exception as e:
+            # 连接或响应出错（断开、超时、无法解码的 JSON 等）后会话状态未知，丢弃它，下一条命令重新分配
+            self.release(key)
+            return {"status": "error", "message": f"{worker.name} failed: {e}"}
+        finally:
+            worker.in_flight -= 1
+            worker.record(time.perf_counter() - start, ok)
+            if worker.state == "ready" and self.args.recycle_after and worker.commands >= self.args.recycle_after:
+                worker.state = "draining"
+                print(f"♻️  {worker.name} 已执行 {worker.commands} 条命令，停止接收新会话")
+
+    def schedule_restart(self, worker, reason):
+        """在后台重启实例，不阻塞对其他实例的健康检查"""
+        print(f"🔄 重启 {worker.name}: {reason}")
+        worker.state = "restarting"
+        for key in list(worker.sessions):
+            self.release(key)
+        asyncio.create_task(self.restart(worker))
+
+    async def restart(self, worker):
+        await worker.stop()
+        worker.restarts += 1
+        try:
+            await worker.start()
+        except (RuntimeError, OSError) as e:
+            print(f"❌ {worker.name} 重启失败: {e}")
+            worker.state = "stopped"
+
+    async def maintain(self):
+        """健康检查、空闲会话清理和实例回收"""
+        while True:
+            await asyncio.sleep(self.args.health_interval)
+            now = time.monotonic()
+            for key, session in list(self.sessions.items()):
+                if now - session.last_used > SESSION_IDLE_TIMEOUT and not session.lock.locked():
+                    self.release(key)
+
+            for worker in self.workers:
+                if worker.state in ("starting", "restarting"):
+                    continue
+                if worker.state == "stopped" or worker.process.returncode is not None:
+                    self.schedule_restart(worker, "进程已退出")
+                    continue
+                if worker.state == "draining" and not worker.sessions and not worker.in_flight:
+                    self.schedule_restart(worker, "达到回收阈值")
+                    continue
+                try:
+                    await worker.ping()
+                    worker.ping_failures = 0
+                except (OSError, asyncio.TimeoutError, RuntimeError) as e:
+                    worker.ping_failures += 1
+                    print(f"⚠️  {worker.name} 健康检查失败 ({worker.ping_failures}/{MAX_PING_FAILURES}): {e}")
+                    if worker.ping_failures >= MAX_PING_FAILURES:
+                        self.schedule_restart(worker, "健康检查连续失败")
+
+    def stats(self):
+        workers = [worker.stats() for worker in self.workers]
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "sessions": len(self.sessions),
+            "in_flight": sum(w["in_flight"] for w in workers),
+            "total_commands": sum(w["total_commands"] for w in workers),
+            "workers": workers,
+        }
+
+    async def handle_client(self, reader, writer):
+        connection_key = f"connection-{next(self.connection_ids)}"
+        stream = JsonStream(reader)
+        try:
+            while True:
+                try:
+                    command = await stream.read()
+                except ConnectionError:
+                    break
+                except ValueError as e:
+                    # 格式错误的命令已从流中丢弃，后续命令照常处理
+                    await send_json(writer, {"status": "error", "message": f"Invalid JSON: {e}"})
+                    continue
+                if command is None:
+                    break
+                if not isinstance(command, dict):
+                    await send_json(writer, {"status": "error", "message": "Command must be a JSON object"})
+                    continue
+
+                if command.get("type") == "pool_stats":
+                    response = {"status": "success", "result": self.stats()}
+                else:
+                    key = command.get("session") or connection_key
+                    try:
+                        response = await self.execute(key, command)
+                    except RuntimeError as e:
+                        response = {"status": "error", "message": str(e)}
+                await send_json(writer, response)
+        except ConnectionError:
+            pass
+        finally:
+            # 按连接划分的会话随连接结束；显式 session 保留亲和，直到空闲超时
+            self.release(connection_key)
+            writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="BlenderMCP 多实例工作池")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Blender 实例数 (默认: CPU 核数的一半)")
+    parser.add_argument("--blender", default="blender", help="Blender 可执行文件路径")
+    parser.add_argument("--blend", default=None, help="每个实例启动时打开的 .blend 文件")
+    parser.add_argument("--factory-startup", action="store_true", help="忽略用户配置启动 Blender")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9876, help="对外端口")
+    parser.add_argument("--base-port", type=int, default=9900, help="实例端口从这里开始递增")
+    parser.add_argument("--recycle-after", type=int, default=500, help="实例执行多少条命令后回收 (0 为不回收)")
+    parser.add_argument("--health-interval", type=float, default=5.0, help="健康检查间隔秒数")
+    parser.add_argument("--log-dir", default=None, help="保存各实例输出的目录")
+    args = parser.parse_args()
+    if args.log_dir:
+        os.makedirs(args.log_dir, exist_ok=True)
+
+    pool = BlenderPool(args)
+    print(f"🚀 启动 {args.workers} 个 Blender 实例 (端口 {args.base_port}-{args.base_port + args.workers - 1})")
+    await pool.start()
+
+    server = await asyncio.start_server(pool.handle_client, args.host, args.port)
+    maintenance = asyncio.create_task(pool.maintain())
+    print(f"🌐 工作池已在 {args.host}:{args.port} 监听")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        print("\n👋 正在关闭工作池...")
+        maintenance.cancel()
+        server.close()
+        await server.wait_closed()
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
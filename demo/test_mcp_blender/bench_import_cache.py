@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+模型导入缓存基准测试
+对比：每次都调用 bpy.ops.import_scene.fbx（原 simple_import_fbx 的做法）
+     vs import_model 的缓存导入（append / instance / link 三种模式）
+
+用法：
+    blender --background --factory-startup --python bench_import_cache.py -- [重复次数] [模型文件...]
+示例：
+    blender --background --factory-startup --python bench_import_cache.py -- 5 models/house.fbx models/eggs.fbx
+不指定模型时使用 models/ 目录下的全部 FBX 文件。
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import bpy
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# 使用独立的临时缓存目录，保证第一次导入一定是未命中
+CACHE_DIR = tempfile.mkdtemp(prefix="blendermcp_bench_")
+os.environ["BLENDERMCP_CACHE_DIR"] = CACHE_DIR
+
+# 直接从仓库导入插件模块（需要在 Blender 中运行，插件依赖 bpy）
+sys.path.insert(0, os.path.abspath(os.path.join(HERE, "..")))
+import addon_new
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+REPEAT = int(argv[0]) if argv else 5
+MODELS = [os.path.abspath(path) for path in argv[1:]] or sorted(
+    os.path.join(HERE, "models", name) for name in os.listdir(os.path.join(HERE, "models"))
+    if name.lower().endswith(".fbx")
+)
+
+
+def clear_scene():
+    """清空场景及孤立数据，避免残留数据影响计时"""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    bpy.data.orphans_purge(do_recursive=True)
+
+
+def bench(label, function):
+    """重复执行 REPEAT 次，返回每次的耗时（毫秒），第一次与之后分开统计"""
+    clear_scene()
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1000)
+    repeat = times[1:] or times
+    print(f"   {label:<18} 首次 {times[0]:8.1f}ms   重复平均 {sum(repeat) / len(repeat):8.1f}ms"
+          f"   对象数 {len(bpy.data.objects)}  网格数 {len(bpy.data.meshes)}")
+    return sum(repeat) / len(repeat)
+
+
+def main():
+    server = addon_new.BlenderMCPServer()
+    print(f"📦 重复 {REPEAT} 次，缓存目录: {CACHE_DIR}")
+
+    for path in MODELS:
+        print(f"\n🏠 {os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB)")
+        baseline = bench("import_scene.fbx", lambda: bpy.ops.import_scene.fbx(filepath=path))
+        for mode in ("append", "instance", "link"):
+            # 每种模式都从空缓存开始，首次即为真实导入 + 写入 .blend
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+            addon_new._model_import_cache.reset()
+            cached = bench(f"import_model/{mode}", lambda: server.import_model(path, mode=mode))
+            print(f"   {'':<18} 🚀 加速 {baseline / cached:.1f}x")
+
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+main()
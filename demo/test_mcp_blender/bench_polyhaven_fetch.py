@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+PolyHaven 多文件下载基准测试
+对比：逐个串行下载（原 download_polyhaven_asset 的做法） vs 共享连接池的并发下载
+
+用法：
+    blender --background --python bench_polyhaven_fetch.py -- [asset_id] [asset_type] [resolution]
+示例：
+    blender --background --python bench_polyhaven_fetch.py -- rock_wall_08 textures 4k
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import requests
+
+# 直接从仓库导入插件模块（需要在 Blender 中运行，插件依赖 bpy）
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import addon_new
+
+argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+ASSET_ID = argv[0] if len(argv) > 0 else "rock_wall_08"
+ASSET_TYPE = argv[1] if len(argv) > 1 else "textures"
+RESOLUTION = argv[2] if len(argv) > 2 else "4k"
+FILE_FORMAT = {"textures": "jpg", "models": "gltf"}[ASSET_TYPE]
+
+
+def list_files():
+    """列出需要下载的 (相对路径, 文件信息)"""
+    files_data = requests.get(f"https://api.polyhaven.com/files/{ASSET_ID}").json()
+    files = []
+    if ASSET_TYPE == "textures":
+        for map_type, resolutions in files_data.items():
+            if map_type in ["blend", "gltf"]:
+                continue
+            if RESOLUTION in resolutions and FILE_FORMAT in resolutions[RESOLUTION]:
+                files.append((f"{ASSET_ID}_{map_type}.{FILE_FORMAT}", resolutions[RESOLUTION][FILE_FORMAT]))
+    else:
+        file_info = files_data[FILE_FORMAT][RESOLUTION][FILE_FORMAT]
+        files.append((file_info["url"].split("/")[-1], file_info))
+        files.extend((file_info.get("include") or {}).items())
+    return files
+
+
+def bench_serial(files, target_dir):
+    """原始做法：每个文件一次 requests.get，整体读入内存后写盘"""
+    start = time.perf_counter()
+    for relpath, info in files:
+        response = requests.get(info["url"])
+        path = os.path.join(target_dir, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(response.content)
+    return time.perf_counter() - start
+
+
+def bench_parallel(files, cache_root):
+    """新做法：AssetCache.fetch_many 并发流式下载"""
+    cache = addon_new.AssetCache(root=cache_root)
+    entry_dir = cache.entry_dir("bench", ASSET_ID, ASSET_TYPE, RESOLUTION, FILE_FORMAT)
+    start = time.perf_counter()
+    results = cache.fetch_many(entry_dir, files)
+    elapsed = time.perf_counter() - start
+    failed = [relpath for relpath, result in results.items() if isinstance(result, Exception)]
+    if failed:
+        print(f"⚠️ 下载失败: {failed}")
+
+    # 再次请求应当全部命中磁盘缓存
+    start = time.perf_counter()
+    cache.fetch_many(entry_dir, files)
+    cached = time.perf_counter() - start
+    return elapsed, cached
+
+
+def main():
+    files = list_files()
+    total_bytes = sum(info.get("size", 0) for _, info in files)
+    print(f"📦 {ASSET_ID} ({ASSET_TYPE}, {RESOLUTION}): {len(files)} 个文件, {total_bytes / 1024 / 1024:.1f} MB")
+
+    serial_dir = tempfile.mkdtemp()
+    parallel_dir = tempfile.mkdtemp()
+    try:
+        serial = bench_serial(files, serial_dir)
+        parallel, cached = bench_parallel(files, parallel_dir)
+    finally:
+        shutil.rmtree(serial_dir, ignore_errors=True)
+        shutil.rmtree(parallel_dir, ignore_errors=True)
+
+    print(f"🐢 串行下载:   {serial:.2f}s")
+    print(f"🚀 并发下载:   {parallel:.2f}s  (加速 {serial / parallel:.1f}x)")
+    print(f"💾 缓存命中:   {cached * 1000:.1f}ms")
+
+
+main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+本地 Hyper3D Rodin 模拟服务（用于测试插件的后台任务追踪，不消耗真实额度）
+同时模拟官网接口 (/api/v2/...) 和 fal.ai 队列接口 (/fal-ai/hyper3d/...)，
+任务按时间推进：Waiting -> Generating -> Done，完成后返回一个单三角形的 GLB。
+
+用法：
+    python mock_rodin_server.py [--port 8765] [--duration 10] [--fail]
+
+然后在启动 Blender 之前设置环境变量，让插件指向本服务：
+    export BLENDERMCP_RODIN_URL=http://127.0.0.1:8765/api/v2
+    export BLENDERMCP_RODIN_FAL_AI_URL=http://127.0.0.1:8765/fal-ai/hyper3d
+
+再通过 MCP 调用 create_rodin_job(text_prompt=..., import_as="MockAsset")，
+用返回的 tracking_job.job_id 调用 wait_for_job(job_id, timeout=60)。
+"""
+
+import argparse
+import json
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TASKS = {}
+TASKS_LOCK = threading.Lock()
+STATS = {"create": 0, "status": 0, "download": 0, "file": 0}
+
+
+def build_triangle_glb():
+    """构造一个只包含一个三角形的最小合法 GLB"""
+    positions = struct.pack("<9f", 0, 0, 0, 1, 0, 0, 0, 1, 0)
+    gltf = {
+        "asset": {"version": "2.0", "generator": "mock_rodin_server"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "name": "MockMesh"}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0}}]}],
+        "buffers": [{"byteLength": len(positions)}],
+        "bufferViews": [{"buffer": 0, "byteOffset": 0, "byteLength": len(positions)}],
+        "accessors": [{
+            "bufferView": 0, "componentType": 5126, "count": 3, "type": "VEC3",
+            "min": [0, 0, 0], "max": [1, 1, 0],
+        }],
+    }
+    json_chunk = json.dumps(gltf).encode("utf-8")
+    json_chunk += b" " * (-len(json_chunk) % 4)
+    bin_chunk = positions + b"\0" * (-len(positions) % 4)
+    total = 12 + 8 + len(json_chunk) + 8 + len(bin_chunk)
+    return (
+        struct.pack("<4sII", b"glTF", 2, total)
+        + struct.pack("<I4s", len(json_chunk), b"JSON") + json_chunk
+        + struct.pack("<I4s", len(bin_chunk), b"BIN\0") + bin_chunk
+    )
+
+
+GLB = build_triangle_glb()
+
+
+class MockRodinHandler(BaseHTTPRequestHandler):
+    duration = 10.0
+    fail = False
+
+    def log_message(self, format, *args):
+        print(f"[{time.strftime('%H:%M:%S')}] {self.command} {self.path}")
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}  # multipart 表单（官网创建任务），内容不重要
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _new_task(self):
+        task_id = uuid.uuid4().hex
+        with TASKS_LOCK:
+            TASKS[task_id] = time.time()
+            STATS["create"] += 1
+        return task_id
+
+    def _task_status(self, task_id):
+        """根据任务创建后经过的时间返回官网风格的状态"""
+        created = TASKS.get(task_id)
+        if created is None:
+            return None
+        elapsed = time.time() - created
+        if elapsed < min(2.0, self.duration / 3):
+            return "Waiting"
+        if elapsed < self.duration:
+            return "Generating"
+        return "Failed" if self.fail else "Done"
+
+    def _file_url(self, task_id):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/files/{task_id}/model.glb"
+
+    def do_POST(self):
+        body = self._read_body()
+
+        # 官网接口
+        if self.path == "/api/v2/rodin":
+            task_id = self._new_task()
+            return self._send_json({
+                "uuid": task_id,
+                "jobs": {"uuids": [task_id], "subscription_key": task_id},
+            })
+        if self.path == "/api/v2/status":
+            STATS["status"] += 1
+            status = self._task_status(body.get("subscription_key"))
+            if status is None:
+                return self._send_json({"error": "unknown subscription_key"}, 404)
+            return self._send_json({"jobs": [{"uuid": body["subscription_key"], "status": status}]})
+        if self.path == "/api/v2/download":
+            STATS["download"] += 1
+            task_id = body.get("task_uuid")
+            if self._task_status(task_id) != "Done":
+                return self._send_json({"list": []})
+            return self._send_json({"list": [{"name": "base_basic_shaded.glb", "url": self._file_url(task_id)}]})
+
+        # fal.ai 队列接口
+        if self.path == "/fal-ai/hyper3d/rodin":
+            return self._send_json({"request_id": self._new_task()})
+
+        self._send_json({"error": "not found"}, 404)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+
+        if parts[0] == "files" and len(parts) == 3 and parts[1] in TASKS:
+            STATS["file"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "model/gltf-binary")
+            self.send_header("Content-Length", str(len(GLB)))
+            self.end_headers()
+            self.wfile.write(GLB)
+            return
+
+        # /fal-ai/hyper3d/requests/<id>[/status]
+        if parts[:3] == ["fal-ai", "hyper3d", "requests"] and len(parts) >= 4:
+            request_id = parts[3]
+            status = self._task_status(request_id)
+            if status is None:
+                return self._send_json({"error": "unknown request_id"}, 404)
+            if len(parts) == 5 and parts[4] == "status":
+                STATS["status"] += 1
+                fal_status = {"Waiting": "IN_QUEUE", "Generating": "IN_PROGRESS"}.get(status, "COMPLETED")
+                data = {"status": fal_status}
+                if status == "Failed":
+                    data["error"] = "mock generation failed"
+                return self._send_json(data)
+            STATS["download"] += 1
+            return self._send_json({"model_mesh": {"url": self._file_url(request_id)}})
+
+        if self.path == "/stats":
+            return self._send_json(STATS)
+
+        self._send_json({"error": "not found"}, 404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 Hyper3D Rodin 模拟服务")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duration", type=float, default=10.0, help="每个任务从创建到完成的秒数")
+    parser.add_argument("--fail", action="store_true", help="让所有任务以 Failed 结束")
+    args = parser.parse_args()
+
+    MockRodinHandler.duration = args.duration
+    MockRodinHandler.fail = args.fail
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), MockRodinHandler)
+    print(f"🧪 Rodin 模拟服务已启动: http://127.0.0.1:{args.port} (任务耗时 {args.duration}s)")
+    print(f"   export BLENDERMCP_RODIN_URL=http://127.0.0.1:{args.port}/api/v2")
+    print(f"   export BLENDERMCP_RODIN_FAL_AI_URL=http://127.0.0.1:{args.port}/fal-ai/hyper3d")
+    print(f"   轮询统计: http://127.0.0.1:{args.port}/stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 已停止")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
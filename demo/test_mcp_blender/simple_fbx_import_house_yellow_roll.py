@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 """
 简单FBX文件导入工具
-功能：清空场景 + 导入FBX模型 + 自动调整视图 + 定时水平旋转（每1秒）
+功能：清空场景 + 导入FBX模型 + 自动调整视图 + 水平旋转动画（每1秒转动一次）
+旋转使用关键帧 + F曲线修改器实现，由Blender原生求值，不再每秒运行Python定时器，渲染动画时同样生效
+需要通过 MCP 的 execute_code 运行（命名空间中提供 animation 工具）
 """
 
 import bpy
+import math
 import os
-import time
-import threading
 
 # ============================================================================
 # 清除场景 - 在导入模块后立即执行
@@ -27,9 +28,10 @@ for mesh in bpy.data.meshes:
 print("✅ 场景已清空")
 
 # ============================================================================
-# 旋转控制变量
+# 旋转参数：每1秒绕Y轴转15度（约0.26弧度），绕X轴轻微摆动0.05弧度
 # ============================================================================
-rotation_active = False
+ROTATION_STEP_SECONDS = 1.0
+ROTATION_PER_STEP = {"Y": 0.26, "X": 0.05}  # 轴 -> 每步旋转的弧度
 
 # ============================================================================
 # 主要功能函数
@@ -100,40 +102,35 @@ def rotate_objects():
     except Exception as e:
         print(f"⚠️ 水平旋转过程中出现错误: {e}")
 
-def rotation_timer():
-    """使用Blender内置定时器，每1秒执行一次水平旋转"""
-    global rotation_active
-    
-    if rotation_active:
-        # 注册下一次定时器，间隔1秒
-        bpy.app.timers.register(rotation_timer, first_interval=1.0)
-        # 执行旋转
-        rotate_objects()
-    
-    return None  # 返回None表示定时器结束
-
 def start_rotation():
-    """开始自动水平旋转"""
-    global rotation_active
-    
-    if rotation_active:
+    """开始自动水平旋转：用 animation.spin 为每个网格对象写入旋转关键帧，由Blender播放动画时原生求值"""
+    scene = bpy.context.scene
+    mesh_objects = [obj for obj in scene.objects if obj.type == 'MESH']
+    if not mesh_objects:
+        print("⚠️ 场景中没有网格对象")
+        return
+    if any(obj.animation_data and obj.animation_data.action for obj in mesh_objects):
         print("⚠️ 水平旋转已经在运行中")
         return
-    
-    rotation_active = True
-    # 使用Blender内置定时器，立即开始第一次旋转
-    bpy.app.timers.register(rotation_timer, first_interval=0.0)
-    print("🔄 开始自动水平旋转（每1秒）")
+
+    # 阶梯修改器：每1秒跳一次，与原来的定时器效果一致
+    for axis, step in ROTATION_PER_STEP.items():
+        animation.spin(mesh_objects, axis=axis, degrees_per_second=math.degrees(step) / ROTATION_STEP_SECONDS,
+                       step_seconds=ROTATION_STEP_SECONDS)
+
+    # 开始播放动画（后台模式下没有界面，渲染时同样生效）
+    animation.play()
+    print(f"🔄 已为 {len(mesh_objects)} 个对象添加旋转动画（每{ROTATION_STEP_SECONDS:g}秒转动一次）")
 
 def stop_rotation():
-    """停止自动水平旋转"""
-    global rotation_active
-    
-    if not rotation_active:
-        print("⚠️ 水平旋转已经停止")
-        return
-    
-    rotation_active = False
+    """停止自动水平旋转：停止播放并删除旋转关键帧"""
+    if not bpy.app.background and bpy.context.screen and bpy.context.screen.is_animation_playing:
+        bpy.ops.screen.animation_cancel(restore_frame=False)
+
+    # 删除动画数据后，对象保持当前帧的旋转角度
+    for obj in bpy.context.scene.objects:
+        if obj.type == 'MESH' and obj.animation_data:
+            obj.animation_data_clear()
     print("🛑 自动水平旋转已停止")
 
 def simple_import_fbx(fbx_file_path):
@@ -292,7 +289,7 @@ else:
     start_rotation()
     
     print("🎬 渲染准备完成！你可以在Blender中渲染场景。")
-    print("💡 模型将每1秒自动水平旋转，使用 stop_rotation() 可以停止旋转")
+    print("💡 播放动画时模型每1秒水平旋转一次，使用 stop_rotation() 可以停止旋转")
 
 print("✅ 脚本执行完成！")
 
@@ -0,0 +1,76 @@
+"""
+红色五角星（批量实例化版本）
+与 wujiaox.py 效果相同，但不再每 0.1 秒用 bpy.ops 创建一个球体、每个球体新建一个材质：
+一次性计算全部坐标，共享一个球体网格和一个材质，每个实例的颜色通过对象属性 "color" 设置。
+随机闪烁（原 blink_random_spheres 定时器）改为 F 曲线噪波修改器，由 Blender 原生求值，渲染动画时同样生效。
+
+需要通过 MCP 的 execute_code 运行（命名空间中提供 procedural 和 animation 工具）。
+把 METHOD 改为 "geometry_nodes" 可以只生成一个几何节点实例化对象，适合上千个点。
+"""
+
+import math
+
+import bpy
+import numpy as np
+
+# 全局参数配置
+STAR_RADIUS = 5.0
+TOTAL_POINTS = 100
+METHOD = "objects"  # "objects"：关联复制的独立对象；"geometry_nodes"：单个实例化对象
+
+# 清除上一次生成的五角星（只删除本脚本创建的对象，不使用 bpy.ops）
+for obj in [obj for obj in bpy.data.objects if obj.name.startswith("StarPoint")]:
+    bpy.data.objects.remove(obj, do_unlink=True)
+
+# 一次性计算全部五角星坐标
+theta = np.linspace(0, 2 * math.pi, TOTAL_POINTS, endpoint=False)
+r = STAR_RADIUS * (1 + 0.4 * np.cos(5 * theta))
+coordinates = np.column_stack([r * np.cos(theta), r * np.sin(theta), 3 * np.sin(5 * theta)])
+scales = np.column_stack([np.ones(TOTAL_POINTS), np.ones(TOTAL_POINTS), 1 + 0.3 * np.cos(theta)])
+
+# 共享的球体网格和发光材质（重复运行时直接复用）
+sphere = procedural.shared_mesh("uv_sphere", size=0.15, detail=16, name="StarPointSphere")
+material = procedural.instance_material("StarPointMaterial", metallic=0.8, roughness=0.2, emission_strength=2.0)
+
+# 每个实例的颜色：红色，亮度略有变化
+colors = np.column_stack([0.6 + 0.4 * np.random.rand(TOTAL_POINTS), np.zeros(TOTAL_POINTS), np.zeros(TOTAL_POINTS)])
+
+result = procedural.instance(
+    sphere, coordinates, material=material, name="StarPoint",
+    colors=colors, scales=scales, method=METHOD,
+)
+
+# 随机闪烁：每个球体独立的噪波相位（"geometry_nodes" 模式只有一个对象，改为让共享材质整体闪烁）
+if METHOD == "objects":
+    animation.flicker(result, amount=0.6, speed=1.0)
+else:
+    animation.flicker([material], amount=0.6, speed=1.0)
+animation.play()
+
+# 设置场景环境（只在第一次运行时创建灯光和相机）
+scene = bpy.context.scene
+if "StarSun" not in bpy.data.objects:
+    sun = bpy.data.objects.new("StarSun", bpy.data.lights.new("StarSun", type='SUN'))
+    sun.data.energy = 5.0
+    sun.location = (10, -10, 15)
+    scene.collection.objects.link(sun)
+if "StarCamera" not in bpy.data.objects:
+    camera = bpy.data.objects.new("StarCamera", bpy.data.cameras.new("StarCamera"))
+    camera.location = (15, -15, 10)
+    camera.rotation_euler = (0.8, 0, 0.8)
+    scene.collection.objects.link(camera)
+scene.camera = bpy.data.objects["StarCamera"]
+
+# 设置渲染属性
+scene.render.film_transparent = True
+scene.render.engine = 'CYCLES'
+scene.cycles.samples = 128
+
+# 设置世界环境
+if scene.world is None:
+    scene.world = bpy.data.worlds.new("World")
+scene.world.use_nodes = True
+scene.world.node_tree.nodes["Background"].inputs[0].default_value = (0.01, 0.01, 0.01, 1)
+
+count = len(result) if METHOD == "objects" else TOTAL_POINTS
+print(f"红色五角星已生成：{count} 个实例，共用 1 个网格和 1 个材质")